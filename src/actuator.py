@@ -0,0 +1,117 @@
+"""
+The Actuator class sends mouse actions to a Mouse object on a separate worker thread, so the capture and detection loop never waits for a click.
+
+The Actuator class takes the argument mouse, which is an instance of the Mouse class. The optional cooldown argument is how long(in seconds) the same click action is ignored after it was sent, measured on the timestamps of the frames, so a replay gives the same clicks at any speed. Actions in continuous_actions, like MOVE and SCROLL, don't have a cooldown.
+
+The submit() method takes an action, the landmarks of the hand and optionally the timestamp of the camera frame they came from, and queues the action. It never blocks. Actions are performed in the order they were submitted. Moves are coalesced, so if the worker falls behind only the newest of the moves in a row is performed, at the place of the first of them. A move is never coalesced across another action, so a MOUSE_DOWN or MOUSE_UP submitted between two moves still starts and ends the drag where the hand was. A click that is still cooling down is skipped and counted in skipped, while the hand keeps being tracked and moves are still sent. The wait() method blocks until every submitted action was performed, replay.py calls it after every frame so no move is coalesced.
+
+The optional latency_stats argument is a LatencyStats. How long every action takes is recorded as the stage 'mouse ' + action, and the time an action waited in the queue as 'mouse queue'.
+"""
+
+import threading
+import time
+from collections import deque
+
+CONTINUOUS_ACTIONS = ("MOVE", "SCROLL_UP", "SCROLL_DOWN")
+
+
+class Actuator:
+    """Performs mouse actions on a worker thread with a per action cooldown."""
+    def __init__(self, mouse, cooldown=0.3, continuous_actions=CONTINUOUS_ACTIONS, latency_stats=None) -> None:
+        self.mouse = mouse
+        self.latency_stats = latency_stats
+        self.cooldown = cooldown
+        self.continuous_actions = continuous_actions
+
+        # Time each action was last sent, used for the cooldown
+        self.last_action_time = {}
+
+        # Queued actions in the order they were submitted
+        self.actions = deque()
+        self.busy = False
+        self.condition = threading.Condition()
+
+        # Counters
+        self.submitted = 0
+        self.skipped = 0
+        self.coalesced = 0
+
+        self.running = True
+        self.thread = threading.Thread(target=self.update, name='actuator', daemon=True)
+        self.thread.start()
+
+    def submit(self, action, landmark, timestamp=None):
+        """Queues an action for the worker thread. Returns False if the action is still cooling down."""
+        now = time.perf_counter()
+        if timestamp is None:
+            timestamp = now
+
+        # The cooldown is on the time of the frame, not on when it was processed
+        if action not in self.continuous_actions:
+            last_time = self.last_action_time.get(action)
+            if last_time is not None and timestamp - last_time < self.cooldown:
+                self.skipped += 1
+                return False
+            self.last_action_time[action] = timestamp
+
+        with self.condition:
+            if action == "MOVE" and self.actions and self.actions[-1][0] == "MOVE":
+                # The newest move replaces the queued move right before it
+                self.actions[-1] = (action, landmark, timestamp, now)
+                self.coalesced += 1
+            else:
+                self.actions.append((action, landmark, timestamp, now))
+
+            self.submitted += 1
+            self.condition.notify()
+
+        return True
+
+    def update(self):
+        """Worker loop. Performs every queued action in the order it was submitted."""
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: not self.running or self.actions)
+                if not self.running and not self.actions:
+                    return
+
+                actions = list(self.actions)
+                self.actions.clear()
+                self.busy = True
+
+            for action in actions:
+                self.perform(*action)
+
+            with self.condition:
+                self.busy = False
+                self.condition.notify_all()
+
+    def perform(self, action, landmark, timestamp, submitted):
+        """Performs an action and records how long it waited and how long it took."""
+        start = time.perf_counter()
+        self.mouse.perform_action(action=action, landmark=landmark, timestamp=timestamp)
+
+        if self.latency_stats is not None:
+            self.latency_stats.record('mouse queue', start - submitted)
+            self.latency_stats.record('mouse ' + action, time.perf_counter() - start)
+
+    def wait(self, timeout=1.0):
+        """Waits until every submitted action was performed. Returns False on a timeout."""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.actions and not self.busy, timeout)
+
+    def stats(self):
+        """Returns the action counters"""
+        return {
+            'submitted': self.submitted,
+            'skipped': self.skipped,
+            'coalesced': self.coalesced,
+        }
+
+    def release(self):
+        """Performs the remaining actions and stops the worker thread."""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+
+        self.thread.join(timeout=1.0)
@@ -0,0 +1,820 @@
+"""
+Benchmarks for the hand tracking.
+
+Run `python benchmark.py inference` to find the ms/frame of Hands.detect_and_track() for each inference size. The frames are read once from a webcam or a video file with --source and the same frames are used for every size, so the sizes can be compared.
+
+Example: python benchmark.py inference --source video.mp4 --sizes 1280x720 640x360 320x180 --frames 300
+
+--worker runs mediapipe in a separate process. --flow-interval N runs mediapipe only every N frames and tracks the hands with the optical flow in between, the report then also has the percentage of frames mediapipe ran on.
+
+Run `python benchmark.py allocations` to check that the capture and detection loop doesn't allocate a frame sized buffer per frame once it is running. Frames come from a synthetic camera, or from a video file with --source, through Capture into Hands.detect_and_track(). Exits with 1 if any frame sized buffer was allocated in the steady state.
+
+Run `python benchmark.py micro` to time the functions that run every frame: Hands.calculate_relative_landmark(), Hands.finger_angles(), Processor.set_finger_position(), Processor.perform_action_based_on_fingers(), Processor.finger_info() and Mouse.move_mouse(). It needs no camera, display or mediapipe, the landmarks are synthetic, a SyntheticModel stands in for the mediapipe model and the mouse uses the NullBackend without the cursor thread. For every function it reports the latency percentiles of a single call in microseconds, and the bytes allocated per call(the tracemalloc peak during a call) and kept per call. --output saves the results as JSON and --compare prints the change from an earlier JSON file.
+
+Example: python benchmark.py micro --output before.json, then after a change python benchmark.py micro --compare before.json
+
+Run `python benchmark.py e2e` to measure the latency from the capture of a frame to the mouse event it causes, through the same Capture, Hands, Processor, Actuator, Mouse and Cursor as main.py, with a mouse backend that records when every event happened. It needs no camera, display or mediapipe: the frames come at --fps from a synthetic camera, and a scripted hand(GESTURE_SCRIPT) stands in for the mediapipe model, moving the mouse, clicking, clicking again during the cooldown and scrolling. It prints the latency of every mouse event from the capture of its frame, and of every gesture from the moment the hand started to show it, which includes confirm_frames, and how many clicks the cooldown skipped. With --source the frames of a video are given to the real mediapipe model instead. --config runs it with the settings of a config file, to compare settings.
+
+Run `python benchmark.py startup` to time how long the program takes from the launch until the first cursor move. Every run starts a new Python process, which imports the modules, loads the model, warms it up, opens the camera and processes frames like main.py until the mouse moves. The median time of every step over --runs runs is printed, --no-warm-up times the same without the warm up and --config uses the settings of a config file. By default the frames are synthetic and the scripted hand of the e2e benchmark stands in for mediapipe, so the mouse moves on the first frames the hand is confirmed in, but loading and warming up mediapipe is not timed. With --source(a video of a hand) the real mediapipe model is loaded and times every step.
+
+Run `python benchmark.py mouse --backends recording xtest` to time Mouse.move_mouse() and the clicks with every mouse backend, and how long a move takes from Actuator.submit() until the backend performed it. The recording and null backends need no display, xtest and pyautogui can run under Xvfb.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+
+from capture import Capture
+from frame_source import SyntheticCapture, open_source, synthetic_images
+from hands import Hands
+from mouse_backend import NullBackend, RecordingBackend, create_backend
+
+
+class FrameAllocationCounter:
+    """Counts the steps in which at least one frame sized buffer was allocated, with the tracemalloc peak."""
+    def __init__(self, frame_bytes) -> None:
+        self.frame_bytes = frame_bytes
+        self.steps = 0
+        self.allocations = 0
+        self.largest = 0
+        self.baseline = 0
+
+    def start(self):
+        tracemalloc.start()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def step(self):
+        """Call after every iteration. Checks if the memory went up by a frame since the last step."""
+        current, peak = tracemalloc.get_traced_memory()
+        allocated = peak - self.baseline
+
+        self.steps += 1
+        self.largest = max(self.largest, allocated)
+        if allocated >= self.frame_bytes:
+            self.allocations += 1
+
+        self.baseline = current
+        tracemalloc.reset_peak()
+
+    def stop(self):
+        tracemalloc.stop()
+
+
+def parse_size(size):
+    """Turns a WIDTHxHEIGHT string into a (width, height) tuple. full is None, the camera size."""
+    if size == 'full': return None
+
+    width, height = size.lower().split('x')
+    return int(width), int(height)
+
+
+def read_frames(source, frames, cap_width=None, cap_height=None):
+    """Reads up to frames images from a webcam index, a video file or an image directory."""
+    cap = open_source(source, cap_width, cap_height)
+
+    images = []
+    while cap.isOpened() and len(images) < frames:
+        success, image = cap.read()
+        if not success:
+            break
+        images.append(image)
+
+    cap.release()
+    return images
+
+
+def summarize(times):
+    """Returns the mean and the p50, p95 and p99 of times in milliseconds"""
+    times = np.asarray(times) * 1000
+    return {
+        'mean': float(times.mean()),
+        'p50': float(np.percentile(times, 50)),
+        'p95': float(np.percentile(times, 95)),
+        'p99': float(np.percentile(times, 99)),
+    }
+
+
+def benchmark_inference(images, sizes, warmup=10, flow_interval=1, worker=False):
+    """Times detect_and_track() on images for every inference size. Returns a list of (size, summary, detection rate, mediapipe rate)."""
+    results = []
+    for size in sizes:
+        hands = Hands(inference_size=size, flow_interval=flow_interval, worker=worker)
+
+        # The first frames initialize the mediapipe graph
+        for image in images[:warmup]:
+            hands.detect_and_track(image, draw=False, find_relative_pos=True)
+
+        times = []
+        detected = 0
+        inference_frames = hands.inference_frames
+        for image in images:
+            start = time.perf_counter()
+            hands.detect_and_track(image, draw=False, find_relative_pos=True)
+            times.append(time.perf_counter() - start)
+
+            if hands.get_hands_info():
+                detected += 1
+
+        hands.close()
+        results.append((size, summarize(times), detected / len(images), (hands.inference_frames - inference_frames) / len(images)))
+
+    return results
+
+
+def run_inference(args):
+    images = read_frames(args.source, args.frames, args.cap_width, args.cap_height)
+    if not images:
+        print("No frames could be read from", args.source)
+        return
+
+    height, width, _ = images[0].shape
+    sizes = [parse_size(size) for size in args.sizes]
+    print(f"{len(images)} frames of {width}x{height}\n")
+
+    print(f"{'inference size':>16} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'detected':>9} {'mediapipe':>10}")
+    for size, summary, detection_rate, inference_rate in benchmark_inference(images, sizes, warmup=args.warmup, flow_interval=args.flow_interval, worker=args.worker):
+        name = f"{size[0]}x{size[1]}" if size else "full"
+        print(f"{name:>16} {summary['mean']:>6.2f}ms {summary['p50']:>6.2f}ms {summary['p95']:>6.2f}ms {summary['p99']:>6.2f}ms {detection_rate:>8.0%} {inference_rate:>9.0%}")
+
+
+def synthetic_hand(open_fingers=(1, 1, 1, 1, 1), center=(0.5, 0.6), size=0.25):
+    """Returns the 21 mediapipe landmarks, as a percentage of the image, of a hand pointing up. open_fingers is thumb, index, middle, ring and pinky, a closed finger is folded back towards the wrist."""
+    landmarks = np.zeros((21, 3), dtype=np.float32)
+    wrist = np.array(center, dtype=np.float32)
+    landmarks[0, :2] = wrist
+
+    # Each finger is 4 landmarks along a line from the wrist, spread from -50 to 50 degrees around straight up
+    for finger, finger_open in enumerate(open_fingers):
+        direction = np.radians(-50 + 25 * finger)
+        unit = np.array([np.sin(direction), -np.cos(direction)], dtype=np.float32)
+        for joint in range(4):
+            distance = size * (0.4 + 0.2 * joint)
+            # The last 2 landmarks of a closed finger point back at the wrist
+            if not finger_open and joint >= 2:
+                distance = size * (0.8 - 0.25 * (joint - 1))
+            landmarks[1 + finger * 4 + joint, :2] = wrist + unit * distance
+
+    return landmarks
+
+
+def synthetic_results(hands):
+    """Returns an object that looks like the results of mediapipe's process() for a list of (handedness, landmarks)."""
+    multi_hand_landmarks = []
+    multi_handedness = []
+    for handedness, landmarks in hands:
+        multi_hand_landmarks.append(SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in landmarks]))
+        multi_handedness.append(SimpleNamespace(classification=[SimpleNamespace(label=handedness, score=0.99)]))
+
+    return SimpleNamespace(multi_hand_landmarks=multi_hand_landmarks, multi_handedness=multi_handedness)
+
+
+class SyntheticModel:
+    """Stands in for the mediapipe model. process() always returns the same results."""
+    def __init__(self, results) -> None:
+        self.results = results
+
+    def process(self, image):
+        return self.results
+
+    def close(self):
+        pass
+
+
+def time_calls(function, calls, warmup):
+    """Returns the time of every call in microseconds"""
+    for _ in range(warmup):
+        function()
+
+    times = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter_ns()
+        function()
+        times[i] = time.perf_counter_ns() - start
+
+    return times / 1000
+
+
+def measure_allocations(function, calls):
+    """Returns the mean bytes allocated during a call(the tracemalloc peak) and the mean bytes still allocated after a call"""
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+
+    allocated = 0
+    for _ in range(calls):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        function()
+        allocated += tracemalloc.get_traced_memory()[1] - before
+
+    kept = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+
+    return allocated / calls, kept / calls
+
+
+def micro_benchmarks(cap_width=1280, cap_height=720):
+    """Returns a dict of name: function for every per frame function, set up with synthetic landmarks for a right and a left hand."""
+    # Imported here, so the other benchmarks don't need the user settings
+    from image_processor import Processor
+    from user_setting import User
+
+    # Right hand with all fingers open(MOVE) and left hand with all fingers closed(RIGHT_CLICK). Mediapipe's handedness is for a mirrored image, so it is swapped
+    results = synthetic_results([
+        ('Left', synthetic_hand((1, 1, 1, 1, 1), center=(0.35, 0.6))),
+        ('Right', synthetic_hand((0, 0, 0, 0, 0), center=(0.65, 0.6))),
+    ])
+
+    # No mediapipe model, and no cursor thread, so move_mouse() moves the NullBackend itself
+    user = User(show=False)
+    user.cursor_rate = 0
+    hands = Hands(detection_confidence=user.detection_confidence, model=SyntheticModel(results))
+    processor = Processor(user, detection_confidence=user.detection_confidence, mouse_backend=NullBackend(), hands=hands)
+    mouse = processor.mouse_control
+    image = np.zeros((cap_height, cap_width, 3), dtype=np.uint8)
+
+    # Same state as after detect_and_track() on the full image
+    hands.results = results
+    hands.image_height, hands.image_width = cap_height, cap_width
+    hands.scale[:] = (-cap_width, cap_height, cap_width)
+    hands.offset[:] = (cap_width, 0, 0)
+    hands.find_handedness()
+    hands.relative_pos()
+    hand_info = hands.get_hands_info()
+
+    upper_left = (cap_width // 5, cap_height // 5)
+    bottom_right = (cap_width * 4 // 5, cap_height * 4 // 5)
+    mouse.set_tracking_size(upper_left=upper_left, bottom_right=bottom_right)
+
+    hand_landmarks = results.multi_hand_landmarks[0]
+    landmark = hands.landmarks[0].copy()
+    out = np.empty((21, 3), dtype=np.float32)
+    angles = hands.finger_angles(processor.joints, hands.landmarks[:2])
+
+    benchmarks = {
+        'calculate_relative_landmark': lambda: hands.calculate_relative_landmark(hand_landmarks, out=out),
+        'finger_angles': lambda: hands.finger_angles(processor.joints, hands.landmarks[:2]),
+        'set_finger_position': lambda: processor.set_finger_position(image, hand_info[0][0], hand_info[0][1], angles[0]),
+        'perform_action_based_on_fingers': processor.perform_action_based_on_fingers,
+        'finger_info': lambda: processor.finger_info(image, hand_info),
+        'move_mouse': lambda: mouse.move_mouse(landmark),
+    }
+
+    return benchmarks, processor
+
+
+def run_micro(args):
+    benchmarks, processor = micro_benchmarks()
+
+    results = {}
+    for name, function in benchmarks.items():
+        if args.only and name not in args.only:
+            continue
+
+        times = time_calls(function, args.calls, args.warmup)
+        allocated, kept = measure_allocations(function, min(args.calls, 1000))
+        results[name] = {
+            'calls': args.calls,
+            'mean_us': float(times.mean()),
+            'p50_us': float(np.percentile(times, 50)),
+            'p90_us': float(np.percentile(times, 90)),
+            'p99_us': float(np.percentile(times, 99)),
+            'max_us': float(times.max()),
+            'allocated_bytes_per_call': allocated,
+            'kept_bytes_per_call': kept,
+        }
+
+    processor.release()
+
+    print(f"{'function':>32} {'p50':>9} {'p90':>9} {'p99':>9} {'alloc/call':>11} {'kept/call':>10}")
+    for name, result in results.items():
+        print(f"{name:>32} {result['p50_us']:>7.2f}us {result['p90_us']:>7.2f}us {result['p99_us']:>7.2f}us {result['allocated_bytes_per_call']:>9.0f}B {result['kept_bytes_per_call']:>9.1f}B")
+
+    if args.compare:
+        compare(results, args.compare)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({
+                'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'machine': platform.machine(),
+                'results': results,
+            }, file, indent=2)
+        print("\nSaved to", args.output)
+
+
+def compare(results, path):
+    """Prints the change of the p50 and the allocated bytes from an earlier JSON file."""
+    with open(path) as file:
+        earlier = json.load(file)['results']
+
+    print(f"\nCompared to {path}")
+    print(f"{'function':>32} {'p50 before':>11} {'p50 now':>9} {'change':>8} {'alloc before':>13} {'alloc now':>10}")
+    for name, result in results.items():
+        if name not in earlier:
+            continue
+        before = earlier[name]
+        change = (result['p50_us'] - before['p50_us']) / before['p50_us'] if before['p50_us'] else 0
+        print(f"{name:>32} {before['p50_us']:>9.2f}us {result['p50_us']:>7.2f}us {change:>+8.1%} {before['allocated_bytes_per_call']:>11.0f}B {result['allocated_bytes_per_call']:>9.0f}B")
+
+
+def run_mouse(args):
+    # Imported here, so the other benchmarks don't need them
+    from actuator import Actuator
+    from mouse_control import Mouse
+
+    # Landmarks that move the mouse in a circle inside the tracking box
+    upper_left, bottom_right = (256, 144), (1024, 576)
+    landmarks = np.zeros((360, 21, 3), dtype=np.float32)
+    angles = np.radians(np.arange(360))
+    landmarks[:, 9, 0] = 640 + 300 * np.cos(angles)
+    landmarks[:, 9, 1] = 360 + 200 * np.sin(angles)
+
+    print(f"{'backend':>12} {'move p50':>10} {'move p99':>10} {'click p50':>10} {'click p99':>10} {'actuator p50':>13} {'actuator p99':>13}")
+    for name in args.backends:
+        try:
+            backend = create_backend(name)
+        except Exception as error:
+            print(f"{name:>12} not available: {error}")
+            continue
+
+        mouse = Mouse(backend=backend, dead_zone=0)
+        mouse.set_tracking_size(upper_left=upper_left, bottom_right=bottom_right)
+
+        index = iter(range(10 ** 9))
+        move_times = time_calls(lambda: mouse.move_mouse(landmarks[next(index) % 360]), args.calls, warmup=10)
+        click_times = time_calls(lambda: mouse.perform_action("CLICK", None), min(args.calls, 1000), warmup=0)
+
+        # Time from submitting a move to the Actuator until the move was performed on its thread
+        performed = threading.Event()
+        perform_action = mouse.perform_action
+        def perform_and_signal(action, landmark, timestamp=None):
+            perform_action(action, landmark, timestamp)
+            performed.set()
+        mouse.perform_action = perform_and_signal
+
+        actuator = Actuator(mouse)
+        actuator_times = np.empty(min(args.calls, 1000))
+        for i in range(len(actuator_times)):
+            performed.clear()
+            start = time.perf_counter_ns()
+            actuator.submit("MOVE", landmarks[i % 360])
+            performed.wait()
+            actuator_times[i] = (time.perf_counter_ns() - start) / 1000
+        actuator.release()
+
+        print(f"{name:>12} {np.percentile(move_times, 50):>8.1f}us {np.percentile(move_times, 99):>8.1f}us {np.percentile(click_times, 50):>8.1f}us {np.percentile(click_times, 99):>8.1f}us {np.percentile(actuator_times, 50):>11.1f}us {np.percentile(actuator_times, 99):>11.1f}us")
+
+        if isinstance(backend, RecordingBackend):
+            print(f"{'':>12} recorded {len(backend.events)} events")
+        if hasattr(backend, 'close'):
+            backend.close()
+
+
+def run_allocations(args):
+    if args.source:
+        images = read_frames(args.source, args.frames, args.cap_width, args.cap_height)
+    else:
+        images = synthetic_images(args.cap_width, args.cap_height)
+
+    if not images:
+        print("No frames could be read from", args.source)
+        return
+
+    frame_bytes = images[0].nbytes
+    capture = Capture(SyntheticCapture(images, fps=args.fps)).start()
+    hands = Hands(inference_size=parse_size(args.inference_size), roi=args.roi)
+    counter = FrameAllocationCounter(frame_bytes)
+
+    for i in range(args.warmup + args.frames):
+        # Start counting once the buffers are allocated
+        if i == args.warmup:
+            counter.start()
+
+        frame = capture.read()
+        if frame is None:
+            continue
+
+        hands.detect_and_track(frame.image, draw=args.show, find_relative_pos=True)
+
+        if i >= args.warmup:
+            counter.step()
+
+    counter.stop()
+    capture.release()
+    hands.close()
+
+    print(f"Frame size: {frame_bytes} bytes")
+    print(f"Steps with a frame sized allocation: {counter.allocations} of {counter.steps}")
+    print(f"Largest allocation in a step: {counter.largest} bytes")
+
+    if counter.allocations:
+        sys.exit(1)
+
+
+# Gestures of the scripted right hand and how long(in seconds) each is shown, repeated for the whole run. The second click is shown before the click cooldown(pause) is over
+GESTURE_SCRIPT = (
+    ('MOVE', 1.0),
+    ('CLICK', 0.4),
+    ('MOVE', 0.6),
+    ('CLICK', 0.1),
+    ('MOVE', 0.15),
+    ('CLICK', 0.4),
+    ('MOVE', 1.0),
+    ('SCROLL_DOWN', 0.5),
+    ('MOVE', 0.5),
+)
+
+# The mouse event every action makes
+ACTION_EVENTS = {
+    'MOVE': 'move',
+    'CLICK': 'left click',
+    'RIGHT_CLICK': 'right click',
+    'DOUBLE_CLICK': 'double click',
+    'MIDDLE_CLICK': 'middle click',
+    'SCROLL_UP': 'scroll',
+    'SCROLL_DOWN': 'scroll',
+    'MOUSE_DOWN': 'down',
+    'MOUSE_UP': 'up',
+}
+
+
+def scripted_fingers(positions, action):
+    """Returns the open thumb, index, middle, ring and pinky of the first hand position in positions that performs action, or None."""
+    from user_setting import JOINT_LANDMARK
+
+    finger_joints = tuple(JOINT_LANDMARK.values())
+    for fingers, actions in positions.items():
+        for position, position_action in actions.items():
+            if position_action != action: continue
+
+            open_fingers = [1] * len(finger_joints)
+            for joint, is_open in zip(fingers, position):
+                open_fingers[finger_joints.index(tuple(joint))] = is_open
+            return tuple(open_fingers)
+
+    return None
+
+
+class ScriptedHands:
+    """Stands in for the mediapipe model. process() returns the right hand the script shows at time, which is set before every frame."""
+    def __init__(self, script, positions) -> None:
+        self.segments = []
+        start = 0
+        for action, seconds in script:
+            fingers = scripted_fingers(positions, action)
+            if fingers is None:
+                raise ValueError(f"No right hand position performs {action}")
+            self.segments.append((start, start + seconds, action, fingers))
+            start += seconds
+        self.length = start
+
+        self.time = 0
+
+    def segment(self, time):
+        """Returns the (start, end, action, fingers) of the script at time, with start and end in the same loop as time."""
+        loop, offset = divmod(time, self.length)
+        for start, end, action, fingers in self.segments:
+            if offset < end:
+                return loop * self.length + start, loop * self.length + end, action, fingers
+
+    def gestures(self, seconds):
+        """Returns the (start time, action) of every gesture shown in seconds."""
+        gestures = []
+        for loop in range(int(seconds // self.length) + 1):
+            for start, _, action, _ in self.segments:
+                start += loop * self.length
+                if start < seconds:
+                    gestures.append((start, action))
+        return gestures
+
+    def process(self, image):
+        start, _, action, fingers = self.segment(self.time)
+
+        # The hand moves in a circle while it moves the mouse and holds still for the other gestures
+        angle = np.pi * (self.time if action == 'MOVE' else start)
+        center = (0.5 + 0.12 * np.cos(angle), 0.55 + 0.08 * np.sin(angle))
+
+        # Mediapipe's handedness is for a mirrored image, so the right hand is 'Left'
+        return synthetic_results([('Left', synthetic_hand(fingers, center=center))])
+
+    def close(self):
+        pass
+
+
+class LatencyBackend(RecordingBackend):
+    """Records every mouse event with the capture time of the camera frame it came from."""
+    def __init__(self, screen_width=1920, screen_height=1080) -> None:
+        super().__init__(screen_width, screen_height)
+        self.frame_timestamps = []
+        self.lock = threading.Lock()
+
+        # The actuator sets the frame of the action it performs, the cursor thread moves to the target of its newest frame
+        self.frame_timestamp = None
+        self.cursor = None
+
+    def record(self, action, x=None, y=None, button=None, clicks=1):
+        with self.lock:
+            super().record(action, x, y, button, clicks)
+            self.frame_timestamps.append(self.cursor.target_time if action == 'move' and self.cursor is not None else self.frame_timestamp)
+
+
+def event_name(event):
+    """Returns the name of a MouseEvent like in ACTION_EVENTS."""
+    if event.action == 'click':
+        return 'double click' if event.clicks == 2 else f"{event.button} click"
+    return event.action
+
+
+def run_e2e(args):
+    # Imported here, so the other benchmarks don't need the user settings
+    from config import load_config
+    from image_processor import Processor
+    from user_setting import User
+
+    user = load_config(args.config) if args.config else User()
+    user.show = False
+
+    if args.source:
+        images = read_frames(args.source, args.frames, args.cap_width, args.cap_height)
+        if not images:
+            print("No frames could be read from", args.source)
+            return
+        model = None
+    else:
+        images = synthetic_images(args.cap_width, args.cap_height)
+        model = ScriptedHands(GESTURE_SCRIPT, user.right_positions)
+
+    # The same pipeline as main.py, with a mouse backend that records when every event happened
+    backend = LatencyBackend()
+    inference_size = (user.inference_width, user.inference_height) if user.inference_width and user.inference_height else None
+    hands = Hands(detection_confidence=user.detection_confidence, inference_size=inference_size, roi=user.roi_tracking, flow_interval=user.flow_interval, worker=user.inference_worker and model is None, model=model)
+    processor = Processor(user, detection_confidence=user.detection_confidence, mouse_backend=backend, hands=hands)
+    backend.cursor = processor.cursor
+
+    # The actuator thread tells the backend which frame the action it performs came from
+    perform_action = processor.mouse_control.perform_action
+    def perform_and_stamp(action, landmark, timestamp=None):
+        backend.frame_timestamp = timestamp
+        perform_action(action, landmark, timestamp)
+    processor.mouse_control.perform_action = perform_and_stamp
+
+    height, width = images[0].shape[:2]
+    processor.warm_up(width, height)
+
+    # Frames are stamped with the time they were captured, at the frame rate of a camera
+    capture = Capture(SyntheticCapture(images, fps=args.fps)).start()
+    start = time.perf_counter()
+    processed = 0
+    while time.perf_counter() - start < args.seconds:
+        frame = capture.read()
+        if frame is None: continue
+
+        if model is not None:
+            model.time = frame.timestamp - start
+
+        processor.process(frame.image, (width // 5, height // 5), (width * 4 // 5, height * 4 // 5), timestamp=frame.timestamp)
+        processed += 1
+
+    capture.release()
+
+    # Actions still in the queue are performed
+    time.sleep(0.1)
+    skipped = processor.actuator.skipped
+    processor.release()
+
+    # Latency from the capture of a frame to the first mouse event it caused
+    latencies = {}
+    seen = set()
+    events = list(zip(backend.events, backend.frame_timestamps))
+    for event, frame_timestamp in events:
+        name = event_name(event)
+        if frame_timestamp is None or (name, frame_timestamp) in seen: continue
+
+        seen.add((name, frame_timestamp))
+        latencies.setdefault(name, []).append(event.timestamp - frame_timestamp)
+
+    print(f"{processed} frames processed in {args.seconds:.0f}s, capture {capture.stats()}, {len(backend.events)} mouse events")
+    print("\nFrom the capture of a frame to its mouse event")
+    print(f"{'event':>14} {'count':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for name, times in latencies.items():
+        summary = summarize(times)
+        print(f"{name:>14} {len(times):>6} {summary['p50']:>6.2f}ms {summary['p95']:>6.2f}ms {summary['p99']:>6.2f}ms {max(times) * 1000:>6.2f}ms")
+
+    if model is None: return
+
+    # Latency from when the hand started to show a gesture to its first mouse event, with the confirmation and the cooldown
+    gestures = model.gestures(args.seconds)
+    results = {}
+    for i, (gesture_time, action) in enumerate(gestures):
+        gesture_start = start + gesture_time
+        window_end = start + gestures[i + 1][0] + 0.5 if i + 1 < len(gestures) else float('inf')
+        result = results.setdefault(action, {'shown': 0, 'times': []})
+        result['shown'] += 1
+
+        for event, frame_timestamp in events:
+            if frame_timestamp is not None and frame_timestamp >= gesture_start and event.timestamp < window_end and event_name(event) == ACTION_EVENTS[action]:
+                result['times'].append(event.timestamp - gesture_start)
+                break
+
+    print(f"\nFrom the start of a gesture to its first mouse event(confirm_frames {user.confirm_frames}, cooldown {user.pause}s)")
+    print(f"{'gesture':>14} {'shown':>6} {'performed':>10} {'p50':>8} {'p95':>8} {'max':>8}")
+    for action, result in results.items():
+        times = result['times']
+        if not times:
+            print(f"{action:>14} {result['shown']:>6} {0:>10}")
+            continue
+
+        summary = summarize(times)
+        print(f"{action:>14} {result['shown']:>6} {len(times):>10} {summary['p50']:>6.1f}ms {summary['p95']:>6.1f}ms {max(times) * 1000:>6.1f}ms")
+    print(f"Clicks skipped by the cooldown: {skipped}")
+
+
+# Steps of the startup, in order
+STARTUP_STEPS = ('imports', 'model', 'warm up', 'camera', 'first frame', 'first move')
+
+
+def startup_child(args):
+    """Starts like main.py in this process and prints the time.time() after every step as JSON. Runs in a new process, so the imports are not cached."""
+    times = {}
+
+    # Imported here, so their time is part of the startup
+    from config import load_config
+    from image_processor import Processor
+    from user_setting import User
+    times['imports'] = time.time()
+
+    user = load_config(args.config) if args.config else User()
+    user.show = False
+
+    # Without a source the scripted hand of the e2e benchmark moves the mouse, in place of mediapipe
+    model = None if args.source else ScriptedHands(GESTURE_SCRIPT, user.right_positions)
+    inference_size = (user.inference_width, user.inference_height) if user.inference_width and user.inference_height else None
+    hands = Hands(detection_confidence=user.detection_confidence, inference_size=inference_size, roi=user.roi_tracking, flow_interval=user.flow_interval, model=model) if model else None
+    processor = Processor(user, detection_confidence=user.detection_confidence, mouse_backend=RecordingBackend(), hands=hands)
+    mouse = processor.mouse_control
+    times['model'] = time.time()
+
+    if not args.no_warm_up:
+        processor.warm_up(args.cap_width, args.cap_height)
+    times['warm up'] = time.time()
+
+    if args.source:
+        cap = open_source(args.source, args.cap_width, args.cap_height)
+    else:
+        cap = SyntheticCapture(synthetic_images(args.cap_width, args.cap_height), fps=args.fps)
+    capture = Capture(cap).start()
+    times['camera'] = time.time()
+
+    # Process frames like main.py until the mouse moves
+    start_time = time.perf_counter()
+    deadline = start_time + args.timeout
+    first_process = None
+    while capture.isOpened() and time.perf_counter() < deadline and mouse.first_move_time is None:
+        frame = capture.read()
+        if frame is None: continue
+
+        if model is not None:
+            model.time = frame.timestamp - start_time
+
+        height, width = frame.image.shape[:2]
+        start = time.perf_counter()
+        processor.process(frame.image, (width // 5, height // 5), (width * 4 // 5, height * 4 // 5), timestamp=frame.timestamp)
+
+        if first_process is None:
+            first_process = time.perf_counter() - start
+            times['first frame'] = time.time()
+
+    if mouse.first_move_time is not None:
+        times['first move'] = time.time() - (time.perf_counter() - mouse.first_move_time)
+    times['first process'] = first_process
+
+    capture.release()
+    processor.release()
+    print(json.dumps(times))
+
+
+def run_startup(args):
+    if args.child:
+        startup_child(args)
+        return
+
+    command = [sys.executable, __file__, 'startup', '--child', '--cap-width', str(args.cap_width), '--cap-height', str(args.cap_height), '--fps', str(args.fps), '--timeout', str(args.timeout)]
+    if args.source:
+        command += ['--source', args.source]
+    if args.config:
+        command += ['--config', args.config]
+    if args.no_warm_up:
+        command.append('--no-warm-up')
+
+    runs = []
+    for run in range(args.runs):
+        launched = time.time()
+        child = subprocess.run(command, capture_output=True, text=True)
+        if child.returncode != 0:
+            print(child.stderr)
+            print("The startup failed in run", run + 1)
+            sys.exit(1)
+
+        # The JSON is the last line, the program may print before it
+        times = json.loads(child.stdout.strip().splitlines()[-1])
+        runs.append(times | {step: times[step] - launched for step in STARTUP_STEPS if step in times})
+
+    print(f"Startup over {args.runs} runs, median seconds {'without' if args.no_warm_up else 'with'} warm up")
+    print(f"{'step':<14}{'since launch':>14}{'step':>10}")
+    previous = 0
+    for step in STARTUP_STEPS:
+        seconds = [times[step] for times in runs if step in times]
+        if len(seconds) < len(runs):
+            print(f"{step:<14}{'not reached in ' + str(len(runs) - len(seconds)) + ' runs':>24}")
+            continue
+
+        median = float(np.median(seconds))
+        print(f"{step:<14}{median:>14.3f}{median - previous:>10.3f}")
+        previous = median
+
+    first_process = [times['first process'] for times in runs if times['first process'] is not None]
+    if first_process:
+        print(f"First frame processed in {np.median(first_process) * 1000:.1f}ms")
+    if not all('first move' in times for times in runs):
+        print(f"The mouse didn't move within {args.timeout}s in every run, use --source with a video of a hand")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the hand tracking")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    inference = subparsers.add_parser('inference', help="ms/frame of detect_and_track() for each inference size")
+    inference.add_argument('--source', default='0', help="webcam index, video file or image directory")
+    inference.add_argument('--frames', type=int, default=200, help="number of frames to time")
+    inference.add_argument('--warmup', type=int, default=10, help="number of frames to run before timing")
+    inference.add_argument('--cap-width', type=int, default=1280)
+    inference.add_argument('--cap-height', type=int, default=720)
+    inference.add_argument('--sizes', nargs='+', default=['1280x720', '960x540', '640x360', '480x270', '320x180'], help="inference sizes as WIDTHxHEIGHT or full")
+    inference.add_argument('--flow-interval', type=int, default=1, help="run mediapipe every N frames and the optical flow in between")
+    inference.add_argument('--worker', action='store_true', help="run mediapipe in a separate process")
+    inference.set_defaults(run=run_inference)
+
+    allocations = subparsers.add_parser('allocations', help="checks that no frame sized buffer is allocated per frame")
+    allocations.add_argument('--source', default=None, help="webcam index, video file or image directory, a synthetic frame by default")
+    allocations.add_argument('--frames', type=int, default=300, help="number of frames to count")
+    allocations.add_argument('--warmup', type=int, default=30, help="number of frames to run before counting")
+    allocations.add_argument('--fps', type=int, default=30, help="frame rate of the synthetic camera")
+    allocations.add_argument('--cap-width', type=int, default=1280)
+    allocations.add_argument('--cap-height', type=int, default=720)
+    allocations.add_argument('--inference-size', default='640x360', help="inference size as WIDTHxHEIGHT or full")
+    allocations.add_argument('--roi', action='store_true', help="use region of interest tracking")
+    allocations.add_argument('--show', action='store_true', help="also draw and mirror the image")
+    allocations.set_defaults(run=run_allocations)
+
+    micro = subparsers.add_parser('micro', help="latency and allocations of the per frame functions, without a camera or display")
+    micro.add_argument('--calls', type=int, default=10000, help="number of timed calls per function")
+    micro.add_argument('--warmup', type=int, default=100, help="number of calls before timing")
+    micro.add_argument('--only', nargs='+', default=None, help="only run these functions")
+    micro.add_argument('--output', default=None, help="save the results to this JSON file")
+    micro.add_argument('--compare', default=None, help="compare to the results in this JSON file")
+    micro.set_defaults(run=run_micro)
+
+    mouse = subparsers.add_parser('mouse', help="latency and throughput of the mouse backends")
+    mouse.add_argument('--backends', nargs='+', default=['null', 'recording'], help="mouse backends to time: pyautogui, xtest, null or recording")
+    mouse.add_argument('--calls', type=int, default=5000, help="number of timed moves per backend")
+    mouse.set_defaults(run=run_mouse)
+
+    e2e = subparsers.add_parser('e2e', help="latency from the capture of a frame to the mouse event, through the whole program")
+    e2e.add_argument('--source', default=None, help="webcam index, video file or image directory, default synthetic frames with a scripted hand")
+    e2e.add_argument('--config', default=None, help="JSON config file with the settings")
+    e2e.add_argument('--seconds', type=float, default=10.0, help="how long to run")
+    e2e.add_argument('--frames', type=int, default=300, help="number of frames to read from the source")
+    e2e.add_argument('--fps', type=int, default=30, help="frame rate the frames are given at")
+    e2e.add_argument('--cap-width', type=int, default=1280)
+    e2e.add_argument('--cap-height', type=int, default=720)
+    e2e.set_defaults(run=run_e2e)
+
+    startup = subparsers.add_parser('startup', help="time from the launch until the first cursor move, in a new process")
+    startup.add_argument('--source', default=None, help="webcam index, video file or image directory, default synthetic frames with a scripted hand")
+    startup.add_argument('--config', default=None, help="JSON config file with the settings")
+    startup.add_argument('--runs', type=int, default=5, help="number of new processes to time")
+    startup.add_argument('--cap-width', type=int, default=1280)
+    startup.add_argument('--cap-height', type=int, default=720)
+    startup.add_argument('--fps', type=int, default=30, help="frame rate of the synthetic frames")
+    startup.add_argument('--timeout', type=float, default=10.0, help="seconds to wait for the first move after the camera opened")
+    startup.add_argument('--no-warm-up', action='store_true', help="don't warm up mediapipe before the camera opens, to compare")
+    startup.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    startup.set_defaults(run=run_startup)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == '__main__':
+    main()
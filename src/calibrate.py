@@ -0,0 +1,99 @@
+"""
+Calibrates where your hand moves the mouse. You hold your hand where the mouse should be at every corner of the screen, and the calibration maps those hand positions to the corners, so the hand can reach the whole screen from a comfortable area that doesn't have to be a straight box in front of the camera.
+
+For every corner, press Enter while holding the hand there. The mouse point of the hand(mouse_point in user_setting.py) is measured over --seconds seconds and its median is used. The positions are measured in the tracking box of main.py, so the calibration works at every camera size, and mapped to the monitors chosen with the monitor setting. The least squares affine fit of the 4 corners is the screen_calibration setting. With --config it is saved to that config file, otherwise it is printed to copy into user_setting.py.
+
+Example: python calibrate.py --config settings.json
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from capture import Capture
+from config import load_config
+from frame_source import is_camera, open_source
+from hand_stream import BOTTOM_RIGHT_BOUND, TOP_LEFT_BOUND, track_hands
+from screen_mapping import fit_calibration
+from user_setting import User
+
+# Every corner of the screen, as a position on the monitors(0 - 1)
+CORNERS = (
+    ('top left', (0, 0)),
+    ('top right', (1, 0)),
+    ('bottom right', (1, 1)),
+    ('bottom left', (0, 1)),
+)
+
+
+def measure(stream, position, seconds):
+    """Returns the median position of the mouse point in the tracking box(0 - 1) over seconds, or None if no hand was seen."""
+    points = []
+    end = time.perf_counter() + seconds
+    for hands in stream:
+        if hands.handedness:
+            width, height = hands.image_size
+            upper_left = (width // TOP_LEFT_BOUND, height // TOP_LEFT_BOUND)
+            bottom_right = (width * BOTTOM_RIGHT_BOUND // TOP_LEFT_BOUND, height * BOTTOM_RIGHT_BOUND // TOP_LEFT_BOUND)
+            x, y = hands.landmarks[0, position, :2].tolist()
+            points.append(((x - upper_left[0]) / (bottom_right[0] - upper_left[0]), (y - upper_left[1]) / (bottom_right[1] - upper_left[1])))
+
+        if time.perf_counter() > end:
+            break
+
+    if not points: return None
+
+    return tuple(np.median(points, axis=0).tolist())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrates where your hand moves the mouse")
+    parser.add_argument('--config', default=None, help="JSON config file to read the settings from and save the calibration to")
+    parser.add_argument('--camera', default=None, help="webcam index, video file or image directory, default the camera setting")
+    parser.add_argument('--seconds', type=float, default=1.0, help="how long every corner is measured")
+    args = parser.parse_args()
+
+    user = load_config(args.config) if args.config else User()
+    user.show = False
+
+    camera = user.camera if args.camera is None else args.camera
+    cap = open_source(camera, user.cap_width, user.cap_height, user.cap_fps, user.cap_fourcc, user.cap_buffer_size)
+    capture = Capture(cap, live=is_camera(camera)).start()
+    stream = track_hands(capture, user=user)
+
+    hand_points = []
+    screen_points = []
+    try:
+        for name, corner in CORNERS:
+            point = None
+            while point is None:
+                input(f"Hold your hand where the mouse should be at the {name} corner of the screen and press Enter")
+                point = measure(stream, user.mouse_point, args.seconds)
+                if point is None:
+                    print("No hand was seen, try again")
+
+            print(f"{name}: {point[0]:.2f}, {point[1]:.2f} of the tracking box")
+            hand_points.append(point)
+            screen_points.append(corner)
+    finally:
+        stream.close()
+        capture.release()
+
+    calibration = fit_calibration(hand_points, screen_points).round(4).tolist()
+
+    if args.config:
+        with open(args.config) as file:
+            settings = json.load(file)
+        settings['screen_calibration'] = calibration
+        with open(args.config, 'w') as file:
+            json.dump(settings, file, indent=2)
+        print("Saved the calibration to", args.config)
+    else:
+        print("Copy this into user_setting.py:")
+        print("screen_calibration =", calibration)
+
+
+if __name__ == '__main__':
+    main()
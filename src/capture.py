@@ -0,0 +1,151 @@
+"""
+The Capture class reads frames from a cv2.VideoCapture on its own thread so that the processor is never handed a frame that has been waiting in the camera driver queue.
+
+The Capture class takes the argument cap, which is an opened cv2.VideoCapture(or anything with the same isOpened(), read() and release() methods). The optional stale_after argument is how old(in seconds) a frame can be before it is counted as stale when it is read. The optional live argument is True for a webcam, which is read again after a failed read. A video file or a directory of images is not live, its first failed read is the end of the stream and stops the capture, so isOpened() turns False.
+
+The start() method starts the capture thread. The read() method blocks until a frame newer than the last one read is available and returns a Frame. Only the newest frame is kept in a single slot buffer, any frame that is replaced before it is read is counted as dropped.
+
+Frames are read with cap.read(image) into a pool of 3 preallocated buffers, one being written by the capture thread, one in the slot and one held by the reader, so no frame sized buffer is allocated per frame. The image of a Frame is only valid until the next call to read(), copy it if it has to be kept.
+
+The set() method takes a property and a value like cv2.VideoCapture.set(), for example to change the camera size while it is running. The property is set by the capture thread between two reads, so the camera is never used by two threads at once.
+
+The Frame namedtuple holds the image, the frame index and the time.perf_counter() timestamp taken right after the frame was captured.
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+Frame = namedtuple('Frame', ['image', 'index', 'timestamp'])
+
+
+class Capture:
+    """Captures frames on a separate thread and keeps only the newest one."""
+    def __init__(self, cap, stale_after=0.05, live=True) -> None:
+        self.cap = cap
+        self.stale_after = stale_after
+        self.live = live
+
+        # Single slot buffer that holds the newest frame
+        self.frame = None
+        
+        # Pool of image buffers, and which buffer is in the slot and which is held by the reader
+        self.buffers = [None, None, None]
+        self.slot_buffer = None
+        self.reader_buffer = None
+        self.condition = threading.Condition()
+        self.thread = None
+        
+        # Properties set by the capture thread before the next read
+        self.pending_properties = {}
+        self.running = False
+
+        # Frame counters
+        self.captured = 0
+        self.dropped = 0
+        self.stale = 0
+        self.failed = 0
+        self.last_index = -1
+
+    def start(self):
+        """Starts the capture thread."""
+        if self.running: return self
+
+        self.running = True
+        self.thread = threading.Thread(target=self.update, name='capture', daemon=True)
+        self.thread.start()
+
+        return self
+
+    def update(self):
+        """Capture loop. Reads frames and replaces the frame in the slot with the newest one."""
+        while self.running and self.cap.isOpened():
+            # Write into the buffer that is neither in the slot nor held by the reader
+            with self.condition:
+                free = next(i for i in range(len(self.buffers)) if i != self.slot_buffer and i != self.reader_buffer)
+                properties, self.pending_properties = self.pending_properties, {}
+            
+            for prop, value in properties.items():
+                self.cap.set(prop, value)
+            
+            if self.buffers[free] is None:
+                success, image = self.cap.read()
+            else:
+                success, image = self.cap.read(self.buffers[free])
+            timestamp = time.perf_counter()
+
+            if not success:
+                self.failed += 1
+                # A video file or an image directory ended
+                if not self.live:
+                    break
+                time.sleep(0.001)
+                continue
+
+            with self.condition:
+                # The frame in the slot was never read, so it is dropped
+                if self.frame is not None and self.frame.index != self.last_index:
+                    self.dropped += 1
+
+                # read() only allocates a new image if the buffer has the wrong size
+                self.buffers[free] = image
+                self.slot_buffer = free
+                
+                self.frame = Frame(image, self.captured, timestamp)
+                self.captured += 1
+                self.condition.notify_all()
+
+        # Wake up anyone waiting in read()
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+    def read(self, timeout=1.0):
+        """Waits for a frame newer than the last one read and returns it. Returns None if there is no new frame before the timeout or if the capture stopped."""
+        with self.condition:
+            if not self.condition.wait_for(lambda: not self.running or (self.frame is not None and self.frame.index != self.last_index), timeout):
+                return None
+
+            frame = self.frame
+            if frame is None or frame.index == self.last_index:
+                return None
+
+            self.last_index = frame.index
+            self.reader_buffer = self.slot_buffer
+
+        if time.perf_counter() - frame.timestamp > self.stale_after:
+            self.stale += 1
+
+        return frame
+
+    def set(self, prop, value):
+        """Sets a property of the camera on the capture thread, before the next frame is read."""
+        # Not started yet, so nothing else uses the camera
+        if not self.running:
+            self.cap.set(prop, value)
+            return
+
+        with self.condition:
+            self.pending_properties[prop] = value
+
+    def isOpened(self):
+        """Returns True while the capture thread is running."""
+        return self.running
+
+    def stats(self):
+        """Returns the frame counters"""
+        return {
+            'captured': self.captured,
+            'dropped': self.dropped,
+            'stale': self.stale,
+            'failed': self.failed,
+        }
+
+    def release(self):
+        """Stops the capture thread and releases the camera."""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+        self.cap.release()
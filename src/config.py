@@ -0,0 +1,90 @@
+"""
+Reads and writes the user settings as a JSON config file, so the program can start without asking anything.
+
+The load_config() function takes the path of a config file and returns a User. Every key of the file is an argument of the User class, like "show": false or "cap_width": 640, and every setting that is not in the file keeps its default from user_setting.py. An unknown key raises a ValueError.
+
+The right_positions and left_positions are a list of finger sets, every finger set has the names of its fingers and the actions, with the finger position written as a string of 0(closed) and 1(open):
+
+    "right_positions": [
+        {"fingers": ["Index", "Middle", "Ring", "Pinky"], "actions": {"1111": "MOVE", "0000": "CLICK"}}
+    ]
+
+The save_config() function takes a User and a path and writes every setting to a config file, for example after changing them with User.setting(). settings_from_user() and user_from_settings() do the same with a dict, the recordings of session_recorder.py keep the settings this way.
+"""
+
+import inspect
+import json
+
+from user_setting import JOINT_LANDMARK, JOINT_LANDMARK_REVERSE, MOUSE_ACTIONS, User
+
+POSITION_SETTINGS = ('right_positions', 'left_positions')
+
+
+def positions_from_json(finger_sets):
+    """Returns the positions dict of User from the list of finger sets of a config file."""
+    positions = {}
+    for finger_set in finger_sets:
+        unknown = [finger for finger in finger_set['fingers'] if finger not in JOINT_LANDMARK]
+        if unknown:
+            raise ValueError(f"Unknown fingers {unknown}, choose from {', '.join(JOINT_LANDMARK)}")
+
+        fingers = tuple(JOINT_LANDMARK[finger] for finger in finger_set['fingers'])
+        actions = {}
+        for position, action in finger_set['actions'].items():
+            if action not in MOUSE_ACTIONS:
+                raise ValueError(f"Unknown action {action!r}, choose from {', '.join(MOUSE_ACTIONS)}")
+            actions[tuple(int(is_open) for is_open in position)] = action
+
+        positions[fingers] = actions
+
+    return positions
+
+
+def positions_to_json(positions):
+    """Returns the list of finger sets of a config file from the positions dict of User."""
+    return [
+        {
+            'fingers': [JOINT_LANDMARK_REVERSE[joint] for joint in fingers],
+            'actions': {''.join(str(is_open) for is_open in position): action for position, action in actions.items()},
+        }
+        for fingers, actions in positions.items()
+    ]
+
+
+def load_config(path):
+    """Returns a User with the settings of the config file."""
+    with open(path) as file:
+        settings = json.load(file)
+
+    return user_from_settings(settings, path)
+
+
+def user_from_settings(settings, source='the settings'):
+    """Returns a User from a dict of settings like in a config file."""
+    settings = dict(settings)
+    names = [name for name in inspect.signature(User).parameters]
+    unknown = [name for name in settings if name not in names]
+    if unknown:
+        raise ValueError(f"Unknown settings {unknown} in {source}, the settings are {', '.join(names)}")
+
+    for name in POSITION_SETTINGS:
+        if name in settings:
+            settings[name] = positions_from_json(settings[name])
+
+    return User(**settings)
+
+
+def settings_from_user(user):
+    """Returns a dict of every setting of user like in a config file."""
+    settings = {}
+    for name in inspect.signature(User).parameters:
+        value = getattr(user, name)
+        settings[name] = positions_to_json(value) if name in POSITION_SETTINGS else value
+
+    return settings
+
+
+def save_config(user, path):
+    """Writes every setting of user to a config file."""
+    with open(path, 'w') as file:
+        json.dump(settings_from_user(user), file, indent=2)
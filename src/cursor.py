@@ -0,0 +1,122 @@
+"""
+The Cursor class moves the mouse on its own thread at the display rate(like 120 Hz), so the mouse moves smoothly even though the camera only gives a new hand position 30 times a second.
+
+The Cursor class takes the argument backend, a mouse backend from mouse_backend.py. The optional arguments are rate, max_extrapolation, stale_after, velocity_smoothing and mapping. The argument rate is how many times per second the mouse is moved. The argument max_extrapolation is the longest time(in seconds) the mouse keeps moving past the newest target with its velocity. The argument stale_after is how long after the newest target the mouse stops moving, for example when the hand is gone. The argument velocity_smoothing(0 - 1) is how much of a new velocity is used, the rest is the old velocity. The argument mapping is the ScreenMapping of the Mouse, the extrapolated mouse is kept on its monitors. None keeps it on the screen of the backend.
+
+The set_target() method takes the screen x and y from the vision loop and the timestamp of the camera frame they came from. Every tick the cursor thread moves the mouse to the newest target plus the velocity times the time since that frame, capped at max_extrapolation. The mouse is only moved if it moved by at least a pixel. Mouse keeps setting the target while the hand holds still in the dead zone, so the velocity decays to 0 and the mouse doesn't stay at an overshoot. The snap() method moves the mouse to the target right away and stops the extrapolation, Mouse calls it before a click so the click lands where the hand is. first_move_time is the time.perf_counter() the thread first moved the mouse.
+"""
+
+import threading
+import time
+
+
+class Cursor:
+    """Moves the mouse at a fixed rate towards the extrapolated target."""
+    def __init__(self, backend, rate=120, max_extrapolation=0.05, stale_after=0.25, velocity_smoothing=0.5, mapping=None) -> None:
+        self.backend = backend
+        self.interval = 1 / rate
+        self.max_extrapolation = max_extrapolation
+        self.stale_after = stale_after
+        self.velocity_smoothing = velocity_smoothing
+
+        self.screen_width, self.screen_height = backend.size()
+        self.mapping = mapping
+
+        # Newest target, its timestamp and the velocity in pixels per second
+        self.target = None
+        self.target_time = 0
+        self.velocity_x, self.velocity_y = 0.0, 0.0
+        self.lock = threading.Lock()
+
+        # Where the mouse was last moved to
+        self.x, self.y = None, None
+        self.moves = 0
+        self.first_move_time = None
+
+        self.running = True
+        self.thread = threading.Thread(target=self.update, name='cursor', daemon=True)
+        self.thread.start()
+
+    def set_target(self, x, y, timestamp=None):
+        """Sets the newest target from a camera frame captured at timestamp(time.perf_counter())."""
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        with self.lock:
+            if self.target is not None and timestamp > self.target_time and timestamp - self.target_time < self.stale_after:
+                dt = timestamp - self.target_time
+                velocity_x = (x - self.target[0]) / dt
+                velocity_y = (y - self.target[1]) / dt
+
+                self.velocity_x += (velocity_x - self.velocity_x) * self.velocity_smoothing
+                self.velocity_y += (velocity_y - self.velocity_y) * self.velocity_smoothing
+            else:
+                self.velocity_x, self.velocity_y = 0.0, 0.0
+
+            self.target = (x, y)
+            self.target_time = timestamp
+
+    def position(self, now):
+        """Returns where the mouse should be at now, or None if there is no recent target."""
+        with self.lock:
+            if self.target is None: return None
+
+            elapsed = now - self.target_time
+            if elapsed > self.stale_after: return None
+
+            elapsed = min(max(elapsed, 0), self.max_extrapolation)
+            x = self.target[0] + self.velocity_x * elapsed
+            y = self.target[1] + self.velocity_y * elapsed
+
+        # Keep the mouse on the screen
+        if self.mapping is not None:
+            return self.mapping.clamp(x, y)
+        
+        x = min(max(x, 0), self.screen_width - 1)
+        y = min(max(y, 0), self.screen_height - 1)
+
+        return x, y
+
+    def update(self):
+        """Cursor loop. Moves the mouse every interval."""
+        next_time = time.perf_counter()
+        while self.running:
+            position = self.position(time.perf_counter())
+
+            if position is not None:
+                x, y = position
+                if self.x is None or abs(x - self.x) >= 1 or abs(y - self.y) >= 1:
+                    self.move_to(x, y)
+
+            # Sleep until the next tick, skip ticks if the loop fell behind
+            next_time += self.interval
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_time = time.perf_counter()
+
+    def move_to(self, x, y):
+        """Moves the mouse of the backend."""
+        self.backend.move_to(x, y)
+        self.x, self.y = x, y
+        self.moves += 1
+
+        if self.first_move_time is None:
+            self.first_move_time = time.perf_counter()
+
+    def snap(self):
+        """Moves the mouse to the newest target and stops the extrapolation until the next target."""
+        with self.lock:
+            if self.target is None: return
+
+            self.velocity_x, self.velocity_y = 0.0, 0.0
+            x, y = self.target
+
+        if self.x is None or abs(x - self.x) >= 1 or abs(y - self.y) >= 1:
+            self.move_to(x, y)
+
+    def release(self):
+        """Stops the cursor thread."""
+        self.running = False
+        self.thread.join(timeout=1.0)
@@ -0,0 +1,187 @@
+"""
+Scores the mouse smoothing offline on recorded landmark traces, so min_cutoff, beta and dead_zone in user_setting.py can be tuned without a camera.
+
+A trace is a CSV file with the columns t, x, y(seconds and screen pixels, a header line is optional), a .npy file with an array of shape (N, 3) in the same order, or a recording of session_recorder.py(the record_file setting), from which the mouse point of every frame a hand moved the mouse is used. --synthetic makes a trace of a hand that holds still, moves fast, and holds still again, with camera jitter, at --fps.
+
+Every setting is scored on two numbers. Jitter is the RMS distance(pixels) the filtered point moves from one sample to the next while the hand holds still. The first --settle seconds after every move are not counted as still, so a filter that is still catching up with a move is counted as laggy, not as jittery. Lag is how far(milliseconds) the filtered point is shifted behind the trace while the hand moves, found by the time shift with the smallest RMS error up to --max-lag. A lag that reaches --max-lag is only known to be at least that long, it is printed with >= and those settings are not ranked. Lower is better for both, and every setting trades one for the other. The old filter, which moved 1/movement_speed of the way every frame, is scored too so they can be compared.
+
+Example: python filter_tuning.py trace.csv --min-cutoffs 0.5 1 2 --betas 0.001 0.01 0.05
+"""
+
+import argparse
+import itertools
+
+import numpy as np
+
+from filters import PointFilter
+from session_recorder import MAGIC, mouse_trace
+
+
+def load_trace(path):
+    """Returns the t, x and y of a trace as an array of shape (N, 3)."""
+    with open(path, 'rb') as file:
+        is_recording = file.read(len(MAGIC)) == MAGIC
+
+    if is_recording:
+        trace = mouse_trace(path)
+        if len(trace) == 0:
+            raise ValueError(f"The mouse was never moved in {path}")
+    elif path.endswith('.npy'):
+        trace = np.load(path)
+    else:
+        # Skips the header line if there is one
+        with open(path) as file:
+            first = file.readline()
+        try:
+            float(first.split(',')[0])
+            skip = 0
+        except ValueError:
+            skip = 1
+        trace = np.loadtxt(path, delimiter=',', skiprows=skip)
+
+    trace = np.asarray(trace, dtype=np.float64)
+    if trace.ndim != 2 or trace.shape[1] < 3:
+        raise ValueError(f"{path} should have the columns t, x and y")
+
+    return trace[:, :3]
+
+
+def synthetic_trace(fps=30, seconds=6, jitter=2.0, seed=0):
+    """Returns a trace that holds still, moves fast across the screen and holds still again, with jitter."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(fps * seconds)) / fps
+
+    # Still for the first and last third, a smooth 1000 pixel move in between
+    progress = np.clip((t - seconds / 3) / (seconds / 3), 0, 1)
+    progress = progress * progress * (3 - 2 * progress)
+    x = 400 + 1000 * progress
+    y = 300 + 400 * progress
+
+    x += rng.normal(0, jitter, len(t))
+    y += rng.normal(0, jitter, len(t))
+
+    return np.column_stack((t, x, y))
+
+
+def reference(trace, window=5):
+    """Returns the trace smoothed by a centered moving average, the best guess of where the hand really was."""
+    kernel = np.ones(window) / window
+    pad = window // 2
+    smoothed = np.empty_like(trace[:, 1:])
+    for column in range(2):
+        padded = np.pad(trace[:, column + 1], pad, mode='edge')
+        smoothed[:, column] = np.convolve(padded, kernel, mode='valid')
+
+    return smoothed
+
+
+def moving_mask(trace, speed_threshold=100):
+    """Returns which samples of the trace move faster than speed_threshold pixels per second."""
+    smoothed = reference(trace, 9)
+    dt = np.gradient(trace[:, 0])
+    dt[dt <= 0] = np.inf
+    speed = np.hypot(np.gradient(smoothed[:, 0]), np.gradient(smoothed[:, 1])) / dt
+
+    return speed > speed_threshold
+
+
+def still_mask(trace, moving, settle=0.5):
+    """Returns which samples hold still and are more than settle seconds after the last moving sample."""
+    # Index of the last moving sample at or before every sample, -1 before the first move
+    last_moving = np.maximum.accumulate(np.where(moving, np.arange(len(moving)), -1))
+    since_move = trace[:, 0] - trace[np.maximum(last_moving, 0), 0]
+
+    return ~moving & ((last_moving < 0) | (since_move > settle))
+
+
+def apply_one_euro(trace, min_cutoff, beta, d_cutoff=1.0, dead_zone=1.0):
+    """Returns where the mouse would be after every sample with the 1€ filter."""
+    point_filter = PointFilter(min_cutoff=min_cutoff, beta=beta, d_cutoff=d_cutoff, dead_zone=dead_zone)
+    output = np.empty((len(trace), 2))
+    for i, (t, x, y) in enumerate(trace):
+        output[i, 0], output[i, 1], _ = point_filter.filter(x, y, t)
+
+    return output
+
+
+def apply_movement_speed(trace, movement_speed):
+    """Returns where the mouse would be after every sample with the old filter, which moved 1/movement_speed of the way."""
+    output = np.empty((len(trace), 2))
+    x, y = trace[0, 1], trace[0, 2]
+    for i in range(len(trace)):
+        x += (trace[i, 1] - x) / movement_speed
+        y += (trace[i, 2] - y) / movement_speed
+        output[i] = x, y
+
+    return output
+
+
+def score(trace, output, target, moving, still, max_lag=0.3):
+    """Returns the jitter in pixels per sample while still, the lag in milliseconds while moving, and True if the lag reached max_lag."""
+    # The jitter is how much the mouse shakes from frame to frame
+    still = still[1:]
+    steps = np.sum(np.diff(output, axis=0) ** 2, axis=1)
+    jitter = np.sqrt(np.mean(steps[still])) if still.any() else float('nan')
+
+    if not moving.any(): return jitter, float('nan'), False
+
+    # The lag is the shift of the reference that fits the filtered point best
+    interval = np.median(np.diff(trace[:, 0]))
+    max_shift = int(max_lag / interval)
+    best_shift, best_error = 0, np.inf
+    for shift in range(max_shift + 1):
+        indices = np.nonzero(moving)[0]
+        indices = indices[indices >= shift]
+        if not len(indices): break
+        error = np.mean(np.sum((output[indices] - target[indices - shift]) ** 2, axis=1))
+        if error < best_error:
+            best_shift, best_error = shift, error
+
+    return jitter, best_shift * interval * 1000, best_shift == max_shift
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scores lag against jitter of the mouse smoothing on a recorded trace")
+    parser.add_argument('trace', nargs='?', help="CSV(t,x,y) or .npy trace")
+    parser.add_argument('--synthetic', action='store_true', help="use a synthetic trace instead of a file")
+    parser.add_argument('--fps', type=float, default=30, help="frame rate of the synthetic trace")
+    parser.add_argument('--min-cutoffs', type=float, nargs='+', default=[0.3, 0.5, 1.0, 2.0, 4.0])
+    parser.add_argument('--betas', type=float, nargs='+', default=[0.0, 0.001, 0.005, 0.01, 0.05])
+    parser.add_argument('--d-cutoff', type=float, default=1.0)
+    parser.add_argument('--dead-zone', type=float, default=1.0)
+    parser.add_argument('--settle', type=float, default=0.5, help="seconds after a move that are not counted as still")
+    parser.add_argument('--max-lag', type=float, default=0.3, help="longest lag in seconds that is searched")
+    parser.add_argument('--movement-speeds', type=float, nargs='+', default=[2, 4, 6], help="settings of the old filter to compare with")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        trace = synthetic_trace(fps=args.fps)
+    elif args.trace:
+        trace = load_trace(args.trace)
+    else:
+        parser.error("give a trace or --synthetic")
+
+    target = reference(trace)
+    moving = moving_mask(trace)
+    still = still_mask(trace, moving, args.settle)
+    print(f"{len(trace)} samples, {trace[-1, 0] - trace[0, 0]:.1f}s, {moving.mean() * 100:.0f}% moving, {still.mean() * 100:.0f}% still")
+    print(f"{'filter':<34}{'jitter(px)':>12}{'lag(ms)':>10}")
+
+    outputs = [(f'movement_speed={movement_speed:g}', apply_movement_speed(trace, movement_speed)) for movement_speed in args.movement_speeds]
+    for min_cutoff, beta in itertools.product(args.min_cutoffs, args.betas):
+        outputs.append((f'min_cutoff={min_cutoff:g} beta={beta:g}', apply_one_euro(trace, min_cutoff, beta, args.d_cutoff, args.dead_zone)))
+
+    saturated = []
+    for name, output in outputs:
+        jitter, lag, at_max_lag = score(trace, output, target, moving, still, args.max_lag)
+        lag_text = f">={lag:.0f}" if at_max_lag else f"{lag:.0f}"
+        print(f"{name:<34}{jitter:>12.2f}{lag_text:>10}")
+        if at_max_lag:
+            saturated.append(name)
+
+    if saturated:
+        print(f"\n{len(saturated)} filters lag {args.max_lag * 1000:.0f}ms or more and can't be ranked, raise --max-lag to rank them: {', '.join(saturated)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+The OneEuroFilter class smooths a noisy value with the 1€ filter(Casiez et al. 2012). It is a low pass filter whose cutoff frequency goes up with the speed of the value, so a still hand has very little jitter and a fast hand has very little lag. It uses the real time between values, so the smoothing is the same at any frame rate.
+
+The OneEuroFilter class takes optional arguments: min_cutoff, beta and d_cutoff. The argument min_cutoff is the cutoff frequency(Hz) when the value doesn't move, lower means less jitter. The argument beta is how much the cutoff goes up with the speed, higher means less lag. The argument d_cutoff is the cutoff frequency used to smooth the speed.
+
+The filter() method takes a value and its timestamp in seconds and returns the filtered value. The reset() method forgets the old values, the next value is returned as it is.
+
+The PointFilter class filters a x and y with a OneEuroFilter each and has a dead_zone. A new point that is less than dead_zone pixels from the last point that was returned is ignored and the last point is returned, so sub-pixel jitter doesn't move the mouse.
+"""
+
+import math
+
+
+class OneEuroFilter:
+    """1€ filter for a single value."""
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0) -> None:
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.speed = 0.0
+        self.timestamp = None
+
+    @staticmethod
+    def alpha(cutoff, dt):
+        """Smoothing factor of a low pass filter with the cutoff frequency for a time step dt"""
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def filter(self, value, timestamp):
+        """Returns the filtered value"""
+        if self.value is None or timestamp <= self.timestamp:
+            # First value, or the timestamp didn't go forward
+            if self.value is None:
+                self.value = value
+            self.timestamp = timestamp if self.timestamp is None else max(self.timestamp, timestamp)
+            return self.value
+
+        dt = timestamp - self.timestamp
+
+        # Smoothed speed of the value
+        speed = (value - self.value) / dt
+        self.speed += self.alpha(self.d_cutoff, dt) * (speed - self.speed)
+
+        # The cutoff goes up with the speed
+        cutoff = self.min_cutoff + self.beta * abs(self.speed)
+        self.value += self.alpha(cutoff, dt) * (value - self.value)
+        self.timestamp = timestamp
+
+        return self.value
+
+
+class PointFilter:
+    """1€ filter for a x and y, with a dead zone."""
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0, dead_zone=1.0) -> None:
+        self.filter_x = OneEuroFilter(min_cutoff, beta, d_cutoff)
+        self.filter_y = OneEuroFilter(min_cutoff, beta, d_cutoff)
+        self.dead_zone = dead_zone
+
+        self.x, self.y = None, None
+
+    def reset(self):
+        self.filter_x.reset()
+        self.filter_y.reset()
+        self.x, self.y = None, None
+
+    def filter(self, x, y, timestamp):
+        """Returns the filtered x and y and if they moved out of the dead zone"""
+        x = self.filter_x.filter(x, timestamp)
+        y = self.filter_y.filter(y, timestamp)
+
+        if self.x is not None and math.hypot(x - self.x, y - self.y) < self.dead_zone:
+            return self.x, self.y, False
+
+        self.x, self.y = x, y
+        return x, y, True
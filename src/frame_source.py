@@ -0,0 +1,304 @@
+"""
+Opens the frames the hands are tracked in: a webcam, a video file, a directory of images or synthetic frames, all with the isOpened(), read(), set(), get() and release() methods of cv2.VideoCapture, so Capture reads them all the same way.
+
+The open_source() function takes the argument source and optionally width, height, fps, fourcc and buffer_size. The argument source is the index of a webcam(an int or a string of digits), the path of a video file, the path of a directory of images, or 'synthetic'. For a webcam the format is negotiated in the order the V4L2 driver needs it: first the fourcc(for example 'MJPG'), then the size, then the frame rate, and the driver buffer is set to buffer_size frames. Most webcams only deliver 720p at 30 FPS as MJPG, the default YUYV is uncompressed and limited by the USB bandwidth. A driver buffer of 1 frame means the frame that is read is the newest one, not one that waited in the queue. Settings that are None are left at the default of the camera.
+
+A camera may ignore any of these settings, so source_format() reads back the format that is actually in effect and returns a SourceFormat(backend, fourcc, width, height, fps, buffer_size). describe() turns it into a line to print, with every setting the camera didn't accept, and describe_source() does the same for any source.
+
+The ImageDirectoryCapture class reads the images of a directory in the order of their names, at fps frames per second or as fast as possible, and optionally in a loop. The SyntheticCapture class copies the given images, in a loop, at a fixed frame rate, and synthetic_images() makes images of random noise for it, so the program and the benchmarks run without a camera. Both copy into the image passed to read() like cv2.VideoCapture, so Capture doesn't allocate a frame sized buffer per frame.
+
+Run `python frame_source.py 0 --fourcc MJPG YUYV` to print the format every fourcc gives and the frame rate that is really delivered, to pick the trade between bandwidth and latency for a camera.
+"""
+
+import argparse
+import os
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+SourceFormat = namedtuple('SourceFormat', ['backend', 'fourcc', 'width', 'height', 'fps', 'buffer_size'])
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+
+
+def fourcc_code(fourcc):
+    """Returns the integer code of a 4 letter fourcc like 'MJPG'."""
+    if len(fourcc) != 4:
+        raise ValueError(f"A fourcc has 4 letters, got {fourcc!r}")
+    return cv2.VideoWriter_fourcc(*fourcc)
+
+
+def fourcc_name(code):
+    """Returns the 4 letters of a fourcc code, or None for 0."""
+    code = int(code)
+    if code <= 0: return None
+
+    return code.to_bytes(4, 'little').decode('ascii', errors='replace').strip('\x00')
+
+
+def synthetic_images(width=1280, height=720, count=1, seed=0):
+    """Returns count images of random noise."""
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def copy_into(image, source):
+    """Copies source into image like cv2.VideoCapture.read(image), or returns a copy if image has the wrong size."""
+    if image is None or image.shape != source.shape:
+        return True, source.copy()
+
+    np.copyto(image, source)
+    return True, image
+
+
+class SyntheticCapture:
+    """Stands in for cv2.VideoCapture. Copies the given images, in a loop, into the image passed to read() at a fixed frame rate."""
+    def __init__(self, images, fps=30) -> None:
+        self.images = images
+        self.fps = fps
+        self.interval = 1 / fps
+        self.index = 0
+        self.opened = True
+        self.next_time = time.perf_counter()
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self, image=None):
+        # Wait for the next frame like a camera would
+        delay = self.next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_time = max(self.next_time + self.interval, time.perf_counter())
+
+        source = self.images[self.index % len(self.images)]
+        self.index += 1
+
+        return copy_into(image, source)
+
+    def set(self, prop, value):
+        """Only the frame rate can be changed, the size is the size of the images."""
+        if prop != cv2.CAP_PROP_FPS or value <= 0: return False
+
+        self.fps = value
+        self.interval = 1 / value
+        return True
+
+    def get(self, prop):
+        height, width = self.images[0].shape[:2]
+        return {cv2.CAP_PROP_FRAME_WIDTH: width, cv2.CAP_PROP_FRAME_HEIGHT: height, cv2.CAP_PROP_FPS: self.fps}.get(prop, 0)
+
+    def getBackendName(self):
+        return 'synthetic'
+
+    def release(self):
+        self.opened = False
+
+
+class ImageDirectoryCapture:
+    """Reads the images of a directory in the order of their names, like a camera."""
+    def __init__(self, path, fps=None, loop=False) -> None:
+        self.paths = [os.path.join(path, name) for name in sorted(os.listdir(path)) if name.lower().endswith(IMAGE_EXTENSIONS)]
+        if not self.paths:
+            raise ValueError(f"There are no images in {path}")
+
+        self.fps = fps
+        self.loop = loop
+        self.index = 0
+        self.opened = True
+        self.next_time = time.perf_counter()
+
+        # The size of the first image, the other images can have a different size
+        self.height, self.width = cv2.imread(self.paths[0]).shape[:2]
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self, image=None):
+        if self.index >= len(self.paths):
+            if not self.loop:
+                self.opened = False
+                return False, image
+            self.index = 0
+
+        if self.fps:
+            delay = self.next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.next_time = max(self.next_time + 1 / self.fps, time.perf_counter())
+
+        source = cv2.imread(self.paths[self.index])
+        self.index += 1
+        if source is None:
+            return False, image
+
+        return copy_into(image, source)
+
+    def set(self, prop, value):
+        """Only the frame rate can be changed."""
+        if prop != cv2.CAP_PROP_FPS: return False
+
+        self.fps = value
+        return True
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_WIDTH: self.width, cv2.CAP_PROP_FRAME_HEIGHT: self.height, cv2.CAP_PROP_FPS: self.fps or 0, cv2.CAP_PROP_FRAME_COUNT: len(self.paths)}.get(prop, 0)
+
+    def getBackendName(self):
+        return 'images'
+
+    def release(self):
+        self.opened = False
+
+
+def is_camera(source):
+    """Returns True if source is the index of a webcam."""
+    return isinstance(source, int) or (isinstance(source, str) and source.isdigit())
+
+
+def open_camera(index, width=None, height=None, fps=None, fourcc='MJPG', buffer_size=1):
+    """Opens a webcam and asks for the fourcc, size, frame rate and driver buffer size."""
+    cap = cv2.VideoCapture(index)
+
+    # V4L2 picks the sizes and frame rates it offers from the fourcc, so the fourcc is set first and the frame rate last
+    if fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, fourcc_code(fourcc))
+    if width:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    if height:
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    if fps:
+        cap.set(cv2.CAP_PROP_FPS, fps)
+    if buffer_size:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+
+    return cap
+
+
+def open_source(source, width=None, height=None, fps=None, fourcc='MJPG', buffer_size=1):
+    """Returns a webcam, video file, image directory or synthetic source, with the same methods as cv2.VideoCapture."""
+    if is_camera(source):
+        return open_camera(int(source), width, height, fps, fourcc, buffer_size)
+
+    if source == 'synthetic':
+        return SyntheticCapture(synthetic_images(width or 1280, height or 720), fps=fps or 30)
+
+    if os.path.isdir(source):
+        return ImageDirectoryCapture(source, fps=fps)
+
+    if not os.path.exists(source):
+        raise ValueError(f"{source} is not a webcam index, a video file, an image directory or 'synthetic'")
+
+    # The size and frame rate of a video file can't be changed
+    return cv2.VideoCapture(source)
+
+
+def source_format(cap):
+    """Returns the SourceFormat that is actually in effect."""
+    try:
+        backend = cap.getBackendName()
+    except (AttributeError, cv2.error):
+        backend = None
+
+    # Only cameras have a fourcc and a driver buffer, other sources return 0 or -1
+    buffer_size = int(cap.get(cv2.CAP_PROP_BUFFERSIZE))
+
+    return SourceFormat(
+        backend=backend,
+        fourcc=fourcc_name(cap.get(cv2.CAP_PROP_FOURCC)),
+        width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        fps=float(cap.get(cv2.CAP_PROP_FPS)),
+        buffer_size=buffer_size if buffer_size > 0 else None,
+    )
+
+
+def describe(cap, width=None, height=None, fps=None, fourcc=None, buffer_size=None):
+    """Returns a line with the format in effect and every asked setting the source didn't accept."""
+    source = source_format(cap)
+
+    line = f"{source.width}x{source.height}"
+    if source.fps:
+        line += f" at {source.fps:g} FPS"
+    if source.fourcc:
+        line += f", {source.fourcc}"
+    if source.buffer_size:
+        line += f", buffer of {source.buffer_size} frames"
+    if source.backend:
+        line += f", {source.backend}"
+
+    ignored = []
+    if fourcc and source.fourcc and source.fourcc != fourcc:
+        ignored.append(f"fourcc {fourcc}")
+    if width and height and (source.width, source.height) != (width, height):
+        ignored.append(f"size {width}x{height}")
+    if fps and source.fps and abs(source.fps - fps) > 0.5:
+        ignored.append(f"{fps} FPS")
+    if buffer_size and source.buffer_size and source.buffer_size != buffer_size:
+        ignored.append(f"buffer of {buffer_size} frames")
+    if ignored:
+        line += f" (not supported: {', '.join(ignored)})"
+
+    return line
+
+
+def describe_source(source, cap, width=None, height=None, fps=None, fourcc=None, buffer_size=None):
+    """Returns the describe() line of source, only a webcam is compared with the asked settings."""
+    if not is_camera(source):
+        return f"{source}: {describe(cap)}"
+
+    return f"Camera {source}: {describe(cap, width, height, fps, fourcc, buffer_size)}"
+
+
+def measure_fps(cap, seconds=3.0, skip=5):
+    """Reads frames for seconds and returns the frames per second that were delivered and the largest gap between two frames. The first skip frames are not measured."""
+    # The first frames of a webcam are slow while it starts
+    for _ in range(skip):
+        cap.read()
+
+    image = None
+    frames = 0
+    largest_gap = 0
+    start = previous = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        success, image = cap.read(image)
+        if not success:
+            break
+
+        now = time.perf_counter()
+        largest_gap = max(largest_gap, now - previous)
+        previous = now
+        frames += 1
+
+    elapsed = previous - start
+    return (frames / elapsed if elapsed > 0 else 0), largest_gap
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prints the format a camera uses for every fourcc and the frame rate it really delivers")
+    parser.add_argument('source', nargs='?', default='0', help="webcam index, video file, image directory or synthetic")
+    parser.add_argument('--fourcc', nargs='+', default=['MJPG', 'YUYV'], help="fourccs to try")
+    parser.add_argument('--cap-width', type=int, default=1280)
+    parser.add_argument('--cap-height', type=int, default=720)
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--buffer-size', type=int, default=1, help="frames the camera driver keeps")
+    parser.add_argument('--seconds', type=float, default=3.0, help="how long the frame rate of every fourcc is measured")
+    args = parser.parse_args()
+
+    # Only a webcam has a fourcc to choose
+    fourccs = args.fourcc if is_camera(args.source) else [None]
+    for fourcc in fourccs:
+        cap = open_source(args.source, args.cap_width, args.cap_height, args.fps, fourcc, args.buffer_size)
+        if not cap.isOpened():
+            print("Could not open", args.source)
+            return
+
+        fps, largest_gap = measure_fps(cap, args.seconds, skip=5 if fourcc else 0)
+        print(describe_source(args.source, cap, args.cap_width, args.cap_height, args.fps, fourcc, args.buffer_size))
+        print(f"    delivered {fps:.1f} FPS, largest gap {largest_gap * 1000:.1f}ms")
+        cap.release()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+The GestureTable class compiles the finger positions of one hand from the user settings(like right_default_positions) into a lookup table, so every finger set of the hand is checked with a single lookup.
+
+The GestureTable class takes the arguments: positions, joints and optionally hand. The argument positions is a dict like right_default_positions, with a finger set(a tuple of joints) as key and a dict of finger position: action as value. A hand can have more than one finger set. The argument joints is the tuple of joints the angles are computed for, it has to include every joint of every finger set. The argument hand is the name of the hand used in the error messages.
+
+Every joint is a bit, 1 if the finger is open. The bits of all joints are the index into the table, which holds the action of that hand position or None. When the table is compiled, every finger position of every finger set is checked against all hand positions it matches, and a ValueError lists every hand position that two finger sets map to different actions, and every finger position with the wrong number of fingers.
+
+The index() method takes a bool array with if every joint is open and returns the index into the table. The lookup() method takes the same array and returns the action or None.
+
+The GestureState class turns the joint angles of one hand, frame after frame, into the actions to perform. It takes the arguments: table, open_angle and close_angle and optionally confirm_frames, confirm_time and continuous_actions. The argument table is the GestureTable of the hand. A closed finger only opens when its angle goes above open_angle and an open finger only closes when its angle goes below close_angle, so a finger near the angle doesn't flicker between open and closed. A new action has to be seen for confirm_frames frames in a row and for at least confirm_time seconds before it is confirmed.
+
+The update() method takes the angles of the hand and the timestamp of the frame and returns the action to perform or None. An action is returned once when it is confirmed, and only the actions in continuous_actions(like MOVE and SCROLL) are returned again every frame while the hand stays in the same position. The reset() method forgets the hand, for when it is not seen anymore.
+"""
+
+import time
+
+import numpy as np
+
+from actuator import CONTINUOUS_ACTIONS
+from user_setting import JOINT_LANDMARK_REVERSE
+
+
+def finger_names(fingers, position=None):
+    """Returns the names of the fingers, with open or closed if the position is given."""
+    names = [JOINT_LANDMARK_REVERSE.get(tuple(joint), str(joint)) for joint in fingers]
+    if position is None:
+        return ', '.join(names)
+
+    return ', '.join(f"{name} {'open' if is_open else 'closed'}" for name, is_open in zip(names, position))
+
+
+class GestureTable:
+    """Finger positions of one hand compiled into a table indexed by the open fingers."""
+    def __init__(self, positions, joints, hand='') -> None:
+        self.joints = tuple(joints)
+        self.hand = hand
+
+        # Bit of every joint, the sum of the bits of the open joints is the index
+        self.bits = 1 << np.arange(len(self.joints))
+
+        # Action of every hand position and the finger set it came from
+        self.actions = [None] * (1 << len(self.joints))
+        self.sources = [None] * (1 << len(self.joints))
+
+        self.compile(positions)
+
+    def compile(self, positions):
+        """Fills the table from positions. Raises a ValueError with every conflict."""
+        errors = []
+        for fingers, action_list in positions.items():
+            missing = [joint for joint in fingers if joint not in self.joints]
+            if missing:
+                errors.append(f"{finger_names(missing)} is not in the joints")
+                continue
+
+            columns = [self.joints.index(joint) for joint in fingers]
+            mask = int(self.bits[columns].sum())
+
+            for position, action in action_list.items():
+                if len(position) != len(fingers):
+                    errors.append(f"{position} has {len(position)} fingers but the finger set {finger_names(fingers)} has {len(fingers)}")
+                    continue
+
+                value = sum(int(bit) for bit, is_open in zip(self.bits[columns], position) if is_open)
+
+                # Every hand position where these fingers are in this position
+                for index in range(len(self.actions)):
+                    if index & mask != value: continue
+
+                    if self.actions[index] is not None and self.actions[index] != action:
+                        other_fingers, other_position = self.sources[index]
+                        errors.append(f"{finger_names(fingers, position)} is {action}, but {finger_names(other_fingers, other_position)} is {self.actions[index]}")
+                        break
+
+                    self.actions[index] = action
+                    self.sources[index] = (fingers, position)
+
+        if errors:
+            raise ValueError(f"Conflicting {self.hand} hand positions:\n - " + '\n - '.join(errors))
+
+    def index(self, open_fingers):
+        """Returns the index of the hand position from a bool array with if every joint is open."""
+        return int(self.bits[open_fingers].sum())
+
+    def lookup(self, open_fingers):
+        """Returns the action of the hand position or None."""
+        return self.actions[self.index(open_fingers)]
+
+
+class GestureState:
+    """Open and closed fingers of one hand with hysteresis, and the confirmed action."""
+    def __init__(self, table, open_angle, close_angle, confirm_frames=2, confirm_time=0.0, continuous_actions=CONTINUOUS_ACTIONS) -> None:
+        if close_angle > open_angle:
+            raise ValueError(f"The close angle {close_angle} has to be at most the open angle {open_angle}")
+
+        self.table = table
+        self.open_angle = open_angle
+        self.close_angle = close_angle
+        self.confirm_frames = confirm_frames
+        self.confirm_time = confirm_time
+        self.continuous_actions = continuous_actions
+
+        self.reset()
+
+    def reset(self):
+        """Forgets the fingers and the actions."""
+        self.open_fingers = None
+
+        # Action that is being confirmed, since when and for how many frames
+        self.candidate = None
+        self.candidate_time = 0
+        self.candidate_frames = 0
+
+        # Confirmed action
+        self.action = None
+
+    def update(self, angles, timestamp=None):
+        """Returns the action to perform for the angles of the hand in this frame, or None."""
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        if self.open_fingers is None:
+            # The first frame has no previous state, so the middle of the two angles is used
+            self.open_fingers = angles > (self.open_angle + self.close_angle) / 2
+        else:
+            self.open_fingers = np.where(self.open_fingers, angles >= self.close_angle, angles > self.open_angle)
+
+        action = self.table.lookup(self.open_fingers)
+        if action != self.candidate:
+            self.candidate = action
+            self.candidate_time = timestamp
+            self.candidate_frames = 0
+        self.candidate_frames += 1
+
+        if action == self.action:
+            # Only continuous actions repeat while the hand stays in the same position
+            return action if action in self.continuous_actions else None
+
+        if self.candidate_frames < self.confirm_frames or timestamp - self.candidate_time < self.confirm_time:
+            return None
+
+        # Fires once on the edge
+        self.action = action
+        return action
@@ -0,0 +1,114 @@
+"""
+The QualityGovernor class changes the quality of the hand tracking while the program runs, so every frame fits in a latency target. A slow computer gets a smaller camera image, a smaller inference size, the smaller mediapipe model and the optical flow, a fast computer gets the full quality.
+
+The QualityGovernor class takes the arguments: capture and hands. The argument capture is a Capture, the camera size and frame rate are set with its set() method. The argument hands is the Hands object, its inference_size, model complexity and flow_interval are changed. The optional arguments are target, levels, level, settings, window, percentile and headroom.
+
+The argument levels is a list of quality levels from the lowest to the highest, every level is a dict with cap_width, cap_height, fps, inference_size, model_complexity and flow_interval. The argument settings is a dict with the same keys as a level of the settings the program started with. Nothing is changed at the start, the governor starts at the level closest to the settings(closest_level()) and only the settings that differ from them are changed on the first step. Without settings, the level with the index level is applied at the start. The argument target is the latency target in seconds.
+
+The record() method takes how long a frame took(in seconds). Once window frames are recorded, their percentile is compared to the target. Above the target the quality steps down a level, below target * headroom it steps up a level, in between it stays. The gap between the two is the hysteresis that keeps the quality from switching back and forth. After every change the frames are recorded again from the start, so the new level is measured on its own. Every change is printed with the latency that caused it and the settings that changed, and stored in changes.
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+# From the lowest to the highest quality. The default user settings are level 3
+LEVELS = (
+    {'cap_width': 640, 'cap_height': 360, 'fps': 15, 'inference_size': (256, 144), 'model_complexity': 0, 'flow_interval': 3},
+    {'cap_width': 640, 'cap_height': 360, 'fps': 30, 'inference_size': (320, 180), 'model_complexity': 0, 'flow_interval': 2},
+    {'cap_width': 1280, 'cap_height': 720, 'fps': 30, 'inference_size': (480, 270), 'model_complexity': 0, 'flow_interval': 1},
+    {'cap_width': 1280, 'cap_height': 720, 'fps': 30, 'inference_size': (640, 360), 'model_complexity': 1, 'flow_interval': 1},
+    {'cap_width': 1280, 'cap_height': 720, 'fps': 30, 'inference_size': (960, 540), 'model_complexity': 1, 'flow_interval': 1},
+)
+
+
+def closest_level(levels, settings):
+    """Returns the index of the level with the fewest settings different from settings, the higher level of a tie."""
+    return min(range(len(levels)), key=lambda index: (sum(levels[index][key] != settings.get(key) for key in levels[index]), -index))
+
+
+class QualityGovernor:
+    """Steps the tracking quality up or down to keep the frame latency under a target."""
+    def __init__(self, capture, hands, target=0.025, levels=LEVELS, level=3, settings=None, window=60, percentile=95, headroom=0.6) -> None:
+        self.capture = capture
+        self.hands = hands
+        self.target = target
+        self.levels = levels
+        self.window = window
+        self.percentile = percentile
+        self.headroom = headroom
+
+        # Frame times of the current level
+        self.times = np.zeros(window)
+        self.count = 0
+
+        # Every change as (time, old level, new level, latency in seconds)
+        self.changes = []
+
+        # The settings in use, a level only changes the settings that differ from them
+        self.settings = dict(settings) if settings is not None else {}
+        self.warned = False
+
+        if settings is not None:
+            self.level = closest_level(levels, settings)
+        else:
+            self.level = None
+            self.set_level(min(max(level, 0), len(levels) - 1))
+
+    def record(self, seconds):
+        """Records how long a frame took and changes the level once window frames are recorded. Returns True if the level changed."""
+        self.times[self.count % self.window] = seconds
+        self.count += 1
+        if self.count < self.window: return False
+
+        latency = np.percentile(self.times, self.percentile)
+        if latency > self.target and self.level > 0:
+            level = self.level - 1
+        elif latency < self.target * self.headroom and self.level < len(self.levels) - 1:
+            level = self.level + 1
+        else:
+            # Keep measuring the current level with the newest frames
+            return False
+
+        self.log(level, latency)
+        self.set_level(level)
+        return True
+
+    def log(self, level, latency):
+        """Prints why the level changes and which settings change."""
+        self.changes.append((time.time(), self.level, level, latency))
+
+        direction = 'down' if level < self.level else 'up'
+        comparison = f"> target {self.target * 1000:.0f}ms" if level < self.level else f"< {self.target * self.headroom * 1000:.0f}ms"
+        old, new = self.settings, self.levels[level]
+        changed = ', '.join(f"{key} {old[key]} -> {new[key]}" for key in new if old.get(key) != new[key])
+
+        print(f"Quality {direction} {self.level} -> {level}: p{self.percentile} {latency * 1000:.1f}ms {comparison}. {changed}")
+
+    def set_level(self, level):
+        """Applies every setting of level that is different from the current level."""
+        old = self.settings
+        new = self.levels[level]
+
+        if (old.get('cap_width'), old.get('cap_height')) != (new['cap_width'], new['cap_height']):
+            self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, new['cap_width'])
+            self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, new['cap_height'])
+            # The region of interest and the flow image are in the pixels of the old size
+            self.hands.roi = None
+            self.hands.previous_flow_image = None
+        if old.get('fps') != new['fps']:
+            self.capture.set(cv2.CAP_PROP_FPS, new['fps'])
+
+        self.hands.inference_size = new['inference_size']
+        if self.hands.flow_interval != new['flow_interval']:
+            # The image of an old frame would give a wrong flow
+            self.hands.flow_interval = new['flow_interval']
+            self.hands.previous_flow_image = None
+        if not self.hands.set_model_complexity(new['model_complexity']) and not self.warned:
+            print("This mediapipe version has only one hand model, the quality levels only change the other settings")
+            self.warned = True
+
+        self.settings = dict(new)
+        self.level = level
+        self.count = 0
@@ -0,0 +1,102 @@
+"""
+Tracks the hands without the main.py loop, for programs that only need the landmarks and gestures of the hands and not the video or the mouse.
+
+The track_hands() generator takes the argument frames and yields a HandsFrame for every frame. The argument frames is a started Capture, or any iterable of Frames(see capture.py) or of BGR images. Images without a timestamp get the time.perf_counter() of when they are processed. The optional arguments are user, processor, actuate and mouse_backend. The argument user is a User with the settings, None uses the default settings. The argument processor is a Processor to use instead of creating one, it is not released when the generator ends. With actuate False(the default) the actions are only returned and the mouse is never moved, with actuate True they are also performed with the mouse_backend, like in main.py.
+
+Nothing is drawn and the image is never converted or copied by the generator, the show setting is turned off. The generator stops when the frames end or the Capture stops, and the Processor it created is released when the generator ends or is closed.
+
+The HandsFrame namedtuple holds:
+    index: the frame index
+    timestamp: the time.perf_counter() timestamp of the frame
+    image_size: the (width, height) of the image
+    handedness: a tuple with 'Right' or 'Left' for every hand
+    scores: a tuple with the handedness score(0 - 1) of every hand
+    landmarks: a (hands, 21, 3) float32 array of the x, y and z of every landmark in the pixels of the mirrored image. It is a copy, so it can be kept
+    joints: the joints of open_fingers, the same for every frame
+    open_fingers: a dict of handedness: bool array with True for every open joint
+    actions: a dict of handedness: the action of the hand this frame or None
+
+Example:
+
+    capture = Capture(open_source(0)).start()
+    for hands in track_hands(capture):
+        if hands.actions.get('Right') == 'CLICK':
+            print(hands.timestamp, hands.landmarks[hands.handedness.index('Right'), 8])
+"""
+
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from capture import Capture, Frame
+from image_processor import Processor
+from user_setting import User
+
+HandsFrame = namedtuple('HandsFrame', ['index', 'timestamp', 'image_size', 'handedness', 'scores', 'landmarks', 'joints', 'open_fingers', 'actions'])
+
+# The tracking box is the middle of the image, like in main.py
+TOP_LEFT_BOUND = 5
+BOTTOM_RIGHT_BOUND = 4
+
+
+def capture_frames(capture, timeout=1.0):
+    """Yields every new Frame of a Capture until it stops."""
+    while capture.isOpened():
+        frame = capture.read(timeout)
+        if frame is not None:
+            yield frame
+
+
+def track_hands(frames, user=None, processor=None, actuate=False, mouse_backend=None):
+    """Yields a HandsFrame with the landmarks, open fingers and actions of the hands in every frame."""
+    if isinstance(frames, Capture):
+        frames = capture_frames(frames)
+
+    owns_processor = processor is None
+    if owns_processor:
+        if user is None:
+            user = User(show=False)
+        processor = Processor(user, detection_confidence=user.detection_confidence, mouse_backend=mouse_backend, actuate=actuate)
+
+    # Nothing is drawn
+    processor.show = False
+
+    try:
+        for index, frame in enumerate(frames):
+            if not isinstance(frame, Frame):
+                frame = Frame(frame, index, time.perf_counter())
+
+            height, width = frame.image.shape[:2]
+            upper_left = (width // TOP_LEFT_BOUND, height // TOP_LEFT_BOUND)
+            bottom_right = (width * BOTTOM_RIGHT_BOUND // TOP_LEFT_BOUND, height * BOTTOM_RIGHT_BOUND // TOP_LEFT_BOUND)
+
+            processor.process(frame.image, upper_left, bottom_right, timestamp=frame.timestamp)
+
+            hand_info = processor.hand_info or {}
+            handedness = tuple(hand for hand, _ in hand_info.values())
+            count = len(handedness)
+
+            open_fingers = {}
+            actions = {}
+            if 'Right' in handedness:
+                open_fingers['Right'] = processor.right_finger_position
+                actions['Right'] = processor.right_action
+            if 'Left' in handedness:
+                open_fingers['Left'] = processor.left_finger_position
+                actions['Left'] = processor.left_action
+
+            yield HandsFrame(
+                index=frame.index,
+                timestamp=frame.timestamp,
+                image_size=(width, height),
+                handedness=handedness,
+                scores=tuple(processor.hands.scores[:count].tolist()),
+                landmarks=np.array(processor.hands.landmarks[:count]),
+                joints=processor.joints,
+                open_fingers=open_fingers,
+                actions=actions,
+            )
+    finally:
+        if owns_processor:
+            processor.release()
@@ -1,10 +1,19 @@
 """
 The Hand() class is used to detect and track either 1 or 2 hands.
-Detection and tracking is done with mediapipe version 0.8.7.1
+Detection and tracking is done with mediapipe version 0.8.7.1. Mediapipe is imported when the model is created or the hands are first drawn, not when hands.py is imported.
 
 The Hand() class takes optional arguments: detection_confidence and tracking_confidence, which are values from 0 - 1. It creates a mediapipe object that can detect/track any number of continuous images(a video).
+The optional inference_size argument is the (width, height) of the image given to mediapipe. It is separate from the camera size, the image is downscaled once before it is processed and the landmarks are mapped back to the full image, so the mouse keeps the full precision. None uses the image as it is.
+The optional roi argument turns on region of interest tracking. Once a hand is found, only a crop around the hands from the previous frame is processed. The crop is the bounding box of the landmarks padded by roi_padding(a fraction of the box size) on every side and it is kept while the hands stay inside of it, so mediapipe's own tracking sees a steady image. When no hand is found in the crop, the handedness score drops under roi_confidence, or every roi_refresh frames(to find a new hand), the full image is searched again. The landmarks are always relative to the full image.
+The optional flow_interval argument turns on skip frame tracking when it is more than 1. Mediapipe then only runs every flow_interval frames, in between the landmarks are moved with the optical flow(cv2.calcOpticalFlowPyrLK) of a small grayscale image, flow_scale times the size of the image. When less than flow_quality(a fraction) of the landmarks of a hand are tracked, mediapipe runs on that frame instead. The flow fills the same self.landmarks and hand_info, the handedness is kept from the last mediapipe frame. The hands are not drawn on the frames that used the flow, since mediapipe didn't see them. inference_frames and flow_frames count how many frames used mediapipe and the flow.
 
-The detect_and_track() method takes an image, and finds up to 2 hands and returns the image. 
+The optional model_complexity argument(0 or 1) picks the smaller or the bigger mediapipe hand model, it needs mediapipe 0.8.9 or newer. None uses mediapipe's default. The set_model_complexity() method changes the model while running, it returns False if mediapipe doesn't support it.
+
+The optional worker argument runs the mediapipe model in a separate process with a HandsWorker(see inference_worker.py), so the detection doesn't hold the GIL of the main process. Everything else, like resizing, the region of interest and the optical flow, still runs in Hands.
+
+The optional model argument is used in place of the mediapipe model. It is anything with the process() and close() methods of mediapipe's Hands, benchmark.py gives it scripted hands to time the whole program without a camera or mediapipe.
+
+The detect_and_track() method takes an image, and finds up to 2 hands and returns the image. The image is never flipped for the detection, the landmarks are mirrored instead(x -> width - x) and the handedness is swapped, so they are the same as if the image was mirrored. Only when draw is True the image is mirrored, into a preallocated buffer, and returned. Resizing and the RGB conversion also write into preallocated buffers, so no frame sized buffer is allocated per frame.
 Has 2 optionally arguments: draw and find_relative_pos. Both are defaulted to True. The draw argument draws the left or right hand. The find_relative_pos argument finds the location of the joints of the hands relative to our image.
 
 The draw_left_or_right() method is used to draw a left or right hand. It takes an image and returns an updated image. Won't work by itself, detect_and_track() needs to be called first.
@@ -13,30 +22,75 @@ The find_handedness() method finds if the detected hand is a left or right hand,
 
 The relative_pos() method finds the relative position based on the image width and height and stores the handedness and position in hand_info. Won't work by itself, detect_and_track() needs to be called first.
 
-The finger_angles() method takes a tuple of joints and landmarks for that hand and returns a list of the angles. Joints is a tuple with tuples containing 3 hand landmarks. The optional find_finger_position returns a tuple instead with 0 and 1 indicating if the finger was open or closed. The optional finger_open is used to check if the angle of the finger should be considered open or closed.
+The finger_angles() method takes a tuple of joints and the landmarks for one hand(21, 3) or for all hands(hands, 21, 3) and returns the angles as an array. Joints is a tuple with tuples containing 3 hand landmarks. All joint angles of every hand are computed in one numpy call. The optional find_finger_position returns a tuple instead with 0 and 1 indicating if the finger was open or closed(a list of tuples when the landmarks of all hands are given). The optional finger_open is used to check if the angle of the finger should be considered open or closed.
+
+The class variable self.landmarks is a preallocated float32 array of shape (2, 21, 3) that holds the x, y and z of every landmark relative to our image, for up to 2 hands. It is filled in place every frame, so the x and y keep their sub-pixel precision and no new lists are created per frame.
 
-The class variable self.hand_info  is a hashmap. The keys of hashmap are hand_id, which is either 0 or 1 representing that there is 1 hand or 2 hands. The value is a tuple(handedness, landmarks). handedness indicates if this hand is a left or right hand. landmarks is a list of tuple(relative_x, relative_y), where relative_x and relative_y represent the relative x and y position of that landmark relative to the image. 
+The class variable self.scores holds the handedness score(0 - 1) of every hand in hand_info, it is how sure mediapipe is about the hand.
+
+The class variable self.hand_info  is a hashmap. The keys of hashmap are hand_id, which is either 0 or 1 representing that there is 1 hand or 2 hands. The value is a list [handedness, landmarks]. handedness indicates if this hand is a left or right hand. landmarks is the (21, 3) view of self.landmarks for that hand, where each row is the relative x, y and z position of that landmark relative to the image. The view is overwritten by the next frame, copy it if it has to be kept. 
 """
 
-import mediapipe as mp
 import numpy as np
 import cv2
 
+from inference_worker import HandsWorker
+
 
 class Hands:
     """Detects and tracks up to 2 hands from a video/webcam."""
-    def __init__(self, detection_confidence=0.5, tracking_confidence=0.5) -> None:
+    def __init__(self, detection_confidence=0.5, tracking_confidence=0.5, inference_size=None, roi=False, roi_padding=0.5, roi_confidence=0.8, roi_refresh=30, flow_interval=1, flow_scale=0.5, flow_quality=0.7, model_complexity=None, worker=False, model=None) -> None:
         # Used to initialize the MediaPipe Hand object
         self.detection_confidence = detection_confidence
         self.tracking_confidence = tracking_confidence
+        self.model_complexity = model_complexity
+        self.worker = worker
+        self.model = model
         
-        # Initializes the Mediapipe drawing utils
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
+        # Size of the image given to mediapipe
+        self.inference_size = inference_size
         
-        # Initializes the MediaPipe Hand object
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(False, 2, self.detection_confidence, self.tracking_confidence)
+        # Region of interest tracking
+        self.roi_enabled = roi
+        self.roi_padding = roi_padding
+        self.roi_confidence = roi_confidence
+        self.roi_refresh = roi_refresh
+        self.roi = None
+        self.frames_since_search = 0
+        
+        # Skip frame tracking with the optical flow
+        self.flow_interval = flow_interval
+        self.flow_scale = flow_scale
+        self.flow_quality = flow_quality
+        self.flow_window = (15, 15)
+        self.flow_levels = 2
+        self.flow_points = np.zeros((42, 1, 2), dtype=np.float32)
+        self.flow_index = 0
+        self.previous_flow_image = None
+        self.frames_since_inference = 0
+        self.inference_frames = 0
+        self.flow_frames = 0
+        
+        # Mediapipe is only imported when it is first used, with the worker the main process never imports it unless the hands are drawn
+        self.mp_drawing = None
+        self.mp_drawing_styles = None
+        self.mp_hands = None
+        
+        # Preallocated landmarks for up to 2 hands. The scale and offset map mediapipe's percentage of the processed region to our image
+        self.landmarks = np.zeros((2, 21, 3), dtype=np.float32)
+        self.scale = np.ones(3, dtype=np.float32)
+        self.offset = np.zeros(3, dtype=np.float32)
+        self.scores = np.zeros(2, dtype=np.float32)
+        
+        # The part of the image that was processed, it is a view so drawing on it draws on the image
+        self.region_image = None
+        self.region_parent = None
+        
+        # Preallocated buffers for resizing, the RGB conversion and the mirrored image, reused every frame
+        self.buffers = {}
+        
+        # Cached index arrays for the joints passed to finger_angles()
+        self.joint_index = {}
         
         # Class variables
         self.hand_info = {}
@@ -48,32 +102,121 @@ class Hands:
         self.right_landmark_color = (121, 22, 76)
         self.right_connection_color = (250, 44, 250)
         
+        # The drawing styles are only created once, with mediapipe
+        self.right_landmark_spec = None
+        self.right_connection_spec = None
+        
+        # Initializes the MediaPipe Hand object
+        self.hands = self.create_model()
+        
     def reset(self):
         """Resets the class variables."""
         self.hand_info = {}
         self.results = None
         self.image_height  = None 
         self.image_width = None
+        self.roi = None
+    
+    def close(self):
+        """Closes the mediapipe model, this also stops the worker process."""
+        self.hands.close()
+    
+    def load_mediapipe(self):
+        """Imports mediapipe and creates the drawing styles, only the first time it is called."""
+        if self.mp_hands is not None: return
+        
+        import mediapipe as mp
+        
+        self.mp_drawing = mp.solutions.drawing_utils
+        self.mp_drawing_styles = mp.solutions.drawing_styles
+        self.mp_hands = mp.solutions.hands
+        
+        self.right_landmark_spec = self.mp_drawing.DrawingSpec(color=self.right_landmark_color, thickness=2, circle_radius=2)
+        self.right_connection_spec = self.mp_drawing.DrawingSpec(color=self.right_connection_color, thickness=2, circle_radius=2)
+    
+    def warm_up(self, width, height):
+        """Runs the detection on a black image of width x height, so mediapipe initializes its graph and the buffers are allocated before the first real frame."""
+        self.detect_and_track(np.zeros((height, width, 3), dtype=np.uint8), draw=False, find_relative_pos=True)
+        self.reset()
+        self.previous_flow_image = None
+        self.inference_frames = 0
+        self.flow_frames = 0
+    
+    def create_model(self):
+        """Returns a new MediaPipe Hand object, or a HandsWorker that runs it in a separate process."""
+        if self.model is not None:
+            return self.model
+        
+        if self.worker:
+            return HandsWorker(self.detection_confidence, self.tracking_confidence, self.model_complexity)
+        
+        self.load_mediapipe()
+        if self.model_complexity is None:
+            return self.mp_hands.Hands(False, 2, self.detection_confidence, self.tracking_confidence)
+        
+        return self.mp_hands.Hands(static_image_mode=False, max_num_hands=2, model_complexity=self.model_complexity, min_detection_confidence=self.detection_confidence, min_tracking_confidence=self.tracking_confidence)
+    
+    def set_model_complexity(self, model_complexity):
+        """Replaces the mediapipe model with one of model_complexity. Returns False if this mediapipe version has only one model."""
+        if model_complexity == self.model_complexity: return True
+        if self.model is not None: return False
+        
+        previous = self.model_complexity
+        self.model_complexity = model_complexity
+        try:
+            hands = self.create_model()
+        except TypeError:
+            self.model_complexity = previous
+            return False
+        
+        self.hands.close()
+        self.hands = hands
+        
+        # The new model has to find the hands again
+        self.reset()
+        return True
     
     def detect_and_track(self, image, draw=True, find_relative_pos=True):
         """Detect up to 2 hands from a image and starts to track them"""
         
-        # Coverts the img to RGB from BGR
-        # Mark image as not writeable(Improves performance)
-        # Process the image to find the hands
-        image = cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB)
-        image.flags.writeable = False
+        # The region of interest and the flow image of a different camera size don't fit this image
+        if image.shape[:2] != (self.image_height, self.image_width):
+            self.roi = None
+            self.previous_flow_image = None
+        
+        # The image is not mirrored, the landmarks are
+        self.image_height, self.image_width = image.shape[:2]
+        
+        # Move the landmarks with the optical flow instead of running mediapipe, until the next mediapipe frame or until the hands are lost
+        flow_image = self.flow_image(image) if self.flow_interval > 1 else None
+        previous_flow_image, self.previous_flow_image = self.previous_flow_image, flow_image
+        if flow_image is not None and find_relative_pos and self.hand_info and self.frames_since_inference + 1 < self.flow_interval:
+            if self.propagate(previous_flow_image, flow_image):
+                self.frames_since_inference += 1
+                self.flow_frames += 1
+                
+                if self.roi_enabled:
+                    self.update_roi()
+                if draw:
+                    image = cv2.flip(image, 1, dst=self.get_buffer('mirror', image.shape))
+                
+                return image
+        
+        self.frames_since_inference = 0
+        self.inference_frames += 1
         
-        self.results = self.hands.process(image)
+        # Only process the region around the hands from the previous frame, and search the full image if the hands are not found in it
+        self.results = None
+        if self.roi is not None and self.frames_since_search < self.roi_refresh:
+            self.results = self.process_roi(image)
+            self.frames_since_search += 1
         
-        # Reset the flag and recovert the color
-        image.flags.writeable = True
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        if self.results is None:
+            self.results = self.process_region(image)
+            self.frames_since_search = 0
         
         # If there is a hand, find handedness. Draw or find relative postion for whichever is True
         if self.results.multi_hand_landmarks:
-            self.image_height, self.image_width, _ = image.shape
-            
             # Finds if its left or right hand and update self.hand_info
             self.find_handedness()
             
@@ -83,11 +226,163 @@ class Hands:
                 image = self.draw_left_or_right(image)
             elif find_relative_pos:
                 self.relative_pos()
+            
+            if self.roi_enabled and find_relative_pos:
+                self.update_roi()
         else:
             self.reset()
         
+        # Mirror the image only when it is shown
+        if draw:
+            image = cv2.flip(image, 1, dst=self.get_buffer('mirror', image.shape))
+        
         return image
     
+    def get_buffer(self, name, shape):
+        """Returns the preallocated buffer called name. A new buffer is only allocated when the shape changes."""
+        buffer = self.buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.uint8)
+            self.buffers[name] = buffer
+        
+        return buffer
+    
+    def process_region(self, image, region=None):
+        """Processes the region(x1, y1, x2, y2) of the image, or the full image if region is None, and sets the scale and offset that map the landmarks back to the image."""
+        if region is None:
+            region_image = image
+            x1, y1 = 0, 0
+        else:
+            x1, y1, x2, y2 = region
+            region_image = image[y1:y2, x1:x2]
+        
+        region_height, region_width = region_image.shape[:2]
+        self.region_image = region_image
+        self.region_parent = image
+        
+        # Mirror the landmarks: x = width - (x1 + landmark.x * region_width). z has roughly the same scale as x
+        self.scale[0] = -region_width
+        self.scale[1] = region_height
+        self.scale[2] = region_width
+        self.offset[0], self.offset[1] = image.shape[1] - x1, y1
+        
+        # Downscale to the inference size and covert the img to RGB from BGR
+        # Mark image as not writeable(Improves performance)
+        # Process the image to find the hands
+        # The full image and the region of interest have their own buffers, since they have different sizes
+        buffer_name = 'full' if region is None else 'roi'
+        inference_image = self.resize_for_inference(region_image, buffer_name)
+        inference_image = cv2.cvtColor(inference_image, cv2.COLOR_BGR2RGB, dst=self.get_buffer(buffer_name + '_rgb', inference_image.shape))
+        inference_image.flags.writeable = False
+        
+        results = self.hands.process(inference_image)
+        
+        # Reset the flag so the buffer can be written next frame
+        inference_image.flags.writeable = True
+        
+        return results
+    
+    def process_roi(self, image):
+        """Processes only the region of interest. Returns None if the hands are not found in it with enough confidence."""
+        results = self.process_region(image, self.roi)
+        
+        if not results.multi_hand_landmarks: return None
+        
+        for hand_handedness in results.multi_handedness:
+            if hand_handedness.classification[0].score < self.roi_confidence: return None
+        
+        return results
+    
+    def update_roi(self):
+        """Keeps the region of interest while the hands are inside of it, otherwise pads the bounding box of the landmarks to find the new one."""
+        if not self.hand_info: return
+        
+        # The region is in the not mirrored image, the landmarks are mirrored
+        landmarks = self.landmarks[:len(self.hand_info), :, :2]
+        mirrored_x_min, y_min = landmarks.min(axis=(0, 1))
+        mirrored_x_max, y_max = landmarks.max(axis=(0, 1))
+        x_min, x_max = self.image_width - mirrored_x_max, self.image_width - mirrored_x_min
+        
+        # Keep the region while the hands are not close to its edges, the image edges don't count
+        if self.roi is not None:
+            x1, y1, x2, y2 = self.roi
+            margin_x = (x2 - x1) * self.roi_padding / (1 + 2 * self.roi_padding) / 2
+            margin_y = (y2 - y1) * self.roi_padding / (1 + 2 * self.roi_padding) / 2
+            
+            inside_x = (x1 == 0 or x_min > x1 + margin_x) and (x2 == self.image_width or x_max < x2 - margin_x)
+            inside_y = (y1 == 0 or y_min > y1 + margin_y) and (y2 == self.image_height or y_max < y2 - margin_y)
+            if inside_x and inside_y: return
+        
+        # Square box around the hands, so the hand fits when it rotates
+        size = max(x_max - x_min, y_max - y_min) * (1 + 2 * self.roi_padding)
+        center_x, center_y = (x_min + x_max) / 2, (y_min + y_max) / 2
+        
+        x1 = max(int(center_x - size / 2), 0)
+        y1 = max(int(center_y - size / 2), 0)
+        x2 = min(int(center_x + size / 2) + 1, self.image_width)
+        y2 = min(int(center_y + size / 2) + 1, self.image_height)
+        
+        # If the region is most of the image, just search the full image
+        if (x2 - x1) * (y2 - y1) > 0.8 * self.image_width * self.image_height:
+            self.roi = None
+        else:
+            self.roi = (x1, y1, x2, y2)
+    
+    def flow_image(self, image):
+        """Returns the small grayscale image used for the optical flow. Two buffers take turns, so the image of the previous frame is kept."""
+        image_height, image_width = image.shape[:2]
+        width, height = max(round(image_width * self.flow_scale), 1), max(round(image_height * self.flow_scale), 1)
+        
+        small = cv2.resize(image, (width, height), dst=self.get_buffer('flow_resize', (height, width, image.shape[2])), interpolation=cv2.INTER_AREA)
+        self.flow_index ^= 1
+        
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self.get_buffer(f'flow_gray_{self.flow_index}', (height, width)))
+    
+    def propagate(self, previous_flow_image, flow_image):
+        """Moves the landmarks of every hand by the optical flow from the previous to this frame. Returns False if a hand is not tracked well enough."""
+        if previous_flow_image is None or previous_flow_image.shape != flow_image.shape: return False
+        if any(landmark is None for _, landmark in self.hand_info.values()): return False
+        
+        # The flow is in the small not mirrored image, the landmarks are mirrored
+        hands = len(self.hand_info)
+        landmarks = self.landmarks[:hands]
+        points = self.flow_points[:hands * 21]
+        points[:, 0, 0] = (self.image_width - landmarks[:, :, 0].ravel()) * self.flow_scale
+        points[:, 0, 1] = landmarks[:, :, 1].ravel() * self.flow_scale
+        
+        new_points, status, _ = cv2.calcOpticalFlowPyrLK(previous_flow_image, flow_image, points, None, winSize=self.flow_window, maxLevel=self.flow_levels)
+        if new_points is None: return False
+        
+        status = status.reshape(hands, 21).astype(bool)
+        if (status.mean(axis=1) < self.flow_quality).any(): return False
+        
+        # Landmarks that were lost move with the rest of their hand
+        moved = (new_points - points).reshape(hands, 21, 2) / self.flow_scale
+        for hand_id in range(hands):
+            lost = ~status[hand_id]
+            if lost.any():
+                moved[hand_id, lost] = np.median(moved[hand_id, status[hand_id]], axis=0)
+        
+        landmarks[:, :, 0] -= moved[:, :, 0]
+        landmarks[:, :, 1] += moved[:, :, 1]
+        
+        return True
+    
+    def resize_for_inference(self, image, buffer_name='full'):
+        """Downscales the image to the inference size. The landmarks from mediapipe are a percentage, so they are mapped back to the full image by the image width and height."""
+        if not self.inference_size: return image
+        
+        width, height = self.inference_size
+        image_height, image_width = image.shape[:2]
+        
+        # Keep the aspect ratio, the region of interest can have a different aspect ratio than the inference size. Never upscale
+        scale = min(width / image_width, height / image_height)
+        if scale >= 1: return image
+        
+        width, height = round(image_width * scale), round(image_height * scale)
+        
+        return cv2.resize(image, (width, height), dst=self.get_buffer(buffer_name + '_resize', (height, width, image.shape[2])), interpolation=cv2.INTER_AREA)
+    
     def find_handedness(self):
         """Finds if the detected hands is either a left or right hand."""
         if not self.results.multi_hand_landmarks: return
@@ -95,9 +390,11 @@ class Hands:
         self.hand_info = {}
 
         for hand_id, hand_handedness in enumerate(self.results.multi_handedness):
-            handedness = hand_handedness.classification[0].label
+            # Mediapipe assumes the image is mirrored, the image was not mirrored so the handedness is swapped
+            handedness = 'Left' if hand_handedness.classification[0].label == 'Right' else 'Right'
             
             self.hand_info[hand_id] = [handedness, None]
+            self.scores[hand_id] = hand_handedness.classification[0].score
               
     def draw_and_find(self, image):
         """Does exactly the same thing as the methods draw_left_or_right() and relative_pos(), except it does both in one loop so it’s slightly faster."""
@@ -111,9 +408,7 @@ class Hands:
             self.draw(image=image, hand_id=hand_id, hand_landmarks=hand_landmarks)
             
             # Find all the landmark postion relative to our image
-            relative_landmark = self.calculate_relative_landmark(hand_landmarks=hand_landmarks)
-            
-            self.hand_info[hand_id][1] = relative_landmark
+            self.hand_info[hand_id][1] = self.calculate_relative_landmark(hand_landmarks=hand_landmarks, out=self.landmarks[hand_id])
     
         return image
         
@@ -136,21 +431,25 @@ class Hands:
          
         # Find all the landmark postion relative to our image    
         for hand_id, hand_landmarks in enumerate(self.results.multi_hand_landmarks):
-            relative_landmark = self.calculate_relative_landmark(hand_landmarks=hand_landmarks)
-            
-            self.hand_info[hand_id][1] = relative_landmark
+            self.hand_info[hand_id][1] = self.calculate_relative_landmark(hand_landmarks=hand_landmarks, out=self.landmarks[hand_id])
         
         return self.hand_info
     
     def draw(self, image, hand_id, hand_landmarks):
         """Helper function to draw based on hand_id and hand_landmarks"""
+        self.load_mediapipe()
+        
+        # The landmarks are a percentage of the processed region, which is a view of the image
+        if image is self.region_parent:
+            image = self.region_image
+        
         if self.hand_info[hand_id][0] == 'Right':
                 self.mp_drawing.draw_landmarks(
                     image, 
                     hand_landmarks, 
                     self.mp_hands.HAND_CONNECTIONS,
-                    self.mp_drawing.DrawingSpec(color=self.right_landmark_color, thickness=2, circle_radius=2),
-                    self.mp_drawing.DrawingSpec(color=self.right_connection_color, thickness=2, circle_radius=2),
+                    self.right_landmark_spec,
+                    self.right_connection_spec,
                 ) 
         else:
             self.mp_drawing.draw_landmarks(
@@ -161,52 +460,86 @@ class Hands:
         
         return
     
-    def calculate_relative_landmark(self, hand_landmarks):
-        """Helper function to find to calculate relative landmark postions based on hand_landmarks"""
-        relative_landmark = []
-            
-        for landmark in hand_landmarks.landmark:      
-            relative_x, relative_y = int(landmark.x * self.image_width), int(landmark.y * self.image_height)
-            relative_landmark.append((relative_x, relative_y))
+    def calculate_relative_landmark(self, hand_landmarks, out=None):
+        """Helper function to find to calculate relative landmark postions based on hand_landmarks. Fills out, a (21, 3) float32 array, in place."""
+        if out is None:
+            out = np.empty((21, 3), dtype=np.float32)
+        
+        # The landmarks from the worker process are already an array
+        array = getattr(hand_landmarks, 'array', None)
+        if array is not None:
+            out[:] = array
+        else:
+            for i, landmark in enumerate(hand_landmarks.landmark):
+                out[i, 0] = landmark.x
+                out[i, 1] = landmark.y
+                out[i, 2] = landmark.z
+        
+        # Mediapipe landmarks are a percentage of the processed region, scale and move them to our image
+        np.multiply(out, self.scale, out=out)
+        np.add(out, self.offset, out=out)
+        
+        return out
+    
+    def get_joint_index(self, joints):
+        """Helper function that returns the (joints, 3) index array for joints. The array is cached, since the joints rarely change."""
+        index = self.joint_index.get(joints)
+        if index is None:
+            index = np.array(joints, dtype=np.intp).reshape(-1, 3)
+            self.joint_index[joints] = index
+        
+        return index
+    
+    def joint_angles(self, joints, landmark):
+        """Returns the angle of every joint in degrees. landmark is either (21, C) for one hand or (hands, 21, C) for all hands and the result is (joints,) or (hands, joints)."""
+        index = self.get_joint_index(joints)
+        
+        # Vectors from the middle landmark of every joint to the other two landmarks
+        joint_1 = landmark[..., index[:, 0], :2]
+        joint_2 = landmark[..., index[:, 1], :2]
+        joint_3 = landmark[..., index[:, 2], :2]
+        vector_1 = joint_1 - joint_2
+        vector_3 = joint_3 - joint_2
         
-        return relative_landmark
+        radians = np.arctan2(vector_3[..., 1], vector_3[..., 0]) - np.arctan2(vector_1[..., 1], vector_1[..., 0])
+        angle = np.abs(np.degrees(radians))
         
-    #! TODO: Use cv2 contour to draw the line all the lines. Individually drawing each is too slow
+        # Same as 360 - angle when the angle is over 180
+        return np.minimum(angle, 360.0 - angle)
+    
     def finger_angles(self, joints, landmark, find_finger_position=False, image=None, show=False, finger_open=100):
         if not self.results: return
         if not self.results.multi_hand_landmarks: return
         if not self.hand_info: return
         
-        finger_angle = []
-        finger_pos = []
-        # Loop through joints, and gets 3 landmark postions
-        for joint in joints:
-            joint_1 = np.array([landmark[joint[0]][0], landmark[joint[0]][1]])
-            joint_2 = np.array([landmark[joint[1]][0], landmark[joint[1]][1]])
-            joint_3 = np.array([landmark[joint[2]][0], landmark[joint[2]][1]])
-                
-            radians = np.arctan2(joint_3[1] - joint_2[1], joint_3[0]-joint_2[0]) - np.arctan2(joint_1[1]-joint_2[1], joint_1[0]-joint_2[0])
-            angle = np.abs(radians*180.0/np.pi) 
-            
-            if angle > 180.0:
-                angle = 360-angle
-            
-            if find_finger_position:
-                if angle > finger_open:
-                    finger_pos.append(1)
-                    if show:
-                        cv2.line(image, joint_1, joint_2, [0, 255, 0], 2)
-                else:
-                    finger_pos.append(0)
-                    if show:
-                        cv2.line(image, joint_1, joint_2, [0, 0, 255], 2)
-            else:
-                finger_angle.append(angle)
-            
-        if find_finger_position:
-            return tuple(finger_pos) 
-        else:           
+        finger_angle = self.joint_angles(joints, landmark)
+        
+        if not find_finger_position:
             return finger_angle
+        
+        finger_pos = finger_angle > finger_open
+        
+        if show:
+            for hand_landmark, hand_finger_pos in zip(landmark.reshape(-1, 21, landmark.shape[-1]), finger_pos.reshape(-1, len(joints))):
+                self.draw_finger_position(image, joints, hand_landmark, hand_finger_pos)
+        
+        if finger_pos.ndim == 1:
+            return tuple(finger_pos.tolist())
+        
+        return [tuple(hand_finger_pos) for hand_finger_pos in finger_pos.tolist()]
+    
+    def draw_finger_position(self, image, joints, landmark, finger_pos):
+        """Draws a green line for every open finger and a red line for every closed finger, from the first to the second landmark of the joint. All lines of one color are drawn with one cv2.polylines call."""
+        index = self.get_joint_index(joints)
+        lines = landmark[index[:, :2], :2].astype(np.int32)
+        finger_pos = np.asarray(finger_pos, dtype=bool)
+        
+        if finger_pos.any():
+            cv2.polylines(image, lines[finger_pos], False, [0, 255, 0], 2)
+        if not finger_pos.all():
+            cv2.polylines(image, lines[~finger_pos], False, [0, 0, 255], 2)
+        
+        return image
     
     def get_hands_info(self):
         """Returns all the information for both left and right hand"""
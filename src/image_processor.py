@@ -1,20 +1,38 @@
 """
-The Processor class takes the arguments: user and optionally detection_confidence. The argument user, is a instance of the UserSetting class.
+The Processor class takes the arguments: user and optionally detection_confidence, mouse_backend and extra_captures.
+The argument extra_captures is a list of started Captures of more cameras. Every extra camera gets its own Hands on its own thread, and the hands of all cameras are merged by FusedHands(see multi_camera.py).
+The optional recorder argument is a SessionRecorder(see session_recorder.py), process() gives it the hands and the actions of every frame. The optional hands argument is used in place of the Hands, replay.py gives it the recorded hands.
+The warm_up() method runs the detection on a black image, so the first camera frame doesn't wait for mediapipe to initialize. The argument user, is a instance of the UserSetting class. The argument mouse_backend is given to Mouse, None creates the backend named by the user's mouse_backend setting. The optional latency_stats argument is a LatencyStats, which records how long the 'detect' and 'gestures' stages of process() take.
 We need to import Hands from hands.py and import Mouse from mouse_control
 
-The process() method takes a single image. It first detects the hands and then controls the mouse according to the hands gesture.
+The process() method takes a single image and optionally the timestamp it was captured at. It first detects the hands and then controls the mouse according to the hands gesture. The mouse actions are sent to an Actuator, which performs them on a separate thread so process() never waits for a click. With the optional argument actuate False the actions are only found and kept in right_action and left_action, nothing is performed and no mouse backend is needed.
+The finger positions of both hands are compiled into a GestureTable per hand when the Processor is created, so every finger set of a hand is checked with one lookup and conflicting positions raise a ValueError before the camera starts. The angles of all hands are computed once per frame. A GestureState per hand opens and closes the fingers with hysteresis and only performs an action after it was confirmed for a few frames. Clicks are performed once when the hand changes position, only MOVE and SCROLL repeat every frame.
+Nothing is drawn on the image while it is processed. If show is True, the hands, the open and closed fingers and the tracking box are added to self.overlay, an Overlay, which draws them on a copy of the image after the detection with render().
 """
 
+import time
+
+from actuator import Actuator
+from cursor import Cursor
+from gestures import GestureState, GestureTable
 from hands import Hands
+from mouse_backend import NullBackend, create_backend
 from mouse_control import Mouse
+from multi_camera import CameraTracker, FusedHands
+from overlay import Overlay
+from screen_mapping import ScreenMapping
 
 class Processor:
-    def __init__(self, user, detection_confidence=0.5) -> None:
-        # Initialize Hands object to detect and track hands.
-        self.hands = Hands(detection_confidence=detection_confidence)
+    def __init__(self, user, detection_confidence=0.5, mouse_backend=None, latency_stats=None, extra_captures=None, actuate=True, recorder=None, hands=None) -> None:
+        # Initialize Hands object to detect and track hands. Every extra camera has its own Hands, the hands of all cameras are merged
+        self.hands = hands if hands is not None else self.create_hands(user, detection_confidence)
+        if extra_captures and hands is None:
+            transforms = list(user.extra_camera_transforms) + [None] * len(extra_captures)
+            warm_up_size = (user.cap_width, user.cap_height) if user.cap_width and user.cap_height else None
+            trackers = [CameraTracker(capture, self.create_hands(user, detection_confidence), transform, warm_up_size) for capture, transform in zip(extra_captures, transforms)]
+            self.hands = FusedHands(self.hands, trackers)
         
         # Uses User object and gets all it's values
-        self.movement_speed = user.movement_speed
         self.pause = user.pause
         self.right = user.right_positions
         self.left = user.left_positions
@@ -24,93 +42,189 @@ class Processor:
         self.left_angle = user.left_angle
         self.show = user.show
         
-        # Initialize Mouse object to control the mouse functions 
-        self.mouse_control = Mouse(self.movement_speed, scroll_speed=self.scroll_speed, pause=self.pause, position=self.position)
+        # Initialize Mouse object to control the mouse functions. Without actuating the mouse is never moved
+        if mouse_backend is None and not actuate:
+            mouse_backend = NullBackend()
+        elif mouse_backend is None:
+            mouse_backend = create_backend(user.mouse_backend)
+        
+        # Maps the tracking box to the chosen monitors with the calibration
+        self.mapping = ScreenMapping(user.monitors or mouse_backend.monitors(), monitor=user.monitor, calibration=user.screen_calibration)
+        
+        # Moves the mouse at the display rate, extrapolating between the camera frames
+        self.cursor = Cursor(mouse_backend, rate=user.cursor_rate, max_extrapolation=user.max_extrapolation, mapping=self.mapping) if user.cursor_rate and actuate else None
+        
+        self.mouse_control = Mouse(scroll_speed=self.scroll_speed, pause=self.pause, position=self.position, backend=mouse_backend, cursor=self.cursor, min_cutoff=user.min_cutoff, beta=user.beta, d_cutoff=user.d_cutoff, dead_zone=user.dead_zone, mapping=self.mapping)
         #self.mouse_control.set_camera_size(camera_width=camera_width, camera_height=camera_height)
         
+        # All the joints used by either hand. The angles of every hand are computed for these joints in one call
+        finger_sets = (*self.right.keys(), *self.left.keys())
+        self.joints = tuple(dict.fromkeys(joint for fingers in finger_sets for joint in fingers))
+        
+        # Every finger set of a hand in one table, indexed by which joints are open
+        self.right_gestures = GestureTable(self.right, self.joints, hand='Right')
+        self.left_gestures = GestureTable(self.left, self.joints, hand='Left')
+        
+        # Open and closed fingers with hysteresis, and the confirmed action of each hand
+        self.right_state = GestureState(self.right_gestures, self.right_angle, user.right_close_angle, confirm_frames=user.confirm_frames, confirm_time=user.confirm_time)
+        self.left_state = GestureState(self.left_gestures, self.left_angle, user.left_close_angle, confirm_frames=user.confirm_frames, confirm_time=user.confirm_time)
+        
+        # Collects everything that is drawn, it is drawn after the detection
+        self.overlay = Overlay()
+        
+        # Performs the mouse actions on a separate thread. The pause is used as the cooldown between clicks
+        self.actuator = Actuator(self.mouse_control, cooldown=self.pause, latency_stats=latency_stats) if actuate else None
+        
+        # Records how long each stage takes
+        self.latency_stats = latency_stats
+        
+        # Records the hands and actions of every frame
+        self.recorder = recorder
+        
         # Class variables
         self.hand_info = None
+        self.timestamp = None
         self.right_finger_position = ()
         self.left_finger_position = ()
-        self.right_action = {}
-        self.right_landmark = []
-        self.left_action = {}
-        self.left_landmark = []
+        self.right_action = None
+        self.right_landmark = None
+        self.left_action = None
+        self.left_landmark = None
         
+    def create_hands(self, user, detection_confidence):
+        """Returns a Hands with the user settings"""
+        inference_size = (user.inference_width, user.inference_height) if user.inference_width and user.inference_height else None
+        return Hands(detection_confidence=detection_confidence, inference_size=inference_size, roi=user.roi_tracking, flow_interval=user.flow_interval, worker=user.inference_worker)
+    
+    def warm_up(self, width, height):
+        """Runs the detection of the first camera on a black image of width x height, the extra cameras warm up on their own threads"""
+        hands = self.hands.primary if isinstance(self.hands, FusedHands) else self.hands
+        hands.warm_up(width, height)
+    
     def reset(self):
         """Resets the class variables"""
         self.hand_info = None
         self.right_finger_position = ()
         self.left_finger_position = ()
-        self.right_action = {}
-        self.right_landmark = []
-        self.left_action = {}
-        self.left_landmark = []
-    
-    def process(self, image, upper_left, bottom_right):   
+        self.right_action = None
+        self.right_landmark = None
+        self.left_action = None
+        self.left_landmark = None
+        self.right_state.reset()
+        self.left_state.reset()
+    
+    def process(self, image, upper_left, bottom_right, timestamp=None):   
         """Detects hands and then controls the mouse according to the hands gesture"""     
-        # Detect the hand in the image
-        image = self.hands.detect_and_track(image, draw=self.show, find_relative_pos=True)
+        self.timestamp = timestamp
+        self.overlay.clear()
+        if self.show:
+            self.overlay.set_tracking_box(upper_left, bottom_right)
+        
+        # Detect the hand in the image. The overlay draws the hands after the detection
+        start = time.perf_counter()
+        image = self.hands.detect_and_track(image, draw=False, find_relative_pos=True)
+        detected = time.perf_counter()
         
         # Get the landmarks of the joints relative to our image
         self.hand_info = self.hands.get_hands_info()
         
         if self.hand_info:     
+            if self.show:
+                for handedness, landmark in self.hand_info.values():
+                    self.overlay.add_hand(handedness, landmark)
+            
             self.mouse_control.set_tracking_size(upper_left=upper_left, bottom_right=bottom_right)
                    
             image = self.finger_info(image=image, hand_info=self.hand_info)
+            
+            if self.latency_stats is not None:
+                self.latency_stats.record('gestures', time.perf_counter() - detected)
         else:
             self.reset()
+        
+        if self.latency_stats is not None:
+            self.latency_stats.record('detect', detected - start)
+        
+        if self.recorder is not None:
+            self.record(image)
 
         return image
             
+    def record(self, image):
+        """Gives the hands and the actions of this frame to the recorder"""
+        hand_info = self.hand_info or {}
+        handedness = [hand for hand, _ in hand_info.values()]
+        actions = [self.right_action if hand == 'Right' else self.left_action for hand in handedness]
+        timestamp = self.timestamp if self.timestamp is not None else time.perf_counter()
+        
+        self.recorder.record(timestamp, image.shape[1], image.shape[0], handedness, self.hands.scores, self.hands.landmarks, actions)
+        
     def finger_info(self, image, hand_info):
         """Gets which finger is open with finger_angles() method from the Hands class and the calls the perform_action() method from the Mouse class. """
         self.right_finger_position = ()
         self.left_finger_position = ()
-        self.right_action = {}
-        self.right_landmark = []
-        self.left_action = {}
-        self.left_landmark = []
+        self.right_action = None
+        self.right_landmark = None
+        self.left_action = None
+        self.left_landmark = None
+        
+        # The joint angles of both hands in one call
+        angles = self.hands.finger_angles(self.joints, self.hands.landmarks[:len(hand_info)])
         
         # Finds which finger are open or close from the fingers the user specified for both left and right hand
-        for handedness, landmark in hand_info.values():
-            self.set_finger_position(image, handedness, landmark)
+        for hand_id, (handedness, landmark) in hand_info.items():
+            self.set_finger_position(image, handedness, landmark, angles[hand_id])
+        
+        # A hand that is gone starts over when it comes back
+        if self.right_landmark is None:
+            self.right_state.reset()
+        if self.left_landmark is None:
+            self.left_state.reset()
         
         # Perform the action based on the finger postion
         self.perform_action_based_on_fingers()
         
         return image
     
-    def set_finger_position(self, image, handedness, landmark):
+    def set_finger_position(self, image, handedness, landmark, angles):
+        """Updates the state of the hand, which finds the open joints and the action to perform this frame"""
         if handedness == 'Right':
             self.right_landmark = landmark
-            for all_fingers, action_list in self.right.items():
-                self.right_action = action_list
-    
-                self.right_finger_position = self.hands.finger_angles(all_fingers, landmark, find_finger_position=True, image=image, show=self.show, finger_open=self.right_angle)
+            self.right_action = self.right_state.update(angles, self.timestamp)
+            self.right_finger_position = self.finger_position(landmark, self.right_state)
 
         elif handedness == 'Left':
             self.left_landmark = landmark
-            for all_fingers, action_list in self.left.items():
-                self.left_action = action_list
-                
-                self.left_finger_position = self.hands.finger_angles(all_fingers, landmark, find_finger_position=True, image=image, show=self.show, finger_open=self.left_angle)
+            self.left_action = self.left_state.update(angles, self.timestamp)
+            self.left_finger_position = self.finger_position(landmark, self.left_state)
+    
+    def finger_position(self, landmark, state):
+        """Returns a bool array with True for every open joint and False for every closed joint of self.joints"""
+        finger_pos = state.open_fingers
+        
+        if self.show:
+            self.overlay.add_fingers(self.joints, landmark, tuple(finger_pos.tolist()))
+        
+        return finger_pos
 
     
     def perform_action_based_on_fingers(self):
-        if self.right_finger_position in self.right_action:
-            action = self.right_action[self.right_finger_position]
-            
-            self.mouse_control.perform_action(action=action, landmark=self.right_landmark)
-            
-        if self.left_finger_position in self.left_action:
-            action = self.left_action[self.left_finger_position]
+        if self.actuator is None: return
+        
+        if self.right_action is not None:
+            # The landmarks are overwritten by the next frame, so the actuator gets a copy
+            self.actuator.submit(action=self.right_action, landmark=self.right_landmark.copy(), timestamp=self.timestamp)
             
-            self.mouse_control.perform_action(action=action, landmark=self.left_landmark)
+        if self.left_action is not None:
+            self.actuator.submit(action=self.left_action, landmark=self.left_landmark.copy(), timestamp=self.timestamp)
         
     def release(self):
+        if self.actuator is not None:
+            self.actuator.release()
+        if self.cursor is not None:
+            self.cursor.release()
         self.hands.reset()
+        self.hands.close()
         self.hands = None 
     
     
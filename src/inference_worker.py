@@ -0,0 +1,255 @@
+"""
+The HandsWorker class runs the mediapipe hand model in a separate process, so the detection doesn't hold the GIL of the main process. While the worker detects the hands, the capture, actuator, cursor and preview threads of the main process keep running on the other cores.
+
+The HandsWorker class takes optional arguments: detection_confidence, tracking_confidence, model_complexity, slots, timeout and start_timeout. It has the same process() method as the mediapipe model, so Hands uses it in place of the model when its worker argument is True.
+
+Frames are given to the worker through a ring of slots in a multiprocessing.shared_memory block, so the image is copied once into shared memory instead of being pickled. Only the slot, the shape and the request number are sent through the pipe, and the worker sends back the landmarks as a small float32 array of shape (hands, 21, 3) with the handedness labels and scores. process() returns them as RemoteResults, which has the same multi_hand_landmarks and multi_handedness as the results from mediapipe. The ring grows when a bigger image is given.
+
+Creating a HandsWorker waits until the worker loaded the model, at most start_timeout seconds, and raises the same error as mediapipe if the model can't be created. If the worker doesn't answer a frame within timeout seconds or the worker process died, it is restarted and process() returns results without hands for that frame, so the main loop keeps running. The new worker is started in the background: process() returns results without hands until it loaded the model, instead of waiting for it. restarts counts how many times the worker was restarted.
+"""
+
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+
+import numpy as np
+
+
+class RemoteLandmark:
+    """One landmark like mediapipe's, for drawing."""
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x, y, z) -> None:
+        self.x, self.y, self.z = x, y, z
+
+    def HasField(self, name):
+        return False
+
+
+class RemoteLandmarks:
+    """The landmarks of one hand. array is the (21, 3) array, landmark is only created when the hand is drawn."""
+    def __init__(self, array) -> None:
+        self.array = array
+
+    @property
+    def landmark(self):
+        return [RemoteLandmark(x, y, z) for x, y, z in self.array.tolist()]
+
+
+class RemoteResults:
+    """Same fields as the results of mediapipe's Hands.process()."""
+    def __init__(self, landmarks, labels, scores) -> None:
+        self.multi_hand_landmarks = [RemoteLandmarks(hand) for hand in landmarks] or None
+        self.multi_handedness = [SimpleNamespace(classification=[SimpleNamespace(label=label, score=score)]) for label, score in zip(labels, scores)] or None
+
+
+NO_HANDS = RemoteResults([], [], [])
+
+# Returned by HandsWorker.wait() instead of a message
+DIED = ('died',)
+TIMED_OUT = ('timed out',)
+
+
+def run_worker(conn, detection_confidence, tracking_confidence, model_complexity):
+    """Worker process. Detects the hands in every frame it is sent until the pipe is closed."""
+    import mediapipe as mp
+
+    mp_hands = mp.solutions.hands
+    try:
+        if model_complexity is None:
+            hands = mp_hands.Hands(False, 2, detection_confidence, tracking_confidence)
+        else:
+            hands = mp_hands.Hands(static_image_mode=False, max_num_hands=2, model_complexity=model_complexity, min_detection_confidence=detection_confidence, min_tracking_confidence=tracking_confidence)
+    except Exception as error:
+        conn.send(('error', type(error).__name__, str(error)))
+        return
+
+    ring = None
+    conn.send(('ready',))
+
+    try:
+        while True:
+            message = conn.recv()
+            if message[0] == 'close':
+                break
+
+            if message[0] == 'ring':
+                if ring is not None:
+                    ring.close()
+                ring = shared_memory.SharedMemory(name=message[1])
+                continue
+
+            _, request, offset, shape = message
+            image = np.ndarray(shape, dtype=np.uint8, buffer=ring.buf, offset=offset)
+            image.flags.writeable = False
+
+            results = hands.process(image)
+            del image
+
+            if results.multi_hand_landmarks:
+                landmarks = np.array([[(landmark.x, landmark.y, landmark.z) for landmark in hand.landmark] for hand in results.multi_hand_landmarks], dtype=np.float32)
+                labels = [handedness.classification[0].label for handedness in results.multi_handedness]
+                scores = [handedness.classification[0].score for handedness in results.multi_handedness]
+            else:
+                landmarks, labels, scores = np.zeros((0, 21, 3), dtype=np.float32), [], []
+
+            conn.send((request, landmarks, labels, scores))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        hands.close()
+        if ring is not None:
+            ring.close()
+
+
+class HandsWorker:
+    """Runs the mediapipe hand model in a worker process and restarts it if it crashes."""
+    def __init__(self, detection_confidence=0.5, tracking_confidence=0.5, model_complexity=None, slots=2, timeout=1.0, start_timeout=30.0) -> None:
+        self.detection_confidence = detection_confidence
+        self.tracking_confidence = tracking_confidence
+        self.model_complexity = model_complexity
+        self.slots = slots
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+
+        # Spawn, so the worker doesn't inherit the threads of the main process
+        self.context = multiprocessing.get_context('spawn')
+
+        # Shared memory ring, slots of slot_size bytes
+        self.ring = None
+        self.slot_size = 0
+
+        self.process_handle = None
+        self.conn = None
+        self.starting = False
+        self.start_time = 0
+        self.request = 0
+        self.restarts = 0
+
+        self.start()
+
+    def launch(self):
+        """Starts the worker process without waiting for it."""
+        self.conn, child_conn = self.context.Pipe()
+        self.process_handle = self.context.Process(target=run_worker, args=(child_conn, self.detection_confidence, self.tracking_confidence, self.model_complexity), name='hands worker', daemon=True)
+        self.process_handle.start()
+        child_conn.close()
+
+        self.starting = True
+        self.start_time = time.perf_counter()
+
+    def started(self, message):
+        """Handles the first message of the worker. Raises the error of mediapipe, or RuntimeError if the worker died or didn't start in time."""
+        if message[0] != 'ready':
+            self.stop(timeout=0.1)
+            if message[0] == 'error':
+                raise (TypeError if message[1] == 'TypeError' else RuntimeError)(message[2])
+            raise RuntimeError(f"The hands worker {message[0]} while starting")
+
+        self.starting = False
+        if self.ring is not None:
+            self.conn.send(('ring', self.ring.name))
+
+    def start(self):
+        """Starts the worker process and waits until it loaded the model."""
+        self.launch()
+        self.started(self.wait(self.start_timeout))
+
+    def restart(self, reason):
+        """Kills the worker and starts a new one in the background."""
+        print(f"Hands worker {reason}, restarting it")
+        self.restarts += 1
+        self.stop(timeout=0.1)
+        self.launch()
+
+    def check_started(self):
+        """Returns True once the restarted worker loaded the model, without waiting for it."""
+        message = self.wait(0)
+        if message is TIMED_OUT:
+            if time.perf_counter() - self.start_time > self.start_timeout:
+                self.restart("did not start in time")
+            return False
+
+        try:
+            self.started(message)
+        except (RuntimeError, TypeError, BrokenPipeError, OSError) as error:
+            print("Could not restart the hands worker:", error)
+            self.stop(timeout=0.1)
+            return False
+        return True
+
+    def ensure_ring(self, size):
+        """Creates a bigger ring if an image of size bytes doesn't fit in a slot."""
+        if size <= self.slot_size: return
+
+        if self.ring is not None:
+            self.ring.close()
+            self.ring.unlink()
+
+        self.slot_size = size
+        self.ring = shared_memory.SharedMemory(create=True, size=size * self.slots)
+        self.conn.send(('ring', self.ring.name))
+
+    def wait(self, timeout):
+        """Waits for a message from the worker. Returns DIED if the worker closed the pipe and TIMED_OUT if it didn't answer in time."""
+        try:
+            if not self.conn.poll(timeout): return TIMED_OUT
+            return self.conn.recv()
+        except (EOFError, OSError):
+            return DIED
+
+    def process(self, image):
+        """Detects the hands in image in the worker process. Returns RemoteResults."""
+        if self.conn is None:
+            self.restart("is not running")
+        if self.starting and not self.check_started():
+            return NO_HANDS
+
+        try:
+            self.ensure_ring(image.nbytes)
+
+            # Writes the image into the next slot of the ring
+            self.request += 1
+            offset = (self.request % self.slots) * self.slot_size
+            np.ndarray(image.shape, dtype=np.uint8, buffer=self.ring.buf, offset=offset)[...] = image
+
+            self.conn.send(('frame', self.request, offset, image.shape))
+        except (BrokenPipeError, OSError):
+            self.restart("died")
+            return NO_HANDS
+
+        # Answers to older requests that timed out are skipped
+        while True:
+            message = self.wait(self.timeout)
+            if message is DIED or message is TIMED_OUT:
+                self.restart(message[0])
+                return NO_HANDS
+
+            request, landmarks, labels, scores = message
+            if request == self.request:
+                return RemoteResults(landmarks, labels, scores)
+
+    def stop(self, timeout=1.0):
+        """Stops the worker process."""
+        if self.conn is None: return
+
+        try:
+            self.conn.send(('close',))
+        except (BrokenPipeError, OSError):
+            pass
+
+        self.process_handle.join(timeout)
+        if self.process_handle.is_alive():
+            self.process_handle.kill()
+            self.process_handle.join()
+        self.conn.close()
+        self.conn = None
+
+    def close(self):
+        """Stops the worker and frees the shared memory."""
+        self.stop()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring.unlink()
+            self.ring = None
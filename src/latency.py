@@ -0,0 +1,112 @@
+"""
+The LatencyStats class keeps rolling latency histograms for each stage of the program, like capture, detection, gestures, the mouse and the preview.
+
+The LatencyStats class takes optional arguments: window and buckets. The argument window is how many of the newest times of each stage are used for the percentiles. The argument buckets are the upper bounds(in milliseconds) of the histogram that counts every time since the start.
+
+The record() method takes the name of a stage and a time in seconds. It is thread safe, so stages can be recorded from the capture, actuator and preview threads. The time() method returns a context manager that records how long its block took.
+
+The percentiles() method returns the p50, p95 and p99 of a stage in milliseconds. The fps() method uses the median of the 'frame' stage instead of a single frame, so it isn't noisy and never divides by zero. The lines() method returns a line of text per stage for the overlay. The dump() method saves the percentiles and histograms of every stage to a JSON file.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# Upper bounds of the histogram buckets in milliseconds, the last bucket counts everything slower
+BUCKETS = (1, 2, 3, 5, 8, 10, 15, 20, 25, 33, 50, 75, 100, 150, 250, 500, 1000)
+
+
+class LatencyStats:
+    """Rolling latency percentiles and histograms for each stage."""
+    def __init__(self, window=1000, buckets=BUCKETS) -> None:
+        self.window = window
+        self.buckets = np.array(buckets, dtype=np.float64)
+
+        # For every stage: ring buffer of the newest times in milliseconds, the number of times recorded and the histogram
+        self.times = {}
+        self.counts = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+        self.start_time = time.time()
+
+    def record(self, stage, seconds):
+        """Records that stage took seconds."""
+        milliseconds = seconds * 1000
+
+        with self.lock:
+            times = self.times.get(stage)
+            if times is None:
+                times = self.times[stage] = np.zeros(self.window)
+                self.counts[stage] = 0
+                self.histograms[stage] = np.zeros(len(self.buckets) + 1, dtype=np.int64)
+
+            times[self.counts[stage] % self.window] = milliseconds
+            self.counts[stage] += 1
+            self.histograms[stage][np.searchsorted(self.buckets, milliseconds)] += 1
+
+    @contextmanager
+    def time(self, stage):
+        """Records how long the with block took."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def percentiles(self, stage):
+        """Returns the p50, p95 and p99 of the newest times of stage in milliseconds, or None if it was never recorded."""
+        with self.lock:
+            times = self.times.get(stage)
+            if times is None: return None
+            times = times[:min(self.counts[stage], self.window)].copy()
+
+        return tuple(np.percentile(times, (50, 95, 99)))
+
+    def fps(self):
+        """Returns the frames per second from the median time of the 'frame' stage."""
+        percentiles = self.percentiles('frame')
+        if not percentiles or percentiles[0] <= 0: return 0
+
+        return 1000 / percentiles[0]
+
+    def lines(self):
+        """Returns a line of text with the percentiles of every stage."""
+        lines = []
+        for stage in list(self.times):
+            p50, p95, p99 = self.percentiles(stage)
+            lines.append(f"{stage}: {p50:.1f} / {p95:.1f} / {p99:.1f}ms")
+
+        return lines
+
+    def summary(self):
+        """Returns the count, percentiles and histogram of every stage."""
+        summary = {}
+        for stage in list(self.times):
+            p50, p95, p99 = self.percentiles(stage)
+            with self.lock:
+                histogram = self.histograms[stage].tolist()
+                count = self.counts[stage]
+
+            summary[stage] = {
+                'count': count,
+                'p50_ms': p50,
+                'p95_ms': p95,
+                'p99_ms': p99,
+                'histogram': dict(zip([f"<={bucket:g}ms" for bucket in self.buckets] + ['slower'], histogram)),
+            }
+
+        return summary
+
+    def dump(self, path):
+        """Saves the summary of every stage to a JSON file."""
+        with open(path, 'w') as file:
+            json.dump({
+                'start': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.start_time)),
+                'seconds': time.time() - self.start_time,
+                'window': self.window,
+                'stages': self.summary(),
+            }, file, indent=2)
@@ -2,30 +2,58 @@
 Main file to run the program.
 Imports Processor and UserSetting.
 
-Uses cv2 to open the first webcam avaliable. While the webcame is avaliable calls Processor to process individual frame and detected the hands. Processor also moves the mouse based on the hand gesture. You will need opencv version 4.0.1 and numpy version 1.20.3
+Opens the camera from the user settings(the first webcam by default, or a video, a directory of images or synthetic frames) and the extra_cameras from the user settings with open_source(see frame_source.py), which asks the webcam for the cap_fourcc format, the cap_fps frame rate and a driver buffer of cap_buffer_size frames. The format the webcam actually uses is printed. Frames are read on a separate thread by Capture, which only keeps the newest frame. How long every stage takes is recorded in a LatencyStats, it can be shown on the video and is saved to a file when the program exits. While the webcame is avaliable calls Processor to process individual frame and detected the hands. Processor also moves the mouse based on the hand gesture. You will need opencv version 4.0.1 and numpy version 1.20.3
+
+Run `python main.py --config settings.json` to start without any questions, with the settings from a JSON config file(see config.py). `--save-config settings.json` saves the settings after they were changed with S.
+
+Mediapipe is imported on a separate thread while the settings are read, and its graph is warmed up with a black image before the webcam opens, so the first frame doesn't wait for it. How long every step of the startup took is printed, and the time from the start until the mouse was first moved.
 """
 
-import cv2
 import time
 
+# The startup is timed from here, before the heavy modules are imported
+START_TIME = time.perf_counter()
+
+import argparse
+import importlib
+import threading
+
+import cv2
+
+from capture import Capture
+from config import load_config, save_config, settings_from_user
+from frame_source import describe_source, is_camera, open_source
+from governor import QualityGovernor
 from image_processor import Processor
+from latency import LatencyStats
+from preview import Preview
+from session_recorder import SessionRecorder
 from user_setting import User
 
-def main():
-    # Tracks FPS
-    previous_time = 0
-    current_time = 0
-
-    # Open the first avaliable webcam
-    cap = cv2.VideoCapture(0)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Controls the mouse with your hands")
+    parser.add_argument('--config', help="JSON config file with the settings, the program starts without asking anything")
+    parser.add_argument('--save-config', help="saves the settings to a JSON config file")
+    args = parser.parse_args(argv)
+    
+    # How long every step of the startup took
+    startup = {'imports': time.perf_counter() - START_TIME}
+    step_start = time.perf_counter()
 
     # Initializes the User object to get all the user settings
-    user = User()
+    user = load_config(args.config) if args.config else User()
+    
+    # Mediapipe takes long to import, so it is imported while the settings are read. With the worker it is only imported by the worker process
+    if not user.inference_worker:
+        threading.Thread(target=importlib.import_module, args=('mediapipe',), name='import mediapipe', daemon=True).start()
     
     # Check if the user wants to update anything and display right/left hand gestures
-    show_setting = True
+    show_setting = not args.config
     if show_setting:
         user.setting()
+    if args.save_config:
+        save_config(user, args.save_config)
+        print("Saved the settings to", args.save_config)
     print("\nRunning the program")
     print(user)
     
@@ -34,59 +62,136 @@ def main():
     user_height = user.cap_height
     detection_confidence = user.detection_confidence
     show = user.show
-
-    # Set camera_width and camera_height
-    if user_width:
-        cap.set(3, user_width)
-    if user_height:
-        cap.set(4, user_height)
+    startup['settings'] = time.perf_counter() - step_start
+    step_start = time.perf_counter()
+    
+    # Every extra camera reads its frames on its own thread
+    extra_captures = []
+    for camera in user.extra_cameras:
+        extra_cap = open_source(camera, user_width, user_height, user.cap_fps, user.cap_fourcc, user.cap_buffer_size)
+        print(describe_source(camera, extra_cap, user_width, user_height, user.cap_fps, user.cap_fourcc, user.cap_buffer_size))
+        extra_captures.append(Capture(extra_cap, live=is_camera(camera)).start())
         
+    # Records the latency of every stage
+    latency_stats = LatencyStats()
+    
+    # Records the hands and actions of every frame on a separate thread, for replay.py
+    recorder = SessionRecorder(user.record_file, settings=settings_from_user(user)) if user.record_file else None
+    
     # Initializes the image_processor
-    image_processor = Processor(user, detection_confidence=detection_confidence)
+    image_processor = Processor(user, detection_confidence=detection_confidence, latency_stats=latency_stats, extra_captures=extra_captures, recorder=recorder)
+    
+    # Hands of the first camera, when there are more cameras they are merged by FusedHands
+    hands = image_processor.hands.primary if extra_captures else image_processor.hands
+    startup['model'] = time.perf_counter() - step_start
+    step_start = time.perf_counter()
+    
+    # The first detection initializes the mediapipe graph, do it before the webcam opens
+    image_processor.warm_up(user_width or 1280, user_height or 720)
+    startup['warm up'] = time.perf_counter() - step_start
+    step_start = time.perf_counter()
+    
+    # Open the webcam with the format, size, frame rate and driver buffer of the settings, and print what it really uses
+    cap = open_source(user.camera, user_width, user_height, user.cap_fps, user.cap_fourcc, user.cap_buffer_size)
+    print(describe_source(user.camera, cap, user_width, user_height, user.cap_fps, user.cap_fourcc, user.cap_buffer_size))
 
     top_left_bound = 5
     bottom_right_bound = 4
     
-    while cap.isOpened():
+    # Start reading frames on a separate thread
+    capture = Capture(cap, live=is_camera(user.camera)).start()
+    startup['camera'] = time.perf_counter() - step_start
+    print("Startup:", ', '.join(f"{step} {seconds:.2f}s" for step, seconds in startup.items()))
+    first_move_reported = False
+    
+    # Changes the quality while running to keep the latency under the target
+    # It starts from the settings of the user and only changes them when a frame is too slow or fast
+    settings = {'cap_width': user_width, 'cap_height': user_height, 'fps': user.cap_fps, 'inference_size': hands.inference_size, 'model_complexity': hands.model_complexity, 'flow_interval': hands.flow_interval}
+    governor = QualityGovernor(capture, hands, target=user.latency_target, settings=settings) if user.quality_governor else None
+    
+    # Shows the video on a separate thread at a capped rate
+    preview = Preview(fps=user.preview_fps, scale=user.preview_scale, latency_stats=latency_stats) if show else None
+    
+    previous_time = time.perf_counter()
+    image_size = None
+    
+    while capture.isOpened():
         
-        success, image = cap.read()
+        with latency_stats.time('capture wait'):
+            frame = capture.read()
         
-        if not success:
+        if frame is None:
             print("EMPTY FRAME")
             continue
+        
+        # How old the frame is when it starts to be processed
+        latency_stats.record('frame age', time.perf_counter() - frame.timestamp)
+        
+        image = frame.image
 
         height, width, _ = image.shape
 
-        upper_left = (width // top_left_bound, height // top_left_bound)
-        bottom_right = (width * bottom_right_bound // top_left_bound, height * bottom_right_bound // top_left_bound)
-        if show:
-            cv2.rectangle(image, upper_left, bottom_right, (0, 255, 0), thickness=2)
+        # The tracking box only changes with the camera size, the mouse then compiles a new transform to the screen
+        if (width, height) != image_size:
+            image_size = (width, height)
+            upper_left = (width // top_left_bound, height // top_left_bound)
+            bottom_right = (width * bottom_right_bound // top_left_bound, height * bottom_right_bound // top_left_bound)
 
         # Process the image and check if there is a hand. Move the mouse according to the hand
         #image = processor.image_processor(image, camera_width, camera_height)
-        image = image_processor.process(image, upper_left, bottom_right)
+        start = time.perf_counter()
+        image = image_processor.process(image, upper_left, bottom_right, timestamp=frame.timestamp)
+        process_time = time.perf_counter() - start
+        latency_stats.record('process', process_time)
         
-        # Calculate and show the FPS
-        current_time = time.time()
-        fps = 1 / (current_time - previous_time)
-        previous_time = current_time
-        fps = str(int(fps))
+        if governor:
+            governor.record(process_time)
         
-        font = cv2.FONT_HERSHEY_SIMPLEX
-        if show:
-            cv2.putText(image, fps, (10, 70), font, 3, (100, 255, 0), 3, cv2.LINE_AA)
+        # How long it took from the start until the mouse moved
+        if not first_move_reported and image_processor.mouse_control.first_move_time is not None:
+            print(f"Time to first cursor move: {image_processor.mouse_control.first_move_time - START_TIME:.2f}s")
+            first_move_reported = True
         
-        # Show the image, and set 'q' to exit
+        # Draw the tracking box, hands, fingers and FPS on a copy of the image, only when the preview will show it. 'q' in the preview exits
         if show:
-            cv2.imshow('Image', image)
+            if preview.wants_frame():
+                overlay = image_processor.overlay
+                overlay.set_fps(latency_stats.fps())
+                if user.show_latency:
+                    for i, line in enumerate(latency_stats.lines()):
+                        overlay.add_text(line, (10, 100 + 20 * i))
+                
+                preview.show(overlay.render(image))
+                latency_stats.record('overlay', overlay.render_time)
             
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            if preview.quit:
                 break
+        
+        # Time of the whole loop, the FPS is from its median
+        current_time = time.perf_counter()
+        latency_stats.record('frame', current_time - previous_time)
+        previous_time = current_time
 
     # Release and destory 
-    cap.release()
+    capture.release()
+    if preview:
+        preview.release()
+    print("Frames:", capture.stats())
+    if governor:
+        print("Quality level:", governor.level, "changes:", len(governor.changes))
+    if user.flow_interval > 1 or governor:
+        print("Mediapipe frames:", hands.inference_frames, "Optical flow frames:", hands.flow_frames)
+    print("Latency(p50 / p95 / p99):")
+    for line in latency_stats.lines():
+        print(" -", line)
+    if user.latency_file:
+        latency_stats.dump(user.latency_file)
+        print("Saved the latencies to", user.latency_file)
     cv2.destroyAllWindows()
     image_processor.release()
+    if recorder:
+        recorder.close()
+        print(f"Recorded {recorder.written} frames to", user.record_file)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
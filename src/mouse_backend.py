@@ -0,0 +1,254 @@
+"""
+Mouse backends. A backend is what the Mouse() class uses to actually move the mouse and click.
+
+Every backend has the methods size(), monitors(), position(), on_screen(), move_to(), click(), mouse_down(), mouse_up() and scroll(). click(), mouse_down() and mouse_up() use the current mouse position when x and y are None, so no position has to be read first. monitors() returns a Monitor(x, y, width, height) for every monitor in the pixels of the virtual desktop.
+
+The PyAutoGUIBackend class uses pyautogui version 0.9.48 and is the default. pyautogui is only imported when the backend is created, so the other backends work on a machine without a display. pyautogui only knows the size of the main monitor, the other monitors are found with screeninfo if it is installed.
+
+The XTestBackend class sends the events straight to the X server with the XTest extension(libX11 and libXtst through ctypes), on Linux. It has a lot less overhead per call than pyautogui and works under Xvfb.
+
+The NullBackend class does nothing. It is used to run and benchmark everything without moving the real mouse.
+
+The RecordingBackend class does nothing either, but stores every event with a time.perf_counter() timestamp as a MouseEvent in events, so the mouse can be tested and benchmarked on a headless machine.
+
+The create_backend() function takes the name of a backend from BACKENDS and returns a new backend, this is how the User setting mouse_backend is used.
+"""
+
+import ctypes
+import ctypes.util
+import threading
+import time
+from collections import namedtuple
+
+MouseEvent = namedtuple('MouseEvent', ['timestamp', 'action', 'x', 'y', 'button', 'clicks'])
+Monitor = namedtuple('Monitor', ['x', 'y', 'width', 'height'])
+
+
+class PyAutoGUIBackend:
+    """Moves the mouse and clicks with pyautogui."""
+    def __init__(self) -> None:
+        import pyautogui
+
+        self.pyautogui = pyautogui
+
+        # pyautogui setup
+        pyautogui.PAUSE = 0
+        pyautogui.FAILSAFE = False
+
+    def size(self):
+        return self.pyautogui.size()
+
+    def monitors(self):
+        try:
+            import screeninfo
+        except ImportError:
+            return [Monitor(0, 0, *self.size())]
+
+        return [Monitor(monitor.x, monitor.y, monitor.width, monitor.height) for monitor in screeninfo.get_monitors()] or [Monitor(0, 0, *self.size())]
+
+    def position(self):
+        return self.pyautogui.position()
+
+    def on_screen(self, x, y):
+        return self.pyautogui.onScreen(x, y)
+
+    def move_to(self, x, y):
+        self.pyautogui.moveTo(x, y)
+
+    def click(self, x=None, y=None, button='left', clicks=1):
+        self.pyautogui.click(x, y, clicks=clicks, button=button)
+
+    def mouse_down(self, x=None, y=None, button='left'):
+        self.pyautogui.mouseDown(x, y, button=button)
+
+    def mouse_up(self, x=None, y=None, button='left'):
+        self.pyautogui.mouseUp(x, y, button=button)
+
+    def scroll(self, clicks):
+        self.pyautogui.scroll(clicks)
+
+
+class XTestBackend:
+    """Moves the mouse and clicks with the X11 XTest extension."""
+    BUTTONS = {'left': 1, 'middle': 2, 'right': 3}
+    SCROLL_UP = 4
+    SCROLL_DOWN = 5
+
+    def __init__(self, display=None) -> None:
+        x11_path = ctypes.util.find_library('X11')
+        xtst_path = ctypes.util.find_library('Xtst')
+        if not x11_path or not xtst_path:
+            raise RuntimeError("The xtest mouse backend needs libX11 and libXtst")
+
+        self.x11 = ctypes.cdll.LoadLibrary(x11_path)
+        self.xtst = ctypes.cdll.LoadLibrary(xtst_path)
+
+        self.x11.XOpenDisplay.restype = ctypes.c_void_p
+        self.x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        self.x11.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        self.x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        self.x11.XQueryPointer.argtypes = [ctypes.c_void_p, ctypes.c_ulong] + [ctypes.POINTER(ctypes.c_ulong)] * 2 + [ctypes.POINTER(ctypes.c_int)] * 4 + [ctypes.POINTER(ctypes.c_uint)]
+        self.x11.XFlush.argtypes = [ctypes.c_void_p]
+        self.x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self.xtst.XTestFakeMotionEvent.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+        self.xtst.XTestFakeButtonEvent.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_ulong]
+
+        self.display = self.x11.XOpenDisplay(display.encode() if display else None)
+        if not self.display:
+            raise RuntimeError("Could not open the X display, is DISPLAY set?")
+
+        self.screen = self.x11.XDefaultScreen(self.display)
+        self.root = self.x11.XDefaultRootWindow(self.display)
+        self.width = self.x11.XDisplayWidth(self.display, self.screen)
+        self.height = self.x11.XDisplayHeight(self.display, self.screen)
+
+        # Xlib is not thread safe, the actuator and the cursor thread can both use the backend
+        self.lock = threading.Lock()
+
+    def size(self):
+        return self.width, self.height
+
+    def monitors(self):
+        # The root window spans every monitor of the X screen
+        return [Monitor(0, 0, self.width, self.height)]
+
+    def position(self):
+        root, child = ctypes.c_ulong(), ctypes.c_ulong()
+        root_x, root_y, window_x, window_y = ctypes.c_int(), ctypes.c_int(), ctypes.c_int(), ctypes.c_int()
+        mask = ctypes.c_uint()
+
+        with self.lock:
+            self.x11.XQueryPointer(self.display, self.root, ctypes.byref(root), ctypes.byref(child), ctypes.byref(root_x), ctypes.byref(root_y), ctypes.byref(window_x), ctypes.byref(window_y), ctypes.byref(mask))
+
+        return root_x.value, root_y.value
+
+    def on_screen(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def move_to(self, x, y):
+        with self.lock:
+            self.xtst.XTestFakeMotionEvent(self.display, -1, int(x), int(y), 0)
+            self.x11.XFlush(self.display)
+
+    def press(self, button, clicks=1):
+        """Presses and releases an X button number clicks times."""
+        with self.lock:
+            for _ in range(clicks):
+                self.xtst.XTestFakeButtonEvent(self.display, button, True, 0)
+                self.xtst.XTestFakeButtonEvent(self.display, button, False, 0)
+            self.x11.XFlush(self.display)
+
+    def click(self, x=None, y=None, button='left', clicks=1):
+        if x is not None and y is not None:
+            self.move_to(x, y)
+        self.press(self.BUTTONS[button], clicks)
+
+    def mouse_down(self, x=None, y=None, button='left'):
+        if x is not None and y is not None:
+            self.move_to(x, y)
+        with self.lock:
+            self.xtst.XTestFakeButtonEvent(self.display, self.BUTTONS[button], True, 0)
+            self.x11.XFlush(self.display)
+
+    def mouse_up(self, x=None, y=None, button='left'):
+        if x is not None and y is not None:
+            self.move_to(x, y)
+        with self.lock:
+            self.xtst.XTestFakeButtonEvent(self.display, self.BUTTONS[button], False, 0)
+            self.x11.XFlush(self.display)
+
+    def scroll(self, clicks):
+        """Scrolls like pyautogui on Linux, one button 4(up) or 5(down) click per scroll click."""
+        self.press(self.SCROLL_UP if clicks > 0 else self.SCROLL_DOWN, abs(int(clicks)))
+
+    def close(self):
+        if self.display:
+            self.x11.XCloseDisplay(self.display)
+            self.display = None
+
+
+class NullBackend:
+    """Does nothing, but keeps track of the mouse position."""
+    def __init__(self, screen_width=1920, screen_height=1080) -> None:
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.x, self.y = 0, 0
+
+    def size(self):
+        return self.screen_width, self.screen_height
+
+    def monitors(self):
+        return [Monitor(0, 0, self.screen_width, self.screen_height)]
+
+    def position(self):
+        return self.x, self.y
+
+    def on_screen(self, x, y):
+        return 0 <= x < self.screen_width and 0 <= y < self.screen_height
+
+    def move_to(self, x, y):
+        self.x, self.y = x, y
+
+    def click(self, x=None, y=None, button='left', clicks=1):
+        pass
+
+    def mouse_down(self, x=None, y=None, button='left'):
+        pass
+
+    def mouse_up(self, x=None, y=None, button='left'):
+        pass
+
+    def scroll(self, clicks):
+        pass
+
+
+class RecordingBackend(NullBackend):
+    """Stores every mouse event with a timestamp instead of performing it."""
+    def __init__(self, screen_width=1920, screen_height=1080) -> None:
+        super().__init__(screen_width, screen_height)
+        self.events = []
+
+    def record(self, action, x=None, y=None, button=None, clicks=1):
+        # The event happens where the mouse is when no position is given
+        if x is None or y is None:
+            x, y = self.x, self.y
+        self.events.append(MouseEvent(time.perf_counter(), action, x, y, button, clicks))
+
+    def move_to(self, x, y):
+        super().move_to(x, y)
+        self.record('move', x, y)
+
+    def click(self, x=None, y=None, button='left', clicks=1):
+        self.record('click', x, y, button, clicks)
+
+    def mouse_down(self, x=None, y=None, button='left'):
+        self.record('down', x, y, button)
+
+    def mouse_up(self, x=None, y=None, button='left'):
+        self.record('up', x, y, button)
+
+    def scroll(self, clicks):
+        self.record('scroll', clicks=clicks)
+
+    def clear(self):
+        """Removes all recorded events."""
+        self.events = []
+
+
+BACKENDS = {
+    'pyautogui': PyAutoGUIBackend,
+    'xtest': XTestBackend,
+    'null': NullBackend,
+    'recording': RecordingBackend,
+}
+
+
+def create_backend(name):
+    """Returns a new backend from its name in BACKENDS."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown mouse backend {name!r}, choose from {', '.join(BACKENDS)}")
+
+    return BACKENDS[name]()
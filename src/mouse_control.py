@@ -1,18 +1,23 @@
 """
-The Mouse() class controls all mouse function with pyautogui version 0.9.48
+The Mouse() class controls all mouse function through a backend from mouse_backend.py, by default pyautogui version 0.9.48
 
-The Mouse() class takes optional arguments: movement_speed, scroll_speed, pause, and position. The argument movement_speed controls how fast the mouse moves. The argument scroll_speed controls how much the screen scrolls up and down. The argument pause controls how long the mouse pauses for after every click. The argument position controls where in your hand the mouse is attached to. A position can be a number from 1-20 representing a mediapipe landmark. 
+The Mouse() class takes optional arguments: scroll_speed, pause, position, backend, cursor, min_cutoff, beta, d_cutoff and dead_zone. The argument scroll_speed controls how much the screen scrolls up and down. The argument pause is how long the same click is ignored after it was performed. It is used as the cooldown of the Actuator, the click methods themselves never sleep. The argument position controls where in your hand the mouse is attached to. A position can be a number from 1-20 representing a mediapipe landmark. The argument backend is the mouse backend, None uses the PyAutoGUIBackend. The optional argument cursor is a Cursor, when it is given move_mouse() only sets the target of the cursor thread, which moves the mouse at the display rate. The arguments min_cutoff, beta, d_cutoff and dead_zone set the PointFilter(a 1€ filter) that smooths the mouse with the timestamps of the frames, see filters.py. The optional argument mapping is a ScreenMapping(see screen_mapping.py) that maps the hand to the screen with one affine transform, None maps the tracking box onto the monitors of the backend. set_tracking_size() only compiles the transform again when the tracking box changed. The monitors are read once from the backend, and clicks happen where the mouse currently is without reading its position first, so no call needs an extra round trip to the display. first_move_time is the time.perf_counter() the mouse was first really moved(by the cursor thread when there is one), used to report how long the program took to start. Before a click, a drag or a release the cursor is snapped to the hand, so they happen where the hand is and not where the mouse was extrapolated to.
 """
 
-import pyautogui
-import numpy as np
 import time
 
+from filters import PointFilter
+from mouse_backend import PyAutoGUIBackend
+from screen_mapping import ScreenMapping
+
+# Actions that press or release a button where the mouse is
+POINTER_ACTIONS = ("CLICK", "DOUBLE_CLICK", "RIGHT_CLICK", "MIDDLE_CLICK", "MOUSE_DOWN", "MOUSE_UP")
+
+
 class Mouse:
     """Controls all mouse function."""
-    def __init__(self, movement_speed=5, scroll_speed=20, pause=0.2, position=9) -> None:
+    def __init__(self, scroll_speed=20, pause=0.2, position=9, backend=None, cursor=None, min_cutoff=1.0, beta=0.01, d_cutoff=1.0, dead_zone=1.0, mapping=None) -> None:
         # Class variables
-        self.movement_speed = movement_speed
         self.up = scroll_speed
         self.down = scroll_speed * -1
         self.pause = pause
@@ -23,24 +28,47 @@ class Mouse:
         
         self.upper_left, self.bottom_right = None, None
         
-        # pyautogui setup
-        pyautogui.PAUSE = 0
-        pyautogui.FAILSAFE = False
+        # Moves the mouse and clicks
+        self.backend = backend if backend is not None else PyAutoGUIBackend()
+        
+        # Maps the hand in the tracking box to the screen
+        self.mapping = mapping if mapping is not None else ScreenMapping(self.backend.monitors())
+        
+        # Moves the mouse at the display rate between the camera frames
+        self.cursor = cursor
         
-        self.screen_width, self.screen_height = pyautogui.size()
+        # Smooths the mouse, less jitter when the hand is still and less lag when it moves fast
+        self.filter = PointFilter(min_cutoff=min_cutoff, beta=beta, d_cutoff=d_cutoff, dead_zone=dead_zone)
+        
+        # When the mouse was first moved without the cursor thread
+        self.direct_first_move_time = None
+        
+    @property
+    def first_move_time(self):
+        """The time.perf_counter() the mouse was first really moved, by the cursor thread when there is one."""
+        if self.cursor is not None:
+            return self.cursor.first_move_time
+        return self.direct_first_move_time
         
     def set_tracking_size(self, upper_left, bottom_right): 
-        """Sets the camera width and height"""
+        """Sets the tracking box, the transform to the screen is only compiled again when it changed"""
         self.upper_left = upper_left
         self.bottom_right = bottom_right
+        self.mapping.set_tracking_box(upper_left, bottom_right)
         
-    def perform_action(self, action, landmark):
-        """Check what the action is and then performs that action"""
+    def perform_action(self, action, landmark, timestamp=None):
+        """Check what the action is and then performs that action. timestamp is when the camera frame of the landmark was captured"""
         #print("Clicked: ", action, " At: ", int(self.cur_mouse_x), int(self.cur_mouse_y))
         
         if action == "MOVE":
-            self.move_mouse(landmark)
-        elif action == "CLICK":
+            self.move_mouse(landmark, timestamp)
+            return
+        
+        # The cursor thread may have extrapolated past the hand, the buttons are pressed where the hand is
+        if self.cursor is not None and action in POINTER_ACTIONS:
+            self.cursor.snap()
+        
+        if action == "CLICK":
             self.left_mouse_click()
         elif action == "RIGHT_CLICK":
             self.right_mouse_click()
@@ -57,57 +85,66 @@ class Mouse:
         elif action == "MOUSE_UP":
             self.mouse_up()
     
-    def move_mouse(self, landmark):
+    def move_mouse(self, landmark, timestamp=None):
         """Moves the moves based on the landmark and the specified postion"""
-        pos_1, pos_2 = landmark[self.position]
+        pos_1, pos_2 = landmark[self.position, :2].tolist()
 
-        relative_x_pos = np.interp(pos_1, (self.upper_left[0], self.bottom_right[0]), (0, self.screen_width))
-        relative_y_pos = np.interp(pos_2, (self.upper_left[1], self.bottom_right[1]), (0, self.screen_height))
-                            
-        self.current_mouse_x = self.previous_mouse_x + (relative_x_pos - self.previous_mouse_x) / self.movement_speed
-        self.current_mouse_y = self.previous_mouse_y + (relative_y_pos - self.previous_mouse_y) / self.movement_speed
-        
-        if pyautogui.onScreen(self.current_mouse_x, self.current_mouse_y):
-            pyautogui.moveTo(self.current_mouse_x, self.current_mouse_y)
-            self.previous_mouse_x, self.previous_mouse_y = self.current_mouse_x, self.current_mouse_y
+        relative_x_pos, relative_y_pos = self.mapping.map(pos_1, pos_2)
+        
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        
+        # Don't move the mouse if the smoothed position is in the dead zone. The cursor still gets the held position, so its velocity goes to 0 and it stops at the hand
+        self.current_mouse_x, self.current_mouse_y, moved = self.filter.filter(relative_x_pos, relative_y_pos, timestamp)
+        if not moved:
+            if self.cursor is not None and self.cursor.target is not None:
+                self.cursor.set_target(self.previous_mouse_x, self.previous_mouse_y, timestamp)
+            return
+        
+        # Between two monitors of different sizes the smoothed mouse can be off screen
+        self.current_mouse_x, self.current_mouse_y = self.mapping.clamp(self.current_mouse_x, self.current_mouse_y)
+        
+        if self.cursor is not None:
+            self.cursor.set_target(self.current_mouse_x, self.current_mouse_y, timestamp)
+        else:
+            self.backend.move_to(self.current_mouse_x, self.current_mouse_y)
+        self.previous_mouse_x, self.previous_mouse_y = self.current_mouse_x, self.current_mouse_y
+        
+        # With the cursor the mouse only moves once the cursor thread moved it
+        if self.direct_first_move_time is None and self.cursor is None:
+            self.direct_first_move_time = time.perf_counter()
     
     def left_mouse_click(self):
         """Left clicks with the mouse where the mouse is at that time"""
-        pyautogui.click(pyautogui.position())
-        time.sleep(self.pause)
+        self.backend.click()
 
     def right_mouse_click(self):
         """Right clicks where the mouse is currently"""
-        pyautogui.rightClick(pyautogui.position())
-        time.sleep(self.pause)
+        self.backend.click(button='right')
         
     def double_click(self):
         """Double clicks where the mouse is currently"""
-        pyautogui.doubleClick(pyautogui.position())
-        time.sleep(self.pause)
+        self.backend.click(clicks=2)
     
     def middle_click(self):
         """Middle clicks where the mouse is currently"""
-        pyautogui.middleClick(pyautogui.position())
-        time.sleep(self.pause)
+        self.backend.click(button='middle')
     
     def scroll_down(self):
         """Scrolls down the screen based on the speed specified"""
-        pyautogui.scroll(self.down)
+        self.backend.scroll(self.down)
         
     def scroll_up(self):
         """Scrolls up the screen based on the speed specified"""
-        pyautogui.scroll(self.up)
+        self.backend.scroll(self.up)
         
     def mouse_down(self):
         """Put the mouse down where it is currently, allows to drag"""
-        pyautogui.mouseDown(pyautogui.position())
-        time.sleep(self.pause)
+        self.backend.mouse_down()
     
     def mouse_up(self):
         """Put the mouse up where it is currently"""
-        pyautogui.mouseUp(pyautogui.position()) 
-        time.sleep(self.pause)
+        self.backend.mouse_up()
         
         
         
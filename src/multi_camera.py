@@ -0,0 +1,153 @@
+"""
+Tracks the hands with more than one camera and merges them into one hand_info, so a hand that one camera loses at the edge of its view is still tracked by another camera.
+
+The CameraTracker class detects the hands of one extra camera on its own thread. It takes the arguments: capture and hands. The argument capture is a started Capture of the camera and hands is its own Hands object. The optional transform argument is a 2x3 affine matrix that maps the landmarks of this camera(mirrored pixels, like hand_info) to the pixels of the main camera, for cameras that see the hands from a different place. None only scales the landmarks from the size of this camera to the size of the main camera. The optional warm_up_size(width, height) warms up the Hands of the camera on its thread before the first frame. The latest_hands() method returns the handedness, score and landmarks of the newest frame, if it is newer than max_age seconds.
+
+The FusedHands class has the same detect_and_track(), get_hands_info(), finger_angles(), landmarks and scores as the Hands class, so Processor uses it in place of Hands. It takes the arguments: primary, the Hands of the main camera, and trackers, a list of CameraTracker. detect_and_track() detects the hands in the image of the main camera, and then picks for the right and for the left hand the camera with the best handedness score. A hand only moves to a different camera when its score is better by switch_margin, so the mouse doesn't jump between two cameras that both see the hand. At most one right and one left hand are tracked.
+
+Every camera runs detect_and_track() on its own thread. With inference_worker turned on, every camera also has its own mediapipe process, so more cameras use more cores instead of lowering the frame rate.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+
+class CameraTracker:
+    """Detects the hands of one extra camera on its own thread."""
+    def __init__(self, capture, hands, transform=None, warm_up_size=None) -> None:
+        self.capture = capture
+        self.hands = hands
+        self.transform = None if transform is None else np.asarray(transform, dtype=np.float32)
+        self.warm_up_size = warm_up_size
+
+        # Newest hands of this camera, in the pixels of this camera
+        self.landmarks = np.zeros((2, 21, 3), dtype=np.float32)
+        self.handedness = []
+        self.scores = []
+        self.image_size = None
+        self.timestamp = 0
+        self.lock = threading.Lock()
+
+        self.frames = 0
+
+        self.running = True
+        self.thread = threading.Thread(target=self.update, name='camera tracker', daemon=True)
+        self.thread.start()
+
+    def update(self):
+        """Tracker loop. Detects the hands in every new frame of the camera."""
+        if self.warm_up_size:
+            self.hands.warm_up(*self.warm_up_size)
+        
+        while self.running and self.capture.isOpened():
+            frame = self.capture.read()
+            if frame is None: continue
+
+            self.hands.detect_and_track(frame.image, draw=False, find_relative_pos=True)
+            hand_info = self.hands.get_hands_info()
+
+            with self.lock:
+                count = len(hand_info)
+                self.landmarks[:count] = self.hands.landmarks[:count]
+                self.handedness = [handedness for handedness, _ in hand_info.values()]
+                self.scores = self.hands.scores[:count].tolist()
+                self.image_size = (frame.image.shape[1], frame.image.shape[0])
+                self.timestamp = frame.timestamp
+                self.frames += 1
+
+    def latest_hands(self, width, height, now, max_age):
+        """Returns a list of (handedness, score, landmarks) of the newest frame in the pixels of the main camera, or an empty list if the frame is too old."""
+        with self.lock:
+            if not self.handedness or now - self.timestamp > max_age: return []
+
+            landmarks = self.landmarks[:len(self.handedness)].copy()
+            handedness, scores, image_size = self.handedness, self.scores, self.image_size
+
+        if self.transform is not None:
+            points = landmarks[..., :2] @ self.transform[:, :2].T + self.transform[:, 2]
+            landmarks[..., :2] = points
+            landmarks[..., 2] *= np.sqrt(abs(np.linalg.det(self.transform[:, :2])))
+        else:
+            scale = width / image_size[0]
+            landmarks[..., 0] *= scale
+            landmarks[..., 1] *= height / image_size[1]
+            landmarks[..., 2] *= scale
+
+        return list(zip(handedness, scores, landmarks))
+
+    def release(self):
+        """Stops the tracker thread, the camera and its mediapipe model."""
+        self.running = False
+        self.capture.release()
+        self.thread.join(timeout=1.0)
+        self.hands.close()
+
+
+class FusedHands:
+    """Merges the hands of the main camera and of the extra cameras into one hand_info."""
+    def __init__(self, primary, trackers, max_age=0.1, switch_margin=0.05) -> None:
+        self.primary = primary
+        self.trackers = trackers
+        self.max_age = max_age
+        self.switch_margin = switch_margin
+
+        # Same as Hands, the landmarks of the right and left hand and views of them in hand_info
+        self.landmarks = np.zeros((2, 21, 3), dtype=np.float32)
+        self.scores = np.zeros(2, dtype=np.float32)
+        self.hand_info = {}
+
+        # Camera each hand came from last frame, 0 is the main camera
+        self.sources = {}
+
+    def detect_and_track(self, image, draw=True, find_relative_pos=True):
+        """Detects the hands in the image of the main camera and merges them with the newest hands of every other camera."""
+        image = self.primary.detect_and_track(image, draw=draw, find_relative_pos=True)
+        height, width = image.shape[:2]
+        now = time.perf_counter()
+
+        # Every view of every hand as (camera, handedness, score, landmarks)
+        views = [(0, handedness, score, landmark) for (handedness, landmark), score in zip(self.primary.get_hands_info().values(), self.primary.scores.tolist())]
+        for camera, tracker in enumerate(self.trackers, 1):
+            views.extend((camera, handedness, score, landmark) for handedness, score, landmark in tracker.latest_hands(width, height, now, self.max_age))
+
+        self.hand_info = {}
+        sources = {}
+        for handedness in ('Right', 'Left'):
+            hand_views = [view for view in views if view[1] == handedness]
+            if not hand_views: continue
+
+            # Keep the camera from the last frame unless another camera is clearly better
+            best = max(hand_views, key=lambda view: view[2] + (self.switch_margin if view[0] == self.sources.get(handedness) else 0))
+
+            hand_id = len(self.hand_info)
+            self.landmarks[hand_id] = best[3]
+            self.scores[hand_id] = best[2]
+            self.hand_info[hand_id] = [handedness, self.landmarks[hand_id]]
+            sources[handedness] = best[0]
+
+        self.sources = sources
+
+        return image
+
+    def get_hands_info(self):
+        """Returns all the information for both left and right hand"""
+        return self.hand_info
+
+    def finger_angles(self, joints, landmark, **kwargs):
+        """Returns the joint angles of the merged hands."""
+        if not self.hand_info: return
+
+        return self.primary.joint_angles(joints, landmark)
+
+    def reset(self):
+        self.hand_info = {}
+        self.sources = {}
+        self.primary.reset()
+
+    def close(self):
+        """Stops every extra camera and closes every mediapipe model."""
+        for tracker in self.trackers:
+            tracker.release()
+        self.primary.close()
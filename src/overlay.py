@@ -0,0 +1,126 @@
+"""
+The Overlay class collects everything that is drawn on the video and draws it in one pass after the hands were detected, so nothing that is drawn is ever given to mediapipe.
+
+Every frame, clear() is called and then the hands(add_hand()), which fingers are open or closed(add_fingers()), the tracking box(set_tracking_box()) and the FPS(set_fps()) are added. The render() method mirrors the frame into a preallocated buffer, which is the copy that is drawn on, and draws everything with a few batched cv2.polylines calls. All landmarks are mirrored, like the ones in Hands.hand_info.
+
+The styles(colors and thickness) are created once. The time the last render() took is in render_time, main.py records it in the LatencyStats as its own stage.
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+# The hand connections of mediapipe as polylines: thumb, index, middle, ring, pinky and the palm
+HAND_POLYLINES = (
+    (0, 1, 2, 3, 4),
+    (0, 5, 6, 7, 8),
+    (9, 10, 11, 12),
+    (13, 14, 15, 16),
+    (0, 17, 18, 19, 20),
+    (5, 9, 13, 17),
+)
+
+# Landmark and connection colors for each hand, right hand is pink and left hand is white
+HAND_STYLES = {
+    'Right': ((121, 22, 76), (250, 44, 250)),
+    'Left': ((0, 0, 255), (224, 224, 224)),
+}
+
+FINGER_OPEN_COLOR = (0, 255, 0)
+FINGER_CLOSED_COLOR = (0, 0, 255)
+TRACKING_BOX_COLOR = (0, 255, 0)
+FPS_COLOR = (100, 255, 0)
+
+
+class Overlay:
+    """Collects the drawings of a frame and draws them in one pass."""
+    def __init__(self, thickness=2, landmark_radius=2) -> None:
+        self.thickness = thickness
+        self.landmark_thickness = landmark_radius * 2 + 1
+        self.polylines = [np.array(polyline) for polyline in HAND_POLYLINES]
+
+        # The mirrored frame that is drawn on
+        self.buffer = None
+
+        # Time spent drawing
+        self.render_time = 0
+
+        self.clear()
+
+    def clear(self):
+        """Removes everything that was added for the last frame."""
+        self.hands = []
+        self.fingers = []
+        self.tracking_box = None
+        self.text = []
+
+    def add_hand(self, handedness, landmark):
+        """Adds the (21, 2 or 3) landmarks of a hand."""
+        self.hands.append((handedness, landmark))
+
+    def add_fingers(self, joints, landmark, finger_pos):
+        """Adds a line from the first to the second landmark of every joint, green if the finger is open and red if it is closed."""
+        self.fingers.append((joints, landmark, finger_pos))
+
+    def set_tracking_box(self, upper_left, bottom_right):
+        self.tracking_box = (upper_left, bottom_right)
+
+    def set_fps(self, fps):
+        self.add_text(str(int(fps)), (10, 70), scale=3, color=FPS_COLOR, thickness=3)
+
+    def add_text(self, text, position, scale=0.6, color=FPS_COLOR, thickness=1):
+        self.text.append((text, position, scale, color, thickness))
+
+    def render(self, image):
+        """Mirrors image into the buffer and draws everything on it. Returns the buffer."""
+        start = time.perf_counter()
+
+        if self.buffer is None or self.buffer.shape != image.shape:
+            self.buffer = np.empty_like(image)
+        cv2.flip(image, 1, dst=self.buffer)
+
+        if self.tracking_box:
+            cv2.rectangle(self.buffer, self.tracking_box[0], self.tracking_box[1], TRACKING_BOX_COLOR, thickness=self.thickness)
+
+        for handedness, landmark in self.hands:
+            self.draw_hand(handedness, landmark)
+
+        self.draw_fingers()
+
+        for text, position, scale, color, thickness in self.text:
+            cv2.putText(self.buffer, text, position, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness, cv2.LINE_AA)
+
+        self.render_time = time.perf_counter() - start
+
+        return self.buffer
+
+    def draw_hand(self, handedness, landmark):
+        """Draws the connections of a hand as polylines and the landmarks as dots, one cv2.polylines call each."""
+        landmark_color, connection_color = HAND_STYLES.get(handedness, HAND_STYLES['Left'])
+        points = landmark[:, :2].astype(np.int32)
+
+        cv2.polylines(self.buffer, [points[polyline] for polyline in self.polylines], False, connection_color, self.thickness, cv2.LINE_AA)
+
+        # A line from a point to itself is drawn as a round dot
+        dots = np.repeat(points[:, None, :], 2, axis=1)
+        cv2.polylines(self.buffer, dots, False, landmark_color, self.landmark_thickness, cv2.LINE_AA)
+
+    def draw_fingers(self):
+        """Draws the open and the closed fingers of every hand with one cv2.polylines call each."""
+        if not self.fingers: return
+
+        open_lines = []
+        closed_lines = []
+        for joints, landmark, finger_pos in self.fingers:
+            for joint, finger_open in zip(joints, finger_pos):
+                line = landmark[list(joint[:2]), :2]
+                if finger_open:
+                    open_lines.append(line)
+                else:
+                    closed_lines.append(line)
+
+        if open_lines:
+            cv2.polylines(self.buffer, np.array(open_lines, dtype=np.int32), False, FINGER_OPEN_COLOR, self.thickness)
+        if closed_lines:
+            cv2.polylines(self.buffer, np.array(closed_lines, dtype=np.int32), False, FINGER_CLOSED_COLOR, self.thickness)
@@ -0,0 +1,124 @@
+"""
+The Preview class shows the video on its own thread, so cv2.imshow() and cv2.waitKey() never slow down the detection or the mouse.
+
+The Preview class takes optional arguments: fps, scale, window_name and threaded. The argument fps caps how often the window is refreshed. The argument scale resizes the shown image, 0.5 shows it at half the size. The optional latency_stats argument is a LatencyStats, how long cv2.imshow() takes is recorded as the stage 'imshow'.
+
+The wants_frame() method returns True when it is time to show a new frame, so the caller only has to draw a frame when it will actually be shown. The show() method copies(and resizes) the image into one of 3 preallocated buffers and returns right away, the preview thread always shows the newest one. The preview thread keeps calling cv2.waitKey() and sets quit to True when 'q' is pressed.
+
+OpenCV windows have to be created on the main thread on macOS, so threaded is False there by default: show() then calls cv2.imshow() and cv2.waitKey() itself, on the thread that calls it, and the window is still only refreshed at fps. The preview thread is used on Linux and Windows.
+"""
+
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class Preview:
+    """Shows the newest frame on a separate thread at a capped rate."""
+    def __init__(self, fps=30, scale=1.0, window_name='Image', latency_stats=None, threaded=sys.platform != 'darwin') -> None:
+        self.interval = 1 / fps if fps else 0
+        self.scale = scale
+        self.window_name = window_name
+        self.latency_stats = latency_stats
+
+        # Pool of buffers, one being written by show(), one in the slot and one being shown
+        self.buffers = [None, None, None]
+        self.slot_buffer = None
+        self.shown_buffer = None
+        self.new_frame = threading.Event()
+        self.lock = threading.Lock()
+
+        self.next_time = 0
+        self.shown = 0
+        self.quit = False
+
+        # On macOS the window is shown on the thread that calls show()
+        self.running = True
+        self.thread = None
+        if threaded:
+            self.thread = threading.Thread(target=self.update, name='preview', daemon=True)
+            self.thread.start()
+
+    def wants_frame(self):
+        """Returns True if a new frame would be shown."""
+        return time.perf_counter() >= self.next_time
+
+    def show(self, image):
+        """Copies the image into a free buffer for the preview thread. Never blocks on the window."""
+        self.next_time = time.perf_counter() + self.interval
+
+        if self.thread is None:
+            self.display(self.resize(image, 0) if self.scale != 1 else image)
+            self.check_quit()
+            return
+
+        with self.lock:
+            free = next(i for i in range(len(self.buffers)) if i != self.slot_buffer and i != self.shown_buffer)
+
+        self.resize(image, free)
+
+        with self.lock:
+            self.slot_buffer = free
+            self.new_frame.set()
+
+    def resize(self, image, index):
+        """Copies(and resizes) the image into the buffer at index and returns the buffer."""
+        height, width = image.shape[:2]
+        if self.scale != 1:
+            height, width = round(height * self.scale), round(width * self.scale)
+
+        buffer = self.buffers[index]
+        if buffer is None or buffer.shape[:2] != (height, width):
+            buffer = np.empty((height, width) + image.shape[2:], dtype=image.dtype)
+            self.buffers[index] = buffer
+
+        if self.scale != 1:
+            cv2.resize(image, (width, height), dst=buffer, interpolation=cv2.INTER_AREA)
+        else:
+            np.copyto(buffer, image)
+
+        return buffer
+
+    def display(self, image):
+        """Shows the image in the window."""
+        start = time.perf_counter()
+        cv2.imshow(self.window_name, image)
+        self.shown += 1
+
+        if self.latency_stats is not None:
+            self.latency_stats.record('imshow', time.perf_counter() - start)
+
+    def check_quit(self):
+        """Lets the window redraw and sets quit if 'q' was pressed."""
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            self.quit = True
+
+    def update(self):
+        """Preview loop. Shows the newest frame and checks if 'q' was pressed."""
+        while self.running:
+            # Wait a short time for a new frame. waitKey also lets the window redraw, so it is called even without a new frame
+            image = None
+            if self.new_frame.wait(timeout=0.01):
+                with self.lock:
+                    self.shown_buffer = self.slot_buffer
+                    self.new_frame.clear()
+                    image = self.buffers[self.shown_buffer]
+
+            if image is not None:
+                self.display(image)
+
+            self.check_quit()
+
+        cv2.destroyWindow(self.window_name)
+
+    def release(self):
+        """Stops the preview thread and closes the window."""
+        self.running = False
+        if self.thread is None:
+            cv2.destroyWindow(self.window_name)
+            return
+
+        self.thread.join(timeout=1.0)
@@ -0,0 +1,155 @@
+"""
+Replays a recording of session_recorder.py through the gestures of Processor and the mouse of Mouse, without a camera or mediapipe, to reproduce a gesture misfire and to check if different settings fix it.
+
+The recorded landmarks of every frame are given to a Processor through ReplayHands, which has the same detect_and_track(), get_hands_info(), finger_angles(), landmarks and scores as Hands. The settings of the recorded session are used, or the settings of a config file with --config. Every frame where the replayed action of a hand differs from the recorded action is counted, and the first --show-changes of them are printed with their time in the session.
+
+The records are read from a memory map, so a recording of hours is never loaded into memory. By default the frames are replayed at the recorded speed, --speed 2 replays twice as fast and --fast as fast as possible. The click cooldown runs on the recorded timestamps, every move goes straight to the mouse backend without the cursor thread and every action is performed before the next frame, so the mouse events are the same at every speed. --start and --end replay only a part of the session, in seconds from its start. The mouse backend is 'recording'(the mouse events are only counted) unless --backend is given, 'pyautogui' or 'xtest' move the real mouse.
+
+Example: python replay.py session.rec --config new_settings.json --fast
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from config import load_config, user_from_settings
+from hands import Hands
+from image_processor import Processor
+from mouse_backend import create_backend
+from session_recorder import HANDEDNESS, action_names, open_recording
+from user_setting import User
+
+
+class ReplayHands:
+    """Gives the recorded hands of a frame to Processor in place of Hands."""
+    # The angles are computed the same way as Hands
+    get_joint_index = Hands.get_joint_index
+    joint_angles = Hands.joint_angles
+
+    def __init__(self) -> None:
+        self.landmarks = np.zeros((2, 21, 3), dtype=np.float32)
+        self.scores = np.zeros(2, dtype=np.float32)
+        self.hand_info = {}
+        self.joint_index = {}
+
+    def load(self, record):
+        """Sets the hands of a record as the hands of this frame."""
+        self.hand_info = {}
+        for hand_id in range(record['hands']):
+            self.landmarks[hand_id] = record['landmarks'][hand_id]
+            self.scores[hand_id] = record['scores'][hand_id]
+            self.hand_info[hand_id] = [HANDEDNESS[record['handedness'][hand_id]], self.landmarks[hand_id]]
+
+    def detect_and_track(self, image, draw=True, find_relative_pos=True):
+        return image
+
+    def get_hands_info(self):
+        """Returns all the information for both left and right hand"""
+        return self.hand_info
+
+    def finger_angles(self, joints, landmark, **kwargs):
+        if not self.hand_info: return
+
+        return self.joint_angles(joints, landmark)
+
+    def reset(self):
+        self.hand_info = {}
+
+    def close(self):
+        pass
+
+
+def replay(records, actions, processor, hands, speed=1.0, show_changes=20, chunk=4096):
+    """Replays the records through the processor. Returns the number of frames and of frames with a different action."""
+    frames = 0
+    changes = 0
+    start_time = time.perf_counter()
+    first_timestamp = float(records['timestamp'][0]) if len(records) else 0
+
+    for start in range(0, len(records), chunk):
+        # Only a chunk of the memory map is read at a time
+        for record in np.array(records[start:start + chunk]):
+            timestamp = float(record['timestamp'])
+            if speed:
+                delay = start_time + (timestamp - first_timestamp) / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            hands.load(record)
+            width, height = int(record['width']), int(record['height'])
+
+            # The recorded timestamps are from the clock of the recorded session, the cursor thread needs them on this clock
+            processor.process(None, (width // 5, height // 5), (width * 4 // 5, height * 4 // 5), timestamp=start_time + timestamp - first_timestamp)
+            if processor.actuator is not None:
+                # Every action is performed before the next frame, so no move is coalesced at any speed
+                processor.actuator.wait()
+            frames += 1
+
+            for hand_id in range(record['hands']):
+                handedness = HANDEDNESS[record['handedness'][hand_id]]
+                recorded = actions[record['actions'][hand_id]]
+                replayed = processor.right_action if handedness == 'Right' else processor.left_action
+                if recorded == replayed: continue
+
+                changes += 1
+                if changes <= show_changes:
+                    print(f"{timestamp - first_timestamp:9.3f}s {handedness:<5} recorded {recorded}, replayed {replayed}")
+
+    return frames, changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replays a hand recording through the gestures and the mouse")
+    parser.add_argument('recording', help="file recorded with the record_file setting")
+    parser.add_argument('--config', default=None, help="JSON config file with the settings to replay with, default the recorded settings")
+    parser.add_argument('--backend', default='recording', help="mouse backend: recording, null, pyautogui or xtest")
+    parser.add_argument('--speed', type=float, default=1.0, help="replay speed, 1 is the recorded speed")
+    parser.add_argument('--fast', action='store_true', help="replay as fast as possible")
+    parser.add_argument('--start', type=float, default=None, help="seconds from the start of the session to replay from")
+    parser.add_argument('--end', type=float, default=None, help="seconds from the start of the session to replay until")
+    parser.add_argument('--show-changes', type=int, default=20, help="number of changed actions to print")
+    args = parser.parse_args()
+
+    header, records = open_recording(args.recording)
+    if len(records) == 0:
+        print(args.recording, "has no frames")
+        return
+
+    # Only the part of the session between start and end, found without reading all the records
+    timestamps = records['timestamp']
+    first_timestamp = float(timestamps[0])
+    start = 0 if args.start is None else int(np.searchsorted(timestamps, first_timestamp + args.start))
+    end = len(records) if args.end is None else int(np.searchsorted(timestamps, first_timestamp + args.end))
+    records = records[start:end]
+
+    if args.config:
+        user = load_config(args.config)
+    elif header.get('settings'):
+        user = user_from_settings(header['settings'], args.recording)
+    else:
+        user = User()
+    user.show = False
+
+    # Every move goes straight to the backend, the cursor thread moves the mouse on the real clock and would give a different number of moves at every speed
+    user.cursor_rate = 0
+
+    hands = ReplayHands()
+    backend = create_backend(args.backend)
+    processor = Processor(user, detection_confidence=user.detection_confidence, mouse_backend=backend, hands=hands)
+
+    started = time.perf_counter()
+    frames, changes = replay(records, action_names(header), processor, hands, speed=0 if args.fast else args.speed, show_changes=args.show_changes)
+    seconds = time.perf_counter() - started
+    processor.release()
+
+    print(f"\nReplayed {frames} frames in {seconds:.1f}s, {changes} hand actions differ from the recording")
+    if hasattr(backend, 'events'):
+        counts = {}
+        for event in backend.events:
+            counts[event.action] = counts.get(event.action, 0) + 1
+        print("Mouse events:", ', '.join(f"{action} {count}" for action, count in counts.items()) or 'none')
+
+
+if __name__ == '__main__':
+    main()
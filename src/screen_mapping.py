@@ -0,0 +1,118 @@
+"""
+Maps the position of the hand in the camera image to the mouse position on the screen with one affine transform, which is only compiled when the tracking box, the calibration or the monitors change.
+
+The ScreenMapping class takes the argument monitors and optionally monitor and calibration. The argument monitors is a list of Monitor(x, y, width, height) of every monitor in the pixels of the virtual desktop, like the monitors() of a mouse backend. The argument monitor is the index of the monitor the hand moves the mouse on, None uses the bounding box of all monitors. The argument calibration is a 2x3 affine matrix that maps the position of the hand in the tracking box(0 - 1 from the top left to the bottom right corner) to the position on the monitors(0 - 1), made by calibrate.py. None maps the tracking box straight onto the monitors.
+
+The set_tracking_box() method takes the upper_left and bottom_right corners of the tracking box in pixels, and set_monitors() takes new monitors and a monitor. Both only compile the transform again when something changed. The transform is the product of three matrices: the tracking box to 0 - 1, the calibration, and 0 - 1 to the pixels of the monitors.
+
+The map() method takes the x and y of the hand in pixels and returns the x and y on the screen, kept inside the monitors like np.interp did before. It is 4 multiplications and 4 additions. The clamp() method moves a point that is not on any monitor to the closest monitor, for desktops with monitors of different sizes.
+
+The fit_calibration() function takes the positions of the hand in the tracking box(0 - 1) and the positions on the monitors(0 - 1) they should map to, at least 3 points, and returns the least squares 2x3 calibration matrix.
+"""
+
+import numpy as np
+
+from mouse_backend import Monitor
+
+# Same as no calibration
+IDENTITY = ((1.0, 0.0, 0.0), (0.0, 1.0, 0.0))
+
+
+def fit_calibration(hand_points, screen_points):
+    """Returns the 2x3 affine matrix that maps hand_points to screen_points with the smallest squared error."""
+    hand_points = np.asarray(hand_points, dtype=np.float64)
+    screen_points = np.asarray(screen_points, dtype=np.float64)
+    if len(hand_points) < 3 or len(hand_points) != len(screen_points):
+        raise ValueError("The calibration needs at least 3 hand points and a screen point for every hand point")
+
+    source = np.column_stack((hand_points, np.ones(len(hand_points))))
+    matrix, _, rank, _ = np.linalg.lstsq(source, screen_points, rcond=None)
+    if rank < 3:
+        raise ValueError("The calibration points are on one line, hold the hand at the corners")
+
+    return matrix.T
+
+
+class ScreenMapping:
+    """Affine transform from the tracking box in the camera image to the screen."""
+    def __init__(self, monitors, monitor=None, calibration=None) -> None:
+        self.calibration = np.vstack((np.asarray(calibration if calibration is not None else IDENTITY, dtype=np.float64), (0, 0, 1)))
+
+        self.tracking_box = None
+        self.monitors = None
+        self.monitor = None
+        self.set_monitors(monitors, monitor)
+
+    def set_monitors(self, monitors, monitor=None):
+        """Sets the monitors and which monitor is used, None for all of them."""
+        monitors = [Monitor(*screen) for screen in monitors]
+        if monitor is not None and not 0 <= monitor < len(monitors):
+            raise ValueError(f"There is no monitor {monitor}, there are {len(monitors)} monitors")
+        if (monitors, monitor) == (self.monitors, self.monitor): return
+
+        self.monitors = monitors
+        self.monitor = monitor
+
+        # The area the hand moves the mouse on, and the monitors the mouse is kept on
+        screens = monitors if monitor is None else [monitors[monitor]]
+        self.left = min(screen.x for screen in screens)
+        self.top = min(screen.y for screen in screens)
+        self.right = max(screen.x + screen.width for screen in screens)
+        self.bottom = max(screen.y + screen.height for screen in screens)
+        self.screens = [(screen.x, screen.y, screen.x + screen.width - 1, screen.y + screen.height - 1) for screen in screens]
+
+        self.compile()
+
+    def set_tracking_box(self, upper_left, bottom_right):
+        """Sets the tracking box in pixels of the camera image."""
+        tracking_box = (tuple(upper_left), tuple(bottom_right))
+        if tracking_box == self.tracking_box: return
+
+        self.tracking_box = tracking_box
+        self.compile()
+
+    def box_matrix(self):
+        """Returns the 3x3 matrix from pixels to the position in the tracking box(0 - 1)."""
+        (x0, y0), (x1, y1) = self.tracking_box
+        return np.array([
+            [1 / (x1 - x0), 0, -x0 / (x1 - x0)],
+            [0, 1 / (y1 - y0), -y0 / (y1 - y0)],
+            [0, 0, 1],
+        ])
+
+    def compile(self):
+        """Multiplies the tracking box, the calibration and the monitors into one transform."""
+        if self.tracking_box is None: return
+
+        screen = np.array([
+            [self.right - self.left, 0, self.left],
+            [0, self.bottom - self.top, self.top],
+            [0, 0, 1],
+        ], dtype=np.float64)
+
+        self.matrix = (screen @ self.calibration @ self.box_matrix())[:2]
+
+        # As floats, one point is faster without numpy
+        (self.a, self.b, self.c), (self.d, self.e, self.f) = self.matrix.tolist()
+
+    def map(self, x, y):
+        """Returns the screen position of the pixel x, y of the camera image."""
+        screen_x = self.a * x + self.b * y + self.c
+        screen_y = self.d * x + self.e * y + self.f
+
+        return min(max(screen_x, self.left), self.right - 1), min(max(screen_y, self.top), self.bottom - 1)
+
+    def clamp(self, x, y):
+        """Returns the point, or the closest point on a monitor if it is not on any monitor."""
+        best = None
+        for left, top, right, bottom in self.screens:
+            clamped_x = min(max(x, left), right)
+            clamped_y = min(max(y, top), bottom)
+            if clamped_x == x and clamped_y == y:
+                return x, y
+
+            distance = (clamped_x - x) ** 2 + (clamped_y - y) ** 2
+            if best is None or distance < best[0]:
+                best = (distance, clamped_x, clamped_y)
+
+        return best[1], best[2]
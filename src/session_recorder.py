@@ -0,0 +1,184 @@
+"""
+Records the hands of every frame to a binary file, so a session with a gesture misfire can be replayed later with replay.py without a camera or mediapipe.
+
+A recording starts with a header: the 8 bytes MAGIC, the length of the header JSON as a 4 byte little endian integer, and the header JSON, which has the version, the names of the actions and the user settings of the session(see config.py). After the header every frame is one fixed size RECORD with the timestamp, the image size, the number of hands, and for up to 2 hands the handedness, the handedness score, the action performed that frame and the 21 landmarks in pixels. A frame without hands is recorded too, so the replay sees when a hand was lost. A 30 FPS session takes about 57MB per hour.
+
+The SessionRecorder class takes the argument path and optionally settings, capacity and flush_interval. The argument settings is a dict of the user settings that is stored in the header. The record() method copies a frame into a preallocated ring of capacity records and never waits for the disk. A writer thread appends the new records to the file every flush_interval seconds, or sooner when the ring is half full. If the disk is so slow that the ring is full, the frame is not recorded and counted in dropped. The close() method writes the remaining records and closes the file.
+
+The open_recording() function takes the path of a recording and returns the header and a read only np.memmap of the records, so a recording of hours is never loaded into memory. The records of a session that crashed are still read, an incomplete last record is ignored.
+
+The mouse_trace() function returns the t, x, y of the mouse point of every frame a hand performed MOVE, mapped to the screen with the recorded screen_calibration like Mouse does, so filter_tuning.py can tune the smoothing on a recording.
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+
+from screen_mapping import IDENTITY
+from user_setting import MOUSE_ACTIONS
+
+MAGIC = b'HANDREC1'
+VERSION = 1
+
+# Handedness codes, 0 is no hand
+HANDEDNESS = ('', 'Right', 'Left')
+
+RECORD = np.dtype([
+    ('timestamp', '<f8'),
+    ('width', '<u2'),
+    ('height', '<u2'),
+    ('hands', 'u1'),
+    ('handedness', 'u1', (2,)),
+    # 0 is no action, otherwise the index in the actions of the header + 1
+    ('actions', 'u1', (2,)),
+    ('scores', '<f4', (2,)),
+    ('landmarks', '<f4', (2, 21, 3)),
+])
+
+
+class SessionRecorder:
+    """Appends the hands of every frame to a recording on a writer thread."""
+    def __init__(self, path, settings=None, capacity=4096, flush_interval=0.5) -> None:
+        self.path = path
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+
+        self.actions = list(MOUSE_ACTIONS)
+        self.action_codes = {action: code for code, action in enumerate(self.actions, 1)}
+
+        self.file = open(path, 'wb')
+        header = json.dumps({'version': VERSION, 'actions': self.actions, 'settings': settings}).encode()
+        self.file.write(MAGIC + len(header).to_bytes(4, 'little') + header)
+
+        # Ring of records, count were recorded and written of them were written to the file
+        self.records = np.zeros(capacity, dtype=RECORD)
+        self.count = 0
+        self.written = 0
+        self.dropped = 0
+        self.condition = threading.Condition()
+
+        self.running = True
+        self.thread = threading.Thread(target=self.update, name='session recorder', daemon=True)
+        self.thread.start()
+
+    def record(self, timestamp, width, height, handedness, scores, landmarks, actions):
+        """Copies one frame into the ring. handedness, scores, landmarks and actions have one entry per hand."""
+        with self.condition:
+            if self.count - self.written >= self.capacity:
+                self.dropped += 1
+                return
+
+            record = self.records[self.count % self.capacity]
+            hands = min(len(handedness), 2)
+            record['timestamp'] = timestamp
+            record['width'] = width
+            record['height'] = height
+            record['hands'] = hands
+            record['handedness'] = 0
+            record['actions'] = 0
+            for hand_id in range(hands):
+                record['handedness'][hand_id] = HANDEDNESS.index(handedness[hand_id])
+                record['actions'][hand_id] = self.action_codes.get(actions[hand_id], 0)
+            record['scores'][:hands] = scores[:hands]
+            record['landmarks'][:hands] = landmarks[:hands]
+
+            self.count += 1
+            if self.count - self.written >= self.capacity // 2:
+                self.condition.notify()
+
+    def update(self):
+        """Writer loop. Appends the new records to the file."""
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: not self.running or self.count - self.written >= self.capacity // 2, self.flush_interval)
+                start, end = self.written, self.count
+                running = self.running
+
+            # The records between written and count are not overwritten until written moves
+            if end > start:
+                self.file.write(self.records[np.arange(start, end) % self.capacity].tobytes())
+                self.file.flush()
+
+                with self.condition:
+                    self.written = end
+
+            if not running:
+                break
+
+    def close(self):
+        """Writes the remaining records and closes the file."""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.thread.join()
+
+        # Records that came in while the writer stopped
+        with self.condition:
+            if self.count > self.written:
+                self.file.write(self.records[np.arange(self.written, self.count) % self.capacity].tobytes())
+                self.written = self.count
+
+        self.file.close()
+        if self.dropped:
+            print(f"The recorder dropped {self.dropped} frames, the disk was too slow")
+
+
+def open_recording(path):
+    """Returns the header and a read only np.memmap of the records of a recording."""
+    with open(path, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a hand recording")
+
+        length = int.from_bytes(file.read(4), 'little')
+        header = json.loads(file.read(length))
+
+    offset = len(MAGIC) + 4 + length
+    count = (os.path.getsize(path) - offset) // RECORD.itemsize
+    if count == 0:
+        return header, np.zeros(0, dtype=RECORD)
+
+    return header, np.memmap(path, dtype=RECORD, mode='r', offset=offset, shape=(count,))
+
+
+def action_names(header):
+    """Returns the action of every action code of a recording, None for 0."""
+    return [None] + header['actions']
+
+
+def mouse_trace(path, position=None, screen_size=(1920, 1080), chunk=65536):
+    """Returns the t, x and y(screen pixels) of the mouse point of every frame a hand performed MOVE, as an array of shape (N, 3). position None uses the recorded mouse_point setting."""
+    header, records = open_recording(path)
+    move = action_names(header).index('MOVE')
+    settings = header.get('settings') or {}
+    if position is None:
+        position = settings.get('mouse_point', 9)
+
+    # The recorded calibration from the tracking box to the screen
+    calibration = np.asarray(settings.get('screen_calibration') or IDENTITY, dtype=np.float64)
+
+    traces = []
+    for start in range(0, len(records), chunk):
+        records_chunk = records[start:start + chunk]
+
+        # The first hand that moved the mouse in every frame
+        moving = records_chunk['actions'] == move
+        frames = np.flatnonzero(moving.any(axis=1))
+        hand_ids = moving[frames].argmax(axis=1)
+        points = np.asarray(records_chunk['landmarks'][frames, hand_ids, position, :2], dtype=np.float64)
+
+        # Same tracking box as main.py, the middle 3/5 of the image, then calibrated and stretched to the screen like ScreenMapping
+        width = records_chunk['width'][frames].astype(np.float64)
+        height = records_chunk['height'][frames].astype(np.float64)
+        box = np.column_stack(((points[:, 0] - width / 5) / (width * 3 / 5), (points[:, 1] - height / 5) / (height * 3 / 5)))
+        screen = np.clip(box @ calibration[:, :2].T + calibration[:, 2], 0, 1)
+        x = screen[:, 0] * screen_size[0]
+        y = screen[:, 1] * screen_size[1]
+
+        traces.append(np.column_stack((records_chunk['timestamp'][frames], x, y)))
+
+    if not traces:
+        return np.zeros((0, 3))
+
+    return np.concatenate(traces)
@@ -23,19 +23,89 @@ scroll_speed = 20
 right_angle = 100
 left_angle = 100
 
+# An open finger is only closed again when its angle goes below this angle, so a finger near the open angle doesn't flicker between open and closed
+right_close_angle = 80
+left_close_angle = 80
+
+# A new hand position has to be seen for this many frames in a row and for at least this long(in seconds) before its action is performed. A click is performed once, only MOVE and SCROLL repeat while the hand is kept in the same position
+confirm_frames = 2
+confirm_time = 0.0
+
+# The webcam index, or a video file, a directory of images or 'synthetic' to run without a webcam
+camera = 0
+
 # This set the width and height of the camera
 cap_width = 1280
 cap_height = 720
 
-# Controls how fast the mouse moves compared to the hand
-movement_speed = 4
+# The format, frame rate and driver buffer(in frames) asked from the webcam, None keeps the default of the webcam. MJPG gets 720p at 30 FPS from most webcams, the default YUYV is uncompressed and often slower. A buffer of 1 frame means no frame waits in the driver. The format that is actually used is printed at the start
+cap_fourcc = 'MJPG'
+cap_fps = 30
+cap_buffer_size = 1
+
+# This sets the width and height of the image mediapipe detects the hands in. The camera image is downscaled to this size before the detection, the landmarks are still relative to the camera size. None uses the camera size
+inference_width = 640
+inference_height = 360
+
+# Only detects the hands in a padded box around the hands from the previous frame, the full image is searched again when the hands are lost
+roi_tracking = False
+
+# Only runs mediapipe every flow_interval frames, the hands are moved with the optical flow in between. 1 runs mediapipe on every frame. Higher uses a lot less CPU, mediapipe still runs when the flow loses the hand
+flow_interval = 1
+
+# Indexes of more webcams that track the hands at the same time, for example [1]. For every hand the camera that is most sure about it is used. Turn on inference_worker, so every camera uses its own core
+extra_cameras = []
+
+# For every extra camera, None or a 2x3 affine matrix that maps its pixels to the pixels of the first camera. None only scales between the camera sizes
+extra_camera_transforms = []
+
+# Runs mediapipe in a separate process, so the detection, the capture and the mouse run on different cores. The process is restarted if it crashes
+inference_worker = False
 
-# Controls how long to pause after a left/right click
+# Changes the camera size, frame rate, inference size, mediapipe model and flow_interval while running, so a frame takes less than latency_target seconds. Every change is printed. It starts with the settings above and only changes them once the frames are too slow or fast enough for a higher quality
+quality_governor = False
+latency_target = 0.025
+
+# Controls how the mouse is smoothed with a 1€ filter, which uses the time between frames so it is the same at any FPS. min_cutoff(Hz): lower is less jitter when the hand is still. beta: higher is less lag when the hand moves fast. d_cutoff(Hz): smoothing of the hand speed
+# Run filter_tuning.py to score different values on a recorded trace
+min_cutoff = 1.0
+beta = 0.01
+d_cutoff = 1.0
+
+# The mouse doesn't move if it would move less than dead_zone pixels, so it doesn't jitter when the hand is still
+dead_zone = 1.0
+
+# What moves the mouse and clicks: 'pyautogui', 'xtest'(Linux X11, less overhead than pyautogui), 'recording'(only records the events) or 'null'(does nothing)
+mouse_backend = 'pyautogui'
+
+# Which monitor the hand moves the mouse on, None for all monitors as one desktop. monitors is a list of [x, y, width, height] of every monitor, None asks the mouse backend(install screeninfo to find every monitor with pyautogui)
+monitor = None
+monitors = None
+
+# A 2x3 matrix from calibrate.py that maps where your hand is in the tracking box to the screen, None maps the tracking box straight onto the screen
+screen_calibration = None
+
+# How many times per second the mouse is moved, independent of the camera FPS. Between camera frames the mouse keeps moving with the hand's velocity for at most max_extrapolation seconds. 0 moves the mouse once per camera frame
+cursor_rate = 120
+max_extrapolation = 0.05
+
+# How long(in seconds) the same click is ignored after it was performed. The hand keeps being tracked during the cooldown
 pause = 0.3
 
 # Shows the video with drawings.
 show = True
 
+# How many times per second the video is refreshed, and the size of the video compared to the camera. The video is shown on its own thread so it never slows down the mouse
+preview_fps = 30
+preview_scale = 1.0
+
+# Shows the p50 / p95 / p99 latency of every stage on the video, and the file the latencies are saved to when the program exits(None to not save them)
+show_latency = False
+latency_file = 'latency.json'
+
+# Records the landmarks and actions of every frame to this file(None to not record), so a session can be replayed with replay.py. The file is written on a separate thread
+record_file = None
+
 # Sets the detection_confidence which goes from 0-1
 detection_confidence = 0.8
 
@@ -73,6 +143,7 @@ IMRP = ((8, 6, 0), (12, 10, 0), (16, 14, 0), (20, 18, 0))
 #   - 0 means that finger is closed and 1 mean that finger is open
 #   - (1,1,1,1) -> Represent Index, Middle, Ring, Pinky(IMRP) fingers are open
 # The values of the second dictionary is an mouse actions from the MOUSE_ACTIONS list
+# A hand can have more than one key(finger set), all of them are checked every frame. Two finger sets can't give different actions for the same fingers, the Processor raises a ValueError when it starts if they do
 right_default_positions = {
     IMRP: {
         (1,1,1,1): "MOVE",
@@ -97,7 +168,7 @@ pp = pprint.PrettyPrinter()
 
 #! TODO: REFACTOR THIS ENTIRE CLASS
 class User:
-    def __init__(self, right_positions=right_default_positions, left_positions=left_default_positions, mouse_point=mouse_point, scroll_speed=scroll_speed, right_angle=right_angle, left_angle=left_angle, cap_width=cap_width, cap_height=cap_height, movement_speed=movement_speed, show = show, pause=pause, detection_confidence=detection_confidence, tracking_confidence=tracking_confidence) -> None:
+    def __init__(self, right_positions=right_default_positions, left_positions=left_default_positions, mouse_point=mouse_point, scroll_speed=scroll_speed, right_angle=right_angle, left_angle=left_angle, right_close_angle=right_close_angle, left_close_angle=left_close_angle, confirm_frames=confirm_frames, confirm_time=confirm_time, camera=camera, cap_width=cap_width, cap_height=cap_height, cap_fourcc=cap_fourcc, cap_fps=cap_fps, cap_buffer_size=cap_buffer_size, inference_width=inference_width, inference_height=inference_height, roi_tracking=roi_tracking, flow_interval=flow_interval, extra_cameras=extra_cameras, extra_camera_transforms=extra_camera_transforms, inference_worker=inference_worker, quality_governor=quality_governor, latency_target=latency_target, min_cutoff=min_cutoff, beta=beta, d_cutoff=d_cutoff, dead_zone=dead_zone, mouse_backend=mouse_backend, monitor=monitor, monitors=monitors, screen_calibration=screen_calibration, cursor_rate=cursor_rate, max_extrapolation=max_extrapolation, show = show, preview_fps=preview_fps, preview_scale=preview_scale, show_latency=show_latency, latency_file=latency_file, record_file=record_file, pause=pause, detection_confidence=detection_confidence, tracking_confidence=tracking_confidence) -> None:
         
         # Key for right and left hand gestures
         self.right_positions = right_positions
@@ -110,20 +181,81 @@ class User:
         # This is the angle at which we consider a finger to be open. Range 0-180
         self.right_angle = right_angle
         self.left_angle = left_angle
+        # The angle at which an open finger is closed again
+        self.right_close_angle = right_close_angle
+        self.left_close_angle = left_close_angle
+        # How long a hand position has to be seen before its action is performed
+        self.confirm_frames = confirm_frames
+        self.confirm_time = confirm_time
+        
+        # The webcam, video, image directory or synthetic frames the hands are tracked in
+        self.camera = camera
         
         # This set the width and height of the camera
         self.cap_width = cap_width
         self.cap_height = cap_height
         
-        # # Controls how fast the mouse moves compared to the hand
-        self.movement_speed = movement_speed
+        # The format, frame rate and driver buffer asked from the webcam
+        self.cap_fourcc = cap_fourcc
+        self.cap_fps = cap_fps
+        self.cap_buffer_size = cap_buffer_size
+        
+        # This sets the width and height of the image mediapipe detects the hands in
+        self.inference_width = inference_width
+        self.inference_height = inference_height
+        
+        # Only detects the hands around the hands from the previous frame
+        self.roi_tracking = roi_tracking
+        
+        # How often mediapipe runs, the optical flow tracks the hands in between
+        self.flow_interval = flow_interval
+        
+        # More webcams that track the hands
+        self.extra_cameras = extra_cameras
+        self.extra_camera_transforms = extra_camera_transforms
+        
+        # Runs mediapipe in a separate process
+        self.inference_worker = inference_worker
+        
+        # Changes the quality while running to keep the latency under the target
+        self.quality_governor = quality_governor
+        self.latency_target = latency_target
+        
+        # Controls how the mouse is smoothed
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.dead_zone = dead_zone
+        
+        # What moves the mouse and clicks
+        self.mouse_backend = mouse_backend
+        
+        # Where on the screen the mouse moves
+        self.monitor = monitor
+        self.monitors = monitors
+        self.screen_calibration = screen_calibration
+        
+        # How often the mouse is moved and how far it is extrapolated
+        self.cursor_rate = cursor_rate
+        self.max_extrapolation = max_extrapolation
                 
-        # Controls how long to pause after a left/right click
+        # How long the same click is ignored after it was performed
         self.pause = pause
         
         # Show the image
         self.show = show
         
+        # How often and how big the image is shown
+        self.preview_fps = preview_fps
+        self.preview_scale = preview_scale
+        
+        # Show and save the latency of every stage
+        self.show_latency = show_latency
+        self.latency_file = latency_file
+        
+        # Records every frame for replay.py
+        self.record_file = record_file
+        
         # Sets the detection_confidence
         self.detection_confidence = detection_confidence
         